@@ -1,8 +1,13 @@
-from flask import Flask
+import time
+from flask import Flask, g, request
 from flask_cors import CORS
 from config import Config
 import os
 
+def request_route(request):
+    """URL rule of the matched view; the rule, not the path, so ids in URLs do not explode label sets"""
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
@@ -10,6 +15,30 @@ def create_app():
     # Initialize CORS
     CORS(app)
     
+    from services.metrics import CONTENT_TYPE, observe_request, render
+    from services.tracing import finish_request, start_request
+    
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+        g.request_span = start_request(request.method, request_route(request), request.headers.get('traceparent'))
+    
+    @app.after_request
+    def record_request(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            observe_request(request_route(request), request.method, response.status_code, time.perf_counter() - started)
+        root = g.pop('request_span', None)
+        if root is not None:
+            timing = finish_request(root, response.status_code)
+            if timing:
+                response.headers['Server-Timing'] = timing
+        return response
+    
+    @app.route('/metrics')
+    def metrics_page():
+        return render(), 200, {'Content-Type': CONTENT_TYPE}
+    
     # Register Blueprints
     from blueprints.main import main_bp
     from blueprints.api import api_bp
@@ -0,0 +1,100 @@
+import time
+from quart import Quart, g, request
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from werkzeug.exceptions import HTTPException
+from werkzeug.wsgi import ClosingIterator
+from config import Config
+from app import create_app, request_route
+from services.container import get_container
+from services.metrics import observe_request
+from services.tracing import finish_request, start_request
+
+class RouteDispatcher:
+    """Serve routes the async app knows as coroutines; hand everything else to the WSGI app"""
+    
+    def __init__(self, async_app, wsgi_app):
+        self.async_app = async_app
+        self.wsgi_app = AsyncioWSGIMiddleware(with_body_chunk(wsgi_app), max_body_size=Config.MAX_CONTENT_LENGTH)
+        self._routes = async_app.url_map.bind('')
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan' or (scope['type'] == 'http' and self._is_async(scope)):
+            await self.async_app(scope, receive, send)
+        else:
+            await self.wsgi_app(scope, receive, send)
+    
+    def _is_async(self, scope):
+        # CORS preflights stay with Flask-CORS on the WSGI app
+        if scope['method'] == 'OPTIONS':
+            return False
+        try:
+            self._routes.match(scope['path'], scope['method'])
+            return True
+        except HTTPException:
+            return False
+
+def with_body_chunk(wsgi_app):
+    """Yield at least one body chunk; hypercorn sends the status line with the first one"""
+    def app(environ, start_response):
+        body = wsgi_app(environ, start_response)
+        return ClosingIterator(_chunks(body), getattr(body, 'close', None))
+    return app
+
+def _chunks(body):
+    empty = True
+    for chunk in body:
+        empty = False
+        yield chunk
+    if empty:
+        yield b''
+
+def create_async_app():
+    """Quart app holding the async views for LLM and CrossRef bound routes"""
+    app = Quart(__name__)
+    app.config.from_object(Config)
+    
+    from blueprints.async_api import async_api_bp
+    from blueprints.async_api.innovation_routes import async_innovation_bp
+    from blueprints.async_api.oracle_routes import async_oracle_bp
+    
+    app.register_blueprint(async_api_bp, url_prefix='/api')
+    app.register_blueprint(async_innovation_bp, url_prefix='/api/innovation')
+    app.register_blueprint(async_oracle_bp, url_prefix='/api/oracle')
+    
+    @app.after_serving
+    async def close_http_clients():
+        # Only a citation service that was created has a pool to close
+        container = get_container()
+        if 'citation_service' in container.created():
+            await container.citation_service.close_async()
+    
+    @app.before_request
+    async def start_timer():
+        g.request_started = time.perf_counter()
+        g.request_span = start_request(request.method, request_route(request), request.headers.get('traceparent'))
+    
+    @app.after_request
+    async def allow_cross_origin(response):
+        # Same default as Flask-CORS on the WSGI app
+        response.headers.setdefault('Access-Control-Allow-Origin', '*')
+        return response
+    
+    @app.after_request
+    async def record_request(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            observe_request(request_route(request), request.method, response.status_code, time.perf_counter() - started)
+        root = g.pop('request_span', None)
+        if root is not None:
+            timing = finish_request(root, response.status_code)
+            if timing:
+                response.headers['Server-Timing'] = timing
+        return response
+    
+    return app
+
+def create_asgi_app():
+    return RouteDispatcher(create_async_app(), create_app())
+
+# hypercorn asgi:app --workers 2
+app = create_asgi_app()
@@ -0,0 +1,140 @@
+"""Concurrency load test: python benchmarks/load_test.py [--requests N] [--concurrency C] [--latency S] [--threads T]
+
+Serves the app twice in-process with hypercorn, once as the threaded WSGI app
+and once through asgi.py, with the LLM replaced by a model that just waits
+--latency seconds. Then it fires the same burst of /api/innovation/research-gaps
+requests at each. The WSGI app can only hold --threads upstream waits at once;
+the async views hold one coroutine per request.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENDPOINT = '/api/innovation/research-gaps'
+
+class SimulatedModel:
+    """Stands in for a GenerativeModel: waits like an upstream call, returns fixed text"""
+    
+    def __init__(self, latency):
+        self.latency = latency
+    
+    def generate_content(self, prompt):
+        time.sleep(self.latency)
+        return SimulatedResponse()
+    
+    async def generate_content_async(self, prompt):
+        await asyncio.sleep(self.latency)
+        return SimulatedResponse()
+
+class SimulatedResponse:
+    text = 'Simulated research gaps.'
+
+async def serve(app, port, shutdown):
+    from hypercorn.asyncio import serve as hypercorn_serve
+    from hypercorn.config import Config as HypercornConfig
+    config = HypercornConfig()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.accesslog = None
+    config.errorlog = None
+    config.backlog = 4096
+    await hypercorn_serve(app, config, shutdown_trigger=shutdown.wait)
+
+async def burst(port, total, concurrency):
+    """Send total requests over concurrency keep-alive connections; return per-request latencies"""
+    # A bare HTTP/1.1 client, so the load generator stays cheap next to the server it measures
+    latencies = []
+    failures = 0
+    pending = iter(range(total))
+    
+    async def connection():
+        nonlocal failures
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            for index in pending:
+                body = json.dumps({'topic': f"topic {index}"}).encode()
+                start = time.perf_counter()
+                writer.write(
+                    f"POST {ENDPOINT} HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                status, length = await read_response_head(reader)
+                await reader.readexactly(length)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    failures += 1
+        finally:
+            writer.close()
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(min(concurrency, total))))
+    return time.perf_counter() - start, latencies, failures
+
+async def read_response_head(reader):
+    """Status code and Content-Length of the next response on a connection"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return int(lines[0].split()[1]), length
+
+async def measure(name, app, port, args):
+    shutdown = asyncio.Event()
+    server = asyncio.create_task(serve(app, port, shutdown))
+    await asyncio.sleep(0.5)
+    try:
+        elapsed, latencies, failures = await burst(port, args.requests, args.concurrency)
+    finally:
+        shutdown.set()
+        await server
+    
+    latencies.sort()
+    print(f"{name:<6} {args.requests / elapsed:8.1f} req/s   "
+          f"p50 {statistics.median(latencies) * 1000:8.0f} ms   "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:8.0f} ms   "
+          f"total {elapsed:6.2f} s   failures {failures}")
+    return args.requests / elapsed
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Compare WSGI threads with async views under slow upstreams')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.5, help='simulated LLM round trip in seconds')
+    parser.add_argument('--threads', type=int, default=32, help='WSGI worker threads')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+    
+    from services import llm
+    from app import create_app
+    from asgi import create_asgi_app, with_body_chunk
+    from config import Config
+    from hypercorn.middleware import AsyncioWSGIMiddleware
+    
+    llm._models[llm.DEFAULT_MODEL] = SimulatedModel(args.latency)
+    wsgi_app = AsyncioWSGIMiddleware(with_body_chunk(create_app()), max_body_size=Config.MAX_CONTENT_LENGTH)
+    asgi_app = create_asgi_app()
+    
+    print(f"{args.requests} requests, {args.concurrency} concurrent, {args.latency * 1000:.0f} ms upstream, "
+          f"{args.threads} WSGI threads")
+    
+    async def run():
+        # The default executor runs the WSGI app, so its size is the thread cap
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=args.threads))
+        wsgi_rate = await measure('wsgi', wsgi_app, args.port, args)
+        asgi_rate = await measure('asgi', asgi_app, args.port + 1, args)
+        print(f"speedup {asgi_rate / wsgi_rate:.1f}x")
+    
+    asyncio.run(run())
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,64 @@
+"""Worker startup benchmark: python benchmarks/startup.py [--runs N] [--path URL]
+
+Each run starts a fresh interpreter, imports the app, builds it and serves one
+request, so the numbers match what a new worker pays before it takes traffic.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+import app
+flask_app = app.create_app()
+booted = time.perf_counter()
+response = flask_app.test_client().get(sys.argv[1])
+served = time.perf_counter()
+
+from services.container import get_container
+print(json.dumps({
+    'boot': booted - start,
+    'first_request': served - booted,
+    'status': response.status_code,
+    'sdk_imported': 'google.generativeai' in sys.modules,
+    'services_created': get_container().created(),
+    'modules': len(sys.modules)
+}))
+"""
+
+def run_once(path):
+    """Boot the app in a clean interpreter and return its measurements"""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, path],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Measure app import and boot time')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--path', default='/', help='URL requested once after boot')
+    args = parser.parse_args(argv)
+    
+    results = [run_once(args.path) for _ in range(args.runs)]
+    boot = [result['boot'] * 1000 for result in results]
+    first = [result['first_request'] * 1000 for result in results]
+    
+    print(f"runs: {args.runs}")
+    print(f"boot (import + create_app): median {statistics.median(boot):.1f} ms, "
+          f"min {min(boot):.1f} ms, max {max(boot):.1f} ms")
+    print(f"first request {args.path}: median {statistics.median(first):.1f} ms "
+          f"(status {results[-1]['status']})")
+    print(f"modules loaded: {results[-1]['modules']}")
+    print(f"Gemini SDK imported: {results[-1]['sdk_imported']}")
+    print(f"services created: {', '.join(results[-1]['services_created']) or 'none'}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,24 +1,28 @@
-from flask import Blueprint, request, jsonify
-from services.paper_service import PaperService
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from blueprints.endpoints import (COUNTERARGUMENTS, ENHANCE_FROM_SOURCE, ENHANCED_PAPER, RESEARCH_GAPS,
+                                  RESEARCH_PROPOSAL, InvalidRequest)
+from services.container import lazy_service
+from services.incremental_analytics import StreamingAnalyzer
+from services.response_encoding import json_response
+import json
 
 innovation_bp = Blueprint('innovation', __name__)
-paper_service = PaperService()
+paper_service = lazy_service('paper_service')
+live_sessions = lazy_service('live_sessions')
+
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_PROGRESS_INTERVAL = 1024 * 1024  # bytes between progress lines
 
 @innovation_bp.route('/enhanced-paper', methods=['POST'])
 def generate_enhanced_paper():
     """Generate paper with innovative features"""
     try:
-        data = request.get_json()
-        topic = data.get('topic')
-        paper_type = data.get('paper_type', 'research')
-        length = data.get('length', 'medium')
-        
-        if not topic:
-            return jsonify({'error': 'Topic is required'}), 400
-        
-        result = paper_service.generate_enhanced_paper(topic, paper_type, length)
-        return jsonify(result)
-        
+        args = ENHANCED_PAPER.parse(request.get_json())
+        result = paper_service.generate_enhanced_paper(**args)
+        return json_response(ENHANCED_PAPER.respond(result), request)
+    
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -34,56 +38,182 @@ def analyze_quality():
         
         result = paper_service.analyze_paper_quality(content)
         return jsonify(result)
-        
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@innovation_bp.route('/research-proposal', methods=['POST'])
-def generate_proposal():
-    """Generate research proposal"""
+@innovation_bp.route('/analyze-quality-batch', methods=['POST'])
+def analyze_quality_batch():
+    """Analyze the quality of many papers in one request"""
     try:
         data = request.get_json()
-        research_idea = data.get('research_idea')
-        funding_type = data.get('funding_type', 'academic')
+        documents = data.get('documents')
+        percentiles = data.get('percentiles')
         
-        if not research_idea:
-            return jsonify({'error': 'Research idea is required'}), 400
+        if not documents or not isinstance(documents, list):
+            return jsonify({'error': 'A list of documents is required'}), 400
+        if percentiles is not None and (not isinstance(percentiles, list) or
+                                        not all(isinstance(p, (int, float)) and 0 <= p <= 100 for p in percentiles)):
+            return jsonify({'error': 'Percentiles must be numbers between 0 and 100'}), 400
         
-        result = paper_service.generate_research_proposal(research_idea, funding_type)
+        result = paper_service.analyze_quality_batch(documents, percentiles)
         return jsonify(result)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@innovation_bp.route('/analyze-quality-stream', methods=['POST'])
+def analyze_quality_stream():
+    """Analyze an uploaded document chunk by chunk without buffering it"""
+    try:
+        if request.mimetype == 'multipart/form-data':
+            upload = request.files.get('file')
+            if upload is None:
+                return jsonify({'error': 'File is required'}), 400
+            source = upload.stream
+        else:
+            source = request.stream
+        
+        analyzer = StreamingAnalyzer(paper_service.analytics_service)
+        chunks = iter(lambda: source.read(STREAM_CHUNK_SIZE), b'')
+        
+        if request.args.get('progress'):
+            # Newline-delimited JSON: live scores while the upload is read, then the final result
+            def generate():
+                received = 0
+                reported = 0
+                for chunk in chunks:
+                    analyzer.feed(chunk)
+                    received += len(chunk)
+                    if received - reported >= STREAM_PROGRESS_INTERVAL:
+                        reported = received
+                        yield json.dumps({'bytes': received, 'analysis': analyzer.analysis()}) + '\n'
+                yield json.dumps({'done': True, 'bytes': received, 'analysis': analyzer.finish()}) + '\n'
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
         
+        received = 0
+        for chunk in chunks:
+            analyzer.feed(chunk)
+            received += len(chunk)
+        
+        result = analyzer.finish()
+        result.update({'success': True, 'bytes': received})
+        return jsonify(result)
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@innovation_bp.route('/counterarguments', methods=['POST'])
-def generate_counterarguments():
-    """Generate counterarguments"""
+@innovation_bp.route('/live-analysis', methods=['POST'])
+def create_live_analysis():
+    """Start a live analysis session for a document being edited"""
     try:
         data = request.get_json()
-        main_argument = data.get('main_argument')
-        topic = data.get('topic')
+        content = data.get('content', '')
         
-        if not main_argument or not topic:
-            return jsonify({'error': 'Main argument and topic are required'}), 400
+        session_id, analysis = live_sessions.create(content)
+        return jsonify({'success': True, 'session_id': session_id, 'analysis': analysis})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@innovation_bp.route('/live-analysis/<session_id>', methods=['GET', 'PATCH', 'DELETE'])
+def live_analysis(session_id):
+    """Read, edit (by paragraph) or close a live analysis session"""
+    try:
+        if request.method == 'DELETE':
+            if not live_sessions.close(session_id):
+                return jsonify({'error': 'Unknown session'}), 404
+            return jsonify({'success': True})
+        
+        if request.method == 'GET':
+            analysis = live_sessions.analysis(session_id, include_content=bool(request.args.get('content')))
+            return jsonify({'success': True, 'session_id': session_id, 'analysis': analysis})
+        
+        data = request.get_json()
+        operation = data.get('operation', 'replace')
+        index = data.get('index')
         
-        result = paper_service.innovation_service.generate_counterarguments(main_argument, topic)
-        return jsonify({'success': True, 'counterarguments': result})
+        if not isinstance(index, int):
+            return jsonify({'error': 'Paragraph index is required'}), 400
         
+        analysis = live_sessions.edit(session_id, operation, index, data.get('content', ''))
+        return jsonify({'success': True, 'session_id': session_id, 'analysis': analysis})
+    
+    except KeyError:
+        return jsonify({'error': 'Unknown session'}), 404
+    except (IndexError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@innovation_bp.route('/research-gaps', methods=['POST'])
-def find_research_gaps():
-    """Find research gaps"""
+@innovation_bp.route('/enhance-from-source', methods=['POST'])
+def enhance_from_source():
+    """Generate a paper from source material with an overlap report"""
+    try:
+        args = ENHANCE_FROM_SOURCE.parse(request.get_json())
+        result = paper_service.enhance_paper_from_source(**args)
+        return jsonify(ENHANCE_FROM_SOURCE.respond(result))
+    
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@innovation_bp.route('/check-overlap', methods=['POST'])
+def check_overlap():
+    """Find passages copied from sources or earlier papers"""
     try:
         data = request.get_json()
-        topic = data.get('topic')
-        
-        if not topic:
-            return jsonify({'error': 'Topic is required'}), 400
+        content = data.get('content')
+        sources = data.get('sources') or []
         
-        result = paper_service.innovation_service.generate_research_gaps(topic)
-        return jsonify({'success': True, 'research_gaps': result})
+        if not content:
+            return jsonify({'error': 'Content is required'}), 400
+        if not isinstance(sources, list) or not all(isinstance(source, (str, dict)) for source in sources):
+            return jsonify({'error': 'Sources must be a list of strings or {id, content} objects'}), 400
         
+        result = paper_service.check_overlap(content, sources)
+        return jsonify(result)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@innovation_bp.route('/research-proposal', methods=['POST'])
+def generate_proposal():
+    """Generate research proposal"""
+    try:
+        args = RESEARCH_PROPOSAL.parse(request.get_json())
+        result = paper_service.generate_research_proposal(**args)
+        return jsonify(RESEARCH_PROPOSAL.respond(result))
+    
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@innovation_bp.route('/counterarguments', methods=['POST'])
+def generate_counterarguments():
+    """Generate counterarguments"""
+    try:
+        args = COUNTERARGUMENTS.parse(request.get_json())
+        result = paper_service.innovation_service.generate_counterarguments(**args)
+        return jsonify(COUNTERARGUMENTS.respond(result))
+    
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@innovation_bp.route('/research-gaps', methods=['POST'])
+def find_research_gaps():
+    """Find research gaps"""
+    try:
+        args = RESEARCH_GAPS.parse(request.get_json())
+        result = paper_service.innovation_service.generate_research_gaps(**args)
+        return jsonify(RESEARCH_GAPS.respond(result))
+    
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -1,38 +1,40 @@
-from flask import request, jsonify, send_file
+from flask import request, jsonify, send_file, Response, stream_with_context
 from . import api_bp
-from services.paper_service import PaperService
-from services.latex_service import LatexService
+from blueprints.endpoints import GENERATE_PAPER, SEARCH_CITATIONS, InvalidRequest
+from services.container import lazy_service
+from services.response_encoding import json_response
+from services.document_ast import render_document, RENDERERS
+from services.draft_store import DraftNotFound
+from services.paper_store import PaperNotFound
+from services.pdf_service import DATE_SLOT, PdfQueueFull, PdfCompileError
+from services.zip_stream import zip_stream
 import json
 import io
+import os
+import re
+from config import Config
 
-paper_service = PaperService()
-latex_service = LatexService()
+paper_service = lazy_service('paper_service')
+latex_service = lazy_service('latex_service')
+pdf_service = lazy_service('pdf_service')
+bulk_export_service = lazy_service('bulk_export_service')
+draft_store = lazy_service('draft_store')
+paper_store = lazy_service('paper_store')
+
+def stored_paper(data):
+    """Stored paper named by the request's paper_id, so exports need not re-send content"""
+    paper_id = data.get('paper_id')
+    return (paper_store.export_item(paper_id) if paper_id else None) or {}
 
 @api_bp.route('/generate-paper', methods=['POST'])
 def generate_paper():
     try:
-        data = request.get_json()
-        
-        topic = data.get('topic')
-        paper_type = data.get('paper_type', 'research')
-        length = data.get('length', 'medium')
-        citation_style = data.get('citation_style', 'apa')
-        include_references = data.get('include_references', True)
-        
-        if not topic:
-            return jsonify({'error': 'Topic is required'}), 400
-        
-        # Generate paper
-        result = paper_service.generate_paper(
-            topic=topic,
-            paper_type=paper_type,
-            length=length,
-            citation_style=citation_style,
-            include_references=include_references
-        )
-        
-        return jsonify(result)
+        args = GENERATE_PAPER.parse(request.get_json())
+        result = paper_service.generate_paper(**args)
+        return json_response(GENERATE_PAPER.respond(result), request)
     
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -40,17 +42,25 @@ def generate_paper():
 def generate_latex():
     try:
         data = request.get_json()
-        paper_content = data.get('paper_content')
-        title = data.get('title')
+        stored = stored_paper(data)
+        paper_content = data.get('paper_content') or stored.get('content')
+        title = data.get('title') or stored.get('title')
         author = data.get('author', 'Research Assistant')
+        template = data.get('template')
+        document_id = data.get('document_id') or data.get('paper_id')
         
         if not paper_content:
             return jsonify({'error': 'Paper content is required'}), 400
         
+        if template and template not in latex_service.available_templates():
+            return jsonify({'error': f'Unknown LaTeX template: {template}'}), 400
+        
         latex_content = latex_service.generate_latex(
             content=paper_content,
             title=title,
-            author=author
+            author=author,
+            template=template,
+            document_id=document_id
         )
         
         return jsonify({'latex_content': latex_content})
@@ -58,6 +68,30 @@ def generate_latex():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/latex-templates', methods=['GET'])
+def latex_templates():
+    """List available LaTeX templates"""
+    return jsonify({'templates': latex_service.available_templates()})
+
+@api_bp.route('/render-content', methods=['POST'])
+def render_content():
+    """Render paper content as HTML, LaTeX or Markdown"""
+    try:
+        data = request.get_json()
+        content = data.get('content')
+        fmt = data.get('format', 'html')
+        
+        if not content:
+            return jsonify({'error': 'Content is required'}), 400
+        
+        if fmt not in RENDERERS:
+            return jsonify({'error': f"Unsupported format. Use one of: {', '.join(RENDERERS)}"}), 400
+        
+        return jsonify({'format': fmt, 'rendered': render_document(content, fmt)})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @api_bp.route('/download-latex', methods=['POST'])
 def download_latex():
     try:
@@ -83,18 +117,167 @@ def download_latex():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@api_bp.route('/search-citations', methods=['POST'])
-def search_citations():
+@api_bp.route('/download-bundle', methods=['POST'])
+def download_bundle():
+    """Stream a ZIP with the .tex source, a matching .bib file and template assets"""
+    try:
+        data = request.get_json()
+        stored = stored_paper(data)
+        paper_content = data.get('paper_content') or stored.get('content')
+        latex_content = data.get('latex_content')
+        title = data.get('title') or stored.get('title')
+        author = data.get('author', 'Research Assistant')
+        template = data.get('template') or Config.LATEX_DEFAULT_TEMPLATE
+        citations = data.get('citations') or stored.get('citations') or []
+        stem = re.sub(r'[^A-Za-z0-9_-]+', '_', data.get('filename', 'research_paper')).strip('_') or 'research_paper'
+        
+        if not paper_content and not latex_content:
+            return jsonify({'error': 'Paper content or LaTeX content is required'}), 400
+        
+        if template not in latex_service.available_templates():
+            return jsonify({'error': f'Unknown LaTeX template: {template}'}), 400
+        
+        def render_tex():
+            if latex_content:
+                return latex_content
+            return latex_service.generate_latex(
+                content=paper_content,
+                title=title,
+                author=author,
+                template=template,
+                bibliography='references',
+                # Papers generated with citations cite their reference list as [1], [2], ...
+                numeric_keys=latex_service.bibtex_keys(citations)
+            )
+        
+        entries = [
+            (f'{stem}/{stem}.tex', render_tex),
+            (f'{stem}/references.bib', lambda: latex_service.generate_bibtex(citations, paper_content))
+        ]
+        entries.extend(
+            (f'{stem}/{relative_path}', ('file', path))
+            for relative_path, path in latex_service.templates.assets(template)
+        )
+        
+        return Response(
+            stream_with_context(zip_stream(entries)),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename="{stem}.zip"'}
+        )
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/bulk-export-latex', methods=['POST'])
+def bulk_export_latex():
+    """Render many papers in parallel and stream them into one ZIP archive"""
     try:
         data = request.get_json()
-        query = data.get('query')
-        max_results = data.get('max_results', 5)
+        papers = data.get('papers') or []
+        paper_ids = data.get('paper_ids') or []
+        template = data.get('template')
+        
+        if not papers and not paper_ids:
+            return jsonify({'error': 'A list of papers or paper ids is required'}), 400
+        
+        if template and template not in latex_service.available_templates():
+            return jsonify({'error': f'Unknown LaTeX template: {template}'}), 400
+        
+        items = bulk_export_service.resolve_items(papers, paper_ids)
+        
+        return Response(
+            stream_with_context(bulk_export_service.stream(items, template)),
+            mimetype='application/zip',
+            headers={'Content-Disposition': 'attachment; filename="papers_export.zip"'}
+        )
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/papers/search', methods=['GET'])
+def search_papers():
+    """Full-text search over stored papers"""
+    try:
+        query = request.args.get('q', '').strip()
         
         if not query:
             return jsonify({'error': 'Query is required'}), 400
         
-        citations = paper_service.search_citations(query, max_results)
-        return jsonify({'citations': citations})
+        try:
+            found = paper_store.search(
+                query,
+                paper_type=request.args.get('type'),
+                citation_style=request.args.get('citation_style'),
+                since=request.args.get('since'),
+                until=request.args.get('until'),
+                limit=min(request.args.get('limit', 20, type=int), 100),
+                offset=request.args.get('offset', 0, type=int)
+            )
+        except ValueError:
+            return jsonify({'error': 'Dates must be ISO formatted, e.g. 2024-05-01'}), 400
+        
+        return jsonify({'query': query, **found})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/papers/<paper_id>', methods=['GET'])
+def get_paper(paper_id):
+    """Stored generation result"""
+    try:
+        return json_response(paper_store.get(paper_id), request)
+    
+    except PaperNotFound:
+        return jsonify({'error': 'Unknown paper'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/papers/<paper_id>/sections', methods=['GET'])
+def paper_sections(paper_id):
+    """Section headings and lengths of a stored paper"""
+    try:
+        return jsonify({'paper_id': paper_id, 'sections': paper_store.sections(paper_id)})
+    
+    except PaperNotFound:
+        return jsonify({'error': 'Unknown paper'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/papers/<paper_id>/sections/<int:index>', methods=['GET'])
+def paper_section(paper_id, index):
+    """One section of a stored paper"""
+    try:
+        return json_response(paper_store.section(paper_id, index), request)
+    
+    except PaperNotFound:
+        return jsonify({'error': 'Unknown paper section'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/search-citations', methods=['POST'])
+def search_citations():
+    try:
+        args = SEARCH_CITATIONS.parse(request.get_json())
+        citations = paper_service.search_citations(**args)
+        return jsonify(SEARCH_CITATIONS.respond(citations))
+    
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/resolve-dois', methods=['POST'])
+def resolve_dois():
+    """Resolve DOIs to citation metadata"""
+    try:
+        data = request.get_json()
+        dois = data.get('dois')
+        
+        if not dois or not isinstance(dois, list):
+            return jsonify({'error': 'A list of DOIs is required'}), 400
+        
+        papers = paper_service.citation_service.get_papers_by_doi(dois)
+        return jsonify({'papers': papers})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -137,36 +320,132 @@ def analyze_topic():
 
 @api_bp.route('/save-draft', methods=['POST'])
 def save_draft():
-    """Save paper draft"""
+    """Save paper draft as a new version"""
     try:
         data = request.get_json()
-        draft_id = data.get('id') or f"draft_{int(time.time())}"
+        content = data.get('content') or data.get('paper')
+        
+        if not isinstance(content, str) or not content:
+            return jsonify({'error': 'Draft content is required'}), 400
+        
+        draft_id = data.get('id') or draft_store.new_id()
+        metadata = {key: value for key, value in data.items() if key not in ('id', 'content', 'paper', 'title')}
+        saved = draft_store.save(str(draft_id), content, title=data.get('title'), metadata=metadata or None)
         
-        # In a real app, save to database
-        # For now, just return success
         return jsonify({
             'success': True,
-            'draft_id': draft_id,
-            'message': 'Draft saved successfully'
+            'draft_id': saved['draft_id'],
+            'version': saved['version'],
+            'changed': saved['changed'],
+            'message': 'Draft saved successfully' if saved['changed'] else 'Draft unchanged'
         })
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/drafts', methods=['GET'])
+def list_drafts():
+    """Drafts by most recent save"""
+    try:
+        limit = min(request.args.get('limit', 50, type=int), 200)
+        offset = request.args.get('offset', 0, type=int)
+        return jsonify({'drafts': draft_store.list_drafts(limit, offset)})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/drafts/<draft_id>', methods=['GET'])
+def get_draft(draft_id):
+    """Latest version of a draft"""
+    try:
+        return jsonify(draft_store.latest(draft_id))
+    
+    except DraftNotFound:
+        return jsonify({'error': 'Unknown draft'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/drafts/<draft_id>', methods=['DELETE'])
+def delete_draft(draft_id):
+    """Delete a draft and its history"""
+    try:
+        draft_store.delete(draft_id)
+        return jsonify({'success': True, 'draft_id': draft_id})
+    
+    except DraftNotFound:
+        return jsonify({'error': 'Unknown draft'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/drafts/<draft_id>/history', methods=['GET'])
+def draft_history(draft_id):
+    """Retained versions of a draft"""
+    try:
+        return jsonify({'draft_id': draft_id, 'versions': draft_store.history(draft_id)})
+    
+    except DraftNotFound:
+        return jsonify({'error': 'Unknown draft'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/drafts/<draft_id>/versions/<int:version>', methods=['GET'])
+def draft_version(draft_id, version):
+    """One historical version of a draft"""
+    try:
+        return jsonify(draft_store.version(draft_id, version))
+    
+    except DraftNotFound:
+        return jsonify({'error': 'Unknown draft version'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @api_bp.route('/export-pdf', methods=['POST'])
 def export_pdf():
-    """Export paper to PDF (placeholder)"""
+    """Export paper to PDF"""
     try:
         data = request.get_json()
-        content = data.get('content')
-        title = data.get('title', 'Research Paper')
+        stored = stored_paper(data)
+        content = data.get('content') or stored.get('content')
+        title = data.get('title') or stored.get('title') or 'Research Paper'
+        author = data.get('author', 'Research Assistant')
+        template = data.get('template') or Config.LATEX_DEFAULT_TEMPLATE
         
-        # Placeholder - would integrate with PDF generation service
-        return jsonify({
-            'success': True,
-            'message': 'PDF export feature coming soon!',
-            'download_url': None
-        })
+        if not content:
+            return jsonify({'error': 'Content is required'}), 400
+        
+        if template not in latex_service.available_templates():
+            return jsonify({'error': f'Unknown LaTeX template: {template}'}), 400
+        
+        # The date is left out of the cache key, so an unchanged paper is not recompiled every day
+        latex_content = latex_service.generate_latex(
+            content=content,
+            title=title,
+            author=author,
+            template=template,
+            date=DATE_SLOT
+        )
+        pdf_path = pdf_service.export(
+            latex_content,
+            template=template,
+            assets=latex_service.templates.assets(template),
+            date=latex_service.today()
+        )
+        
+        return send_file(
+            os.path.abspath(pdf_path),
+            as_attachment=True,
+            download_name=data.get('filename', 'research_paper.pdf'),
+            mimetype='application/pdf'
+        )
     
+    except PdfQueueFull as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
+    except PdfCompileError as e:
+        return jsonify({'error': str(e), 'log': e.log}), 422
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/export-pdf/metrics', methods=['GET'])
+def export_pdf_metrics():
+    """PDF compile pool and cache metrics"""
+    return jsonify(pdf_service.metrics())
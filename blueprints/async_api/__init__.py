@@ -0,0 +1,5 @@
+from quart import Blueprint
+
+async_api_bp = Blueprint('async_api', __name__)
+
+from . import routes
@@ -0,0 +1,73 @@
+from quart import Blueprint, request, jsonify
+from blueprints.endpoints import (COUNTERARGUMENTS, ENHANCE_FROM_SOURCE, ENHANCED_PAPER, RESEARCH_GAPS,
+                                  RESEARCH_PROPOSAL, InvalidRequest)
+from services.container import lazy_service
+from services.response_encoding import json_response
+
+async_innovation_bp = Blueprint('async_innovation', __name__)
+paper_service = lazy_service('paper_service')
+
+@async_innovation_bp.route('/enhanced-paper', methods=['POST'])
+async def generate_enhanced_paper():
+    """Generate paper with innovative features"""
+    try:
+        args = ENHANCED_PAPER.parse(await request.get_json())
+        result = await paper_service.generate_enhanced_paper_async(**args)
+        return json_response(ENHANCED_PAPER.respond(result), request)
+    
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@async_innovation_bp.route('/enhance-from-source', methods=['POST'])
+async def enhance_from_source():
+    """Generate a paper from source material with an overlap report"""
+    try:
+        args = ENHANCE_FROM_SOURCE.parse(await request.get_json())
+        result = await paper_service.enhance_paper_from_source_async(**args)
+        return jsonify(ENHANCE_FROM_SOURCE.respond(result))
+    
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@async_innovation_bp.route('/research-proposal', methods=['POST'])
+async def generate_proposal():
+    """Generate research proposal"""
+    try:
+        args = RESEARCH_PROPOSAL.parse(await request.get_json())
+        result = await paper_service.generate_research_proposal_async(**args)
+        return jsonify(RESEARCH_PROPOSAL.respond(result))
+    
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@async_innovation_bp.route('/counterarguments', methods=['POST'])
+async def generate_counterarguments():
+    """Generate counterarguments"""
+    try:
+        args = COUNTERARGUMENTS.parse(await request.get_json())
+        result = await paper_service.innovation_service.generate_counterarguments_async(**args)
+        return jsonify(COUNTERARGUMENTS.respond(result))
+    
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@async_innovation_bp.route('/research-gaps', methods=['POST'])
+async def find_research_gaps():
+    """Find research gaps"""
+    try:
+        args = RESEARCH_GAPS.parse(await request.get_json())
+        result = await paper_service.innovation_service.generate_research_gaps_async(**args)
+        return jsonify(RESEARCH_GAPS.respond(result))
+    
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
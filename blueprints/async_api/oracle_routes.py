@@ -0,0 +1,90 @@
+from quart import Blueprint, request, jsonify
+import asyncio
+from blueprints.endpoints import DIVINE, EVOLUTION_MAP, PREDICT_TRENDS, SYNCHRONICITY, ULTIMATE_VISION, InvalidRequest
+from services.container import lazy_service
+
+async_oracle_bp = Blueprint('async_oracle', __name__)
+oracle = lazy_service('research_oracle')
+trend_predictor = lazy_service('trend_predictor')
+paper_evolution = lazy_service('paper_evolution')
+citation_service = lazy_service('citation_service')
+
+@async_oracle_bp.route('/divine', methods=['POST'])
+async def divine_future():
+    """Consult the Research Oracle"""
+    try:
+        args = DIVINE.parse(await request.get_json())
+        prophecy = await oracle.divine_research_future_async(args['query'])
+        return jsonify(DIVINE.respond(prophecy))
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@async_oracle_bp.route('/predict-trends', methods=['POST'])
+async def predict_trends():
+    """Predict research trends"""
+    try:
+        args = PREDICT_TRENDS.parse(await request.get_json())
+        trends, future_concepts = await asyncio.gather(
+            trend_predictor.predict_research_trends_async(args['field'], args['timeframe']),
+            trend_predictor.generate_future_paper_concepts_async(args['field'])
+        )
+        
+        return jsonify(PREDICT_TRENDS.respond(trends, future_concepts))
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@async_oracle_bp.route('/evolution-map', methods=['POST'])
+async def create_evolution_map():
+    """Create research evolution map"""
+    try:
+        topic = EVOLUTION_MAP.parse(await request.get_json())['topic']
+        papers = await citation_service.search_papers_async(topic, max_results=20)
+        seminal_works = citation_service.seminal_works(papers)
+        
+        timeline, ecosystem, mutations = await asyncio.gather(
+            paper_evolution.create_research_timeline_async(topic, seminal_works),
+            paper_evolution.generate_research_ecosystem_map_async(topic),
+            paper_evolution.generate_research_mutation_paths_async(topic)
+        )
+        
+        return jsonify(EVOLUTION_MAP.respond(timeline, seminal_works, ecosystem, mutations))
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@async_oracle_bp.route('/ultimate-vision', methods=['POST'])
+async def generate_ultimate_vision():
+    """Generate ultimate research vision"""
+    try:
+        field = ULTIMATE_VISION.parse(await request.get_json())['field']
+        vision, mandala = await asyncio.gather(
+            oracle.generate_ultimate_research_vision_async(field),
+            oracle.create_research_mandala_async(field)
+        )
+        
+        return jsonify(ULTIMATE_VISION.respond(vision, mandala))
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@async_oracle_bp.route('/synchronicity', methods=['POST'])
+async def predict_synchronicity():
+    """Predict research synchronicities"""
+    try:
+        args = SYNCHRONICITY.parse(await request.get_json())
+        sync, fusion = await asyncio.gather(
+            oracle.predict_research_synchronicities_async(args['topic1'], args['topic2']),
+            trend_predictor.generate_research_fusion_ideas_async(args['topic1'], args['topic2'])
+        )
+        
+        return jsonify(SYNCHRONICITY.respond(sync, fusion))
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,31 @@
+from quart import request, jsonify
+from . import async_api_bp
+from blueprints.endpoints import GENERATE_PAPER, SEARCH_CITATIONS, InvalidRequest
+from services.container import lazy_service
+from services.response_encoding import json_response
+
+paper_service = lazy_service('paper_service')
+
+@async_api_bp.route('/generate-paper', methods=['POST'])
+async def generate_paper():
+    try:
+        args = GENERATE_PAPER.parse(await request.get_json())
+        result = await paper_service.generate_paper_async(**args)
+        return json_response(GENERATE_PAPER.respond(result), request)
+    
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@async_api_bp.route('/search-citations', methods=['POST'])
+async def search_citations():
+    try:
+        args = SEARCH_CITATIONS.parse(await request.get_json())
+        citations = await paper_service.search_citations_async(**args)
+        return jsonify(SEARCH_CITATIONS.respond(citations))
+    
+    except InvalidRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,51 @@
+class InvalidRequest(ValueError):
+    """Raised when a request body lacks a required field"""
+
+class Endpoint:
+    """Request fields and response keys of a route served by both the Flask and the Quart app"""
+    
+    def __init__(self, required, message, defaults=None, keys=None, success=True):
+        self.required = required
+        self.message = message
+        self.defaults = defaults or {}
+        # None passes the service result through as the body
+        self.keys = keys
+        self.success = success
+    
+    def parse(self, data):
+        """Service arguments from a JSON body; raises InvalidRequest when a required field is missing"""
+        data = data or {}
+        if not all(data.get(field) for field in self.required):
+            raise InvalidRequest(self.message)
+        args = {field: data[field] for field in self.required}
+        args.update((field, data.get(field, default)) for field, default in self.defaults.items())
+        return args
+    
+    def respond(self, *results):
+        """Response body for the service results, in the order of keys"""
+        if self.keys is None:
+            return results[0]
+        body = {'success': True} if self.success else {}
+        body.update(zip(self.keys, results))
+        return body
+
+GENERATE_PAPER = Endpoint(('topic',), 'Topic is required', defaults={
+    'paper_type': 'research', 'length': 'medium', 'citation_style': 'apa', 'include_references': True
+})
+SEARCH_CITATIONS = Endpoint(('query',), 'Query is required', defaults={'max_results': 5},
+                            keys=('citations',), success=False)
+
+ENHANCED_PAPER = Endpoint(('topic',), 'Topic is required', defaults={'paper_type': 'research', 'length': 'medium'})
+ENHANCE_FROM_SOURCE = Endpoint(('topic', 'source_content'), 'Topic and source content are required',
+                               defaults={'paper_type': 'research'})
+RESEARCH_PROPOSAL = Endpoint(('research_idea',), 'Research idea is required', defaults={'funding_type': 'academic'})
+COUNTERARGUMENTS = Endpoint(('main_argument', 'topic'), 'Main argument and topic are required',
+                            keys=('counterarguments',))
+RESEARCH_GAPS = Endpoint(('topic',), 'Topic is required', keys=('research_gaps',))
+
+DIVINE = Endpoint(('query',), 'Query required', keys=('prophecy',))
+PREDICT_TRENDS = Endpoint(('field',), 'Field required', defaults={'timeframe': '2024-2025'},
+                          keys=('trends', 'future_concepts'))
+EVOLUTION_MAP = Endpoint(('topic',), 'Topic required', keys=('timeline', 'seminal_works', 'ecosystem', 'mutations'))
+ULTIMATE_VISION = Endpoint(('field',), 'Field required', keys=('ultimate_vision', 'research_mandala'))
+SYNCHRONICITY = Endpoint(('topic1', 'topic2'), 'Both topics required', keys=('synchronicity', 'fusion_ideas'))
@@ -1,6 +1,5 @@
 from flask import render_template, request, jsonify, send_file
 from . import main_bp
-from services.paper_service import PaperService
 import os
 
 @main_bp.route('/')
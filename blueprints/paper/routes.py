@@ -1,6 +1,10 @@
-from flask import render_template, request, jsonify
+from flask import render_template, request
 from . import paper_bp
-from services.paper_service import PaperService
+from services.response_encoding import json_response
+from config import Config
+
+# The listings only change with a deploy
+LISTING_CACHE_CONTROL = f"public, max-age={Config.LISTING_CACHE_MAX_AGE}"
 
 @paper_bp.route('/templates')
 def templates():
@@ -12,7 +16,7 @@ def templates():
         {'id': 'thesis', 'name': 'Thesis Chapter', 'description': 'Thesis or dissertation chapter'},
         {'id': 'report', 'name': 'Technical Report', 'description': 'Technical analysis report'}
     ]
-    return jsonify({'templates': templates})
+    return json_response({'templates': templates}, request, cache_control=LISTING_CACHE_CONTROL)
 
 @paper_bp.route('/citation-styles')
 def citation_styles():
@@ -24,4 +28,4 @@ def citation_styles():
         {'id': 'ieee', 'name': 'IEEE Style', 'description': 'Institute of Electrical and Electronics Engineers'},
         {'id': 'harvard', 'name': 'Harvard Style', 'description': 'Harvard Referencing System'}
     ]
-    return jsonify({'citation_styles': styles})
+    return json_response({'citation_styles': styles}, request, cache_control=LISTING_CACHE_CONTROL)
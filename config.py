@@ -10,3 +10,57 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = 'uploads'
     LATEX_TEMPLATE_FOLDER = 'latex_templates'
+    LATEX_DEFAULT_TEMPLATE = 'research_paper'
+    LATEX_SECTION_CACHE_DOCUMENTS = 256  # drafts kept for incremental LaTeX
+    DATA_FOLDER = os.environ.get('DATA_FOLDER') or 'data'
+    ANALYTICS_LEXICON_PATH = os.environ.get('ANALYTICS_LEXICON_PATH')  # JSON {category: [phrases]}
+    ANALYTICS_WORKERS = int(os.environ.get('ANALYTICS_WORKERS') or os.cpu_count() or 2)  # 0 disables the pool
+    ANALYTICS_PARALLEL_THRESHOLD = 512 * 1024  # characters before analytics leave the request thread
+    ANALYTICS_SHARD_SIZE = 256 * 1024  # bytes of text per worker task
+    SYLLABLE_LEXICON_SOURCE = 'lexicons/syllables.tsv'
+    SYLLABLE_LEXICON_PATH = os.environ.get('SYLLABLE_LEXICON_PATH') or os.path.join(DATA_FOLDER, 'syllables.bin')
+    OVERLAP_SHINGLE_SIZE = 5  # words per shingle
+    OVERLAP_SIGNATURE_SIZE = 128  # MinHash bins
+    OVERLAP_LSH_BANDS = 32  # 4 bins per band
+    OVERLAP_SAMPLE_RATE = 8  # index one shingle in 8 for passage lookups
+    OVERLAP_INDEX_MAX_DOCUMENTS = int(os.environ.get('OVERLAP_INDEX_MAX_DOCUMENTS') or 10000)
+    OVERLAP_MIN_SAMPLED_MATCHES = 2  # shared sampled shingles before a document is compared in full
+    OVERLAP_FINGERPRINT_CACHE = 64  # full fingerprints rebuilt for comparison and kept
+    HTTP_TIMEOUT = 30  # seconds per upstream request on the async path
+    HTTP_MAX_CONNECTIONS = int(os.environ.get('HTTP_MAX_CONNECTIONS') or 100)
+    RESPONSE_COMPRESSION_MIN_SIZE = 1024  # bytes; smaller bodies go out as-is
+    RESPONSE_GZIP_LEVEL = 6
+    RESPONSE_BROTLI_QUALITY = 5  # brotli is used only when the package is installed
+    LISTING_CACHE_MAX_AGE = 7 * 24 * 3600  # template and citation style listings
+    DRAFT_DB_PATH = os.environ.get('DRAFT_DB_PATH') or os.path.join(DATA_FOLDER, 'drafts.sqlite3')
+    DRAFT_SNAPSHOT_INTERVAL = 32  # full copy every N versions bounds history replay
+    DRAFT_MAX_VERSIONS = int(os.environ.get('DRAFT_MAX_VERSIONS') or 500)  # per draft
+    DRAFT_RETENTION_DAYS = int(os.environ.get('DRAFT_RETENTION_DAYS') or 180)  # since the last save
+    DRAFT_COMPRESSION_LEVEL = 6
+    PAPER_DB_PATH = os.environ.get('PAPER_DB_PATH') or os.path.join(DATA_FOLDER, 'papers.sqlite3')
+    PAPER_DICTIONARY_SIZE = 32 * 1024  # zlib uses at most a 32KB preset dictionary
+    PAPER_DICTIONARY_RETRAIN_EVERY = 200  # papers compressed with one dictionary before retraining
+    PAPER_DICTIONARY_TRAINING_PAPERS = 200  # most recent papers sampled for training
+    PAPER_COMPRESSION_LEVEL = 6
+    DOI_CACHE_TTL = 30 * 24 * 3600  # 30 days for resolved DOIs
+    DOI_NEGATIVE_CACHE_TTL = 3600  # 1 hour for failed lookups
+    PDF_ENGINE_COMMAND = os.environ.get('PDF_ENGINE_COMMAND') or 'pdflatex -interaction=nonstopmode -halt-on-error -no-shell-escape {tex}'
+    PDF_ENGINE_PASSES = int(os.environ.get('PDF_ENGINE_PASSES') or 2)
+    PDF_WORKERS = int(os.environ.get('PDF_WORKERS') or 2)
+    PDF_MAX_QUEUE = int(os.environ.get('PDF_MAX_QUEUE') or 8)
+    PDF_TIMEOUT = int(os.environ.get('PDF_TIMEOUT') or 60)  # seconds per engine pass
+    PDF_MEMORY_LIMIT = 1024 * 1024 * 1024  # 1GB per engine process
+    PDF_CACHE_MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES') or 512 * 1024 * 1024)  # LRU budget for compiled PDFs
+    PDF_CACHE_GRACE = 60  # seconds a returned PDF is kept, so it is not evicted before it is sent
+    EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS') or os.cpu_count() or 2)
+    SERVER_TIMING = (os.environ.get('SERVER_TIMING') or 'false').lower() in ('1', 'true', 'yes')  # per-stage header on every response
+    SERVER_TIMING_MAX_ENTRIES = 24  # stage names listed per response
+    TRACE_EXPORTER = os.environ.get('TRACE_EXPORTER') or ''  # 'jsonl', 'otlp' or empty to export nothing
+    TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE') or 0.01)  # share of requests exported
+    TRACE_TRUST_PARENT = (os.environ.get('TRACE_TRUST_PARENT') or 'false').lower() in ('1', 'true', 'yes')  # join incoming traceparent headers; only behind a trusted proxy
+    TRACE_FILE = os.environ.get('TRACE_FILE') or os.path.join(DATA_FOLDER, 'traces.jsonl')
+    TRACE_OTLP_ENDPOINT = os.environ.get('TRACE_OTLP_ENDPOINT') or 'http://localhost:4318/v1/traces'
+    TRACE_SERVICE_NAME = os.environ.get('TRACE_SERVICE_NAME') or 'research-paper-generator'
+    TRACE_EXPORT_QUEUE = 1024  # finished traces waiting for the exporter; more are dropped
+    CITATION_GRAPH_PUSH_TOLERANCE = 1e-3  # residual left unsettled per node after an ingest
+    CITATION_GRAPH_RECOMPUTE_EVERY = 500  # changed papers between background full recomputes
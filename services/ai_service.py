@@ -1,36 +1,51 @@
-import google.generativeai as genai
-from config import Config
+from .llm import complete, complete_async, DEFAULT_MODEL
 from .citation_service import CitationService
+from .citation_linker import CitationLinker
+from .metrics import instrumented
+from .tracing import traced
 import re
 
+@instrumented('ai_service')
+@traced('ai_service')
 class AIService:
-    def __init__(self):
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-        self.citation_service = CitationService()
+    LENGTH_WORDS = {
+        'short': '800-1200 words',
+        'medium': '1500-2500 words',
+        'long': '3000-5000 words',
+        'extended': '5000+ words'
+    }
+    
+    PAPER_PROMPTS = {
+        'research': "Write a comprehensive research paper",
+        'review': "Write a detailed literature review",
+        'essay': "Write an academic essay",
+        'thesis': "Write a thesis chapter",
+        'report': "Write a technical report"
+    }
+    
+    def __init__(self, citation_service=None):
+        self.citation_service = citation_service or CitationService()
     
     def generate_paper_content(self, topic, paper_type, length, outline=None):
         """Generate paper content using OpenAI"""
-        
-        length_words = {
-            'short': '800-1200 words',
-            'medium': '1500-2500 words',
-            'long': '3000-5000 words',
-            'extended': '5000+ words'
-        }
-        
-        paper_prompts = {
-            'research': "Write a comprehensive research paper",
-            'review': "Write a detailed literature review",
-            'essay': "Write an academic essay",
-            'thesis': "Write a thesis chapter",
-            'report': "Write a technical report"
-        }
-        
-        prompt = f"""
-        {paper_prompts.get(paper_type, 'Write a research paper')} on the topic: {topic}
+        try:
+            return complete(self._paper_content_prompt(topic, paper_type, length))
+        except Exception as e:
+            return f"Error generating content: {str(e)}"
+    
+    async def generate_paper_content_async(self, topic, paper_type, length, outline=None):
+        """Async variant of generate_paper_content"""
+        try:
+            return await complete_async(self._paper_content_prompt(topic, paper_type, length))
+        except Exception as e:
+            return f"Error generating content: {str(e)}"
+    
+    def _paper_content_prompt(self, topic, paper_type, length):
+        return f"""
+        {self.PAPER_PROMPTS.get(paper_type, 'Write a research paper')} on the topic: {topic}
         
         Requirements:
-        - Length: {length_words.get(length, '1500-2500 words')}
+        - Length: {self.LENGTH_WORDS.get(length, '1500-2500 words')}
         - Include proper academic structure with introduction, body, and conclusion
         - Use formal academic writing style
         - Include placeholder citations in the format [Author, Year]
@@ -40,17 +55,23 @@ class AIService:
         Structure the paper with clear headings and subheadings.
         Make it comprehensive, well-researched, and academically rigorous.
         """
-        
-        try:
-            model = genai.GenerativeModel("models/gemini-1.5-flash")
-            response = model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"Error generating content: {str(e)}"
     
     def generate_outline(self, topic, paper_type):
         """Generate paper outline"""
-        prompt = f"""
+        try:
+            return complete(self._outline_prompt(topic, paper_type))
+        except Exception as e:
+            return f"Error generating outline: {str(e)}"
+    
+    async def generate_outline_async(self, topic, paper_type):
+        """Async variant of generate_outline"""
+        try:
+            return await complete_async(self._outline_prompt(topic, paper_type))
+        except Exception as e:
+            return f"Error generating outline: {str(e)}"
+    
+    def _outline_prompt(self, topic, paper_type):
+        return f"""
         Create a detailed outline for a {paper_type} on the topic: {topic}
         
         Include:
@@ -61,26 +82,31 @@ class AIService:
         
         Format as a structured outline with Roman numerals, letters, and numbers.
         """
-        
+    
+    def generate_with_gemini(self, prompt, model_name=DEFAULT_MODEL):
+        """Generate content using Google Gemini API"""
         try:
-            model = genai.GenerativeModel("models/gemini-1.5-flash")
-            response = model.generate_content(prompt)
-            return response.text
+            return complete(prompt, model_name)
         except Exception as e:
-            return f"Error generating outline: {str(e)}"
+            return f"Error with Gemini API: {str(e)}"
     
-    def generate_with_gemini(self, prompt, model_name="models/gemini-1.5-flash"):
-        """Generate content using Google Gemini API"""
+    async def generate_with_gemini_async(self, prompt, model_name=DEFAULT_MODEL):
+        """Async variant of generate_with_gemini"""
         try:
-            model = genai.GenerativeModel(model_name)
-            response = model.generate_content(prompt)
-            return response.text
+            return await complete_async(prompt, model_name)
         except Exception as e:
             return f"Error with Gemini API: {str(e)}"
     
     def enhance_paper_from_source(self, topic, source_content, paper_type="research"):
         """Generate enhanced paper content using source material"""
-        prompt = f"""
+        return self.generate_with_gemini(self._source_paper_prompt(topic, source_content, paper_type))
+    
+    async def enhance_paper_from_source_async(self, topic, source_content, paper_type="research"):
+        """Async variant of enhance_paper_from_source"""
+        return await self.generate_with_gemini_async(self._source_paper_prompt(topic, source_content, paper_type))
+    
+    def _source_paper_prompt(self, topic, source_content, paper_type):
+        return f"""
         Create a comprehensive {paper_type} paper on "{topic}" using the following source material as reference:
         
         Source Content:
@@ -94,15 +120,12 @@ class AIService:
         - Add placeholder citations where appropriate
         - Ensure originality while building on the source ideas
         """
-        
-        return self.generate_with_gemini(prompt)
     
     def generate_research_gaps_api(self, topic):
         """API endpoint for research gaps"""
         try:
-            from .innovation_service import InnovationService
-            innovation = InnovationService()
-            gaps = innovation.generate_research_gaps(topic)
+            from .container import get_container
+            gaps = get_container().innovation_service.generate_research_gaps(topic)
             return {'success': True, 'research_gaps': gaps}
         except Exception as e:
             return {'success': False, 'error': str(e)}
@@ -115,35 +138,41 @@ class AIService:
         if not papers:
             return self.generate_paper_content(topic, paper_type, length)
         
-        # Create citations list for the prompt
+        prompt, citations_info = self._citations_prompt(topic, paper_type, length, citation_style, papers)
+        try:
+            return self._with_bibliography(complete(prompt), citations_info)
+        except Exception as e:
+            return f"Error generating content with citations: {str(e)}"
+    
+    async def generate_paper_with_citations_async(self, topic, paper_type, length, citation_style='apa'):
+        """Async variant of generate_paper_with_citations"""
+        papers = await self.citation_service.search_papers_async(topic, max_results=15)
+        
+        if not papers:
+            return await self.generate_paper_content_async(topic, paper_type, length)
+        
+        prompt, citations_info = self._citations_prompt(topic, paper_type, length, citation_style, papers)
+        try:
+            return self._with_bibliography(await complete_async(prompt), citations_info)
+        except Exception as e:
+            return f"Error generating content with citations: {str(e)}"
+    
+    def _citations_prompt(self, topic, paper_type, length, citation_style, papers):
+        """Prompt citing the most authoritative papers, and the numbered citations it lists"""
         citations_info = []
+        papers = self.citation_service.rank_by_authority(papers)
         for i, paper in enumerate(papers[:10], 1):
             citation = self.citation_service.format_citation(paper, citation_style)
             citations_info.append(f"[{i}] {citation}")
         
-        length_words = {
-            'short': '800-1200 words',
-            'medium': '1500-2500 words', 
-            'long': '3000-5000 words',
-            'extended': '5000+ words'
-        }
-        
-        paper_prompts = {
-            'research': "Write a comprehensive research paper",
-            'review': "Write a detailed literature review",
-            'essay': "Write an academic essay",
-            'thesis': "Write a thesis chapter",
-            'report': "Write a technical report"
-        }
-        
         prompt = f"""
-        {paper_prompts.get(paper_type, 'Write a research paper')} on the topic: {topic}
+        {self.PAPER_PROMPTS.get(paper_type, 'Write a research paper')} on the topic: {topic}
         
         Use these real academic sources and cite them appropriately:
         {chr(10).join(citations_info)}
         
         Requirements:
-        - Length: {length_words.get(length, '1500-2500 words')}
+        - Length: {self.LENGTH_WORDS.get(length, '1500-2500 words')}
         - Include proper academic structure with introduction, body, and conclusion
         - Use formal academic writing style
         - Cite the provided sources using [1], [2], etc. format throughout the text
@@ -155,54 +184,36 @@ class AIService:
         Make it comprehensive, well-researched, and academically rigorous.
         End with a "References" section listing all cited sources.
         """
-        
-        try:
-            model = genai.GenerativeModel("models/gemini-1.5-flash")
-            response = model.generate_content(prompt)
-            content = response.text
-            
-            # Add bibliography if not present
-            if "References" not in content and "Bibliography" not in content:
-                content += "\n\n## References\n\n"
-                for citation in citations_info:
-                    content += f"{citation}\n\n"
-            
-            return content
-        except Exception as e:
-            return f"Error generating content with citations: {str(e)}"
+        return prompt, citations_info
+    
+    def _with_bibliography(self, content, citations_info):
+        """Add bibliography if not present"""
+        if "References" not in content and "Bibliography" not in content:
+            content += "\n\n## References\n\n"
+            for citation in citations_info:
+                content += f"{citation}\n\n"
+        return content
     
     def enhance_citations_in_content(self, content, topic, citation_style='apa'):
         """Add real citations to existing content"""
+        return self.link_citations_in_content(content, topic, citation_style)['content']
+    
+    def link_citations_in_content(self, content, topic, citation_style='apa'):
+        """Resolve [Author, Year] placeholders against real papers"""
         papers = self.citation_service.search_papers(topic, max_results=10)
         
         if not papers:
-            return content
+            return {'content': content, 'references': [], 'unresolved': []}
         
-        # Find placeholder citations and replace with real ones
-        placeholder_pattern = r'\[([^\]]+, \d{4})\]'
-        placeholders = re.findall(placeholder_pattern, content)
+        result = CitationLinker(papers).link(content)
+        enhanced_content = result['content']
         
-        citations_info = []
-        for i, paper in enumerate(papers[:len(placeholders) if placeholders else 8], 1):
-            citation = self.citation_service.format_citation(paper, citation_style)
-            citations_info.append(f"[{i}] {citation}")
-        
-        # Replace placeholders with numbered citations
-        citation_counter = 1
-        def replace_citation(match):
-            nonlocal citation_counter
-            if citation_counter <= len(citations_info):
-                result = f"[{citation_counter}]"
-                citation_counter += 1
-                return result
-            return match.group(0)
-        
-        enhanced_content = re.sub(placeholder_pattern, replace_citation, content)
-        
-        # Add bibliography
-        if citations_info:
+        # Add bibliography for the sources that were actually cited
+        if result['references']:
             enhanced_content += "\n\n## References\n\n"
-            for citation in citations_info:
-                enhanced_content += f"{citation}\n\n"
+            for reference in result['references']:
+                citation = self.citation_service.format_citation(reference['paper'], citation_style)
+                enhanced_content += f"[{reference['number']}] {citation}\n\n"
         
-        return enhanced_content
\ No newline at end of file
+        result['content'] = enhanced_content
+        return result
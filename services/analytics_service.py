@@ -1,29 +1,63 @@
 import re
 import json
+import math
 from collections import Counter
 from datetime import datetime
+from config import Config
+from .document_features import DocumentFeatures, FeatureCache
+from .phrase_matcher import build_matcher
+from .parallel_analytics import get_parallel_analytics
+from .syllable_lexicon import syllable_totals
+from .metrics import instrumented
 
+@instrumented('analytics_service')
 class AnalyticsService:
-    def __init__(self):
-        pass
+    INDICATOR_LEXICONS = {
+        'academic': ['however', 'furthermore', 'consequently', 'nevertheless', 'therefore', 'moreover'],
+        'claim': ['argue', 'claim', 'assert', 'propose', 'suggest'],
+        'evidence': ['evidence', 'data', 'research', 'study', 'findings'],
+        'transition': ['however', 'furthermore', 'in contrast', 'similarly', 'therefore']
+    }
+    
+    def __init__(self, lexicon_path=None, parallel=None):
+        self.lexicon_path = lexicon_path or Config.ANALYTICS_LEXICON_PATH
+        self.feature_cache = FeatureCache()
+        self.phrase_matcher = build_matcher(self.INDICATOR_LEXICONS, self.lexicon_path)
+        self.parallel = parallel if parallel is not None else get_parallel_analytics()
+    
+    def extract_features(self, content):
+        """Tokenize content once; accepts already extracted features"""
+        if isinstance(content, DocumentFeatures):
+            return content
+        return self.feature_cache.get(content, self._extract)
+    
+    def _extract(self, content, digest):
+        """Extract locally, or shard large documents across the analytics pool"""
+        if self.parallel and len(content or '') >= self.parallel.threshold:
+            return self.parallel.extract(content, digest, self.lexicon_path)
+        return DocumentFeatures.from_content(content, digest)
     
     def analyze_readability(self, content):
         """Analyze content readability and complexity"""
-        sentences = re.split(r'[.!?]+', content)
-        words = content.split()
-        
+        features = self.extract_features(content)
+        return dict(features.memo('readability', lambda: self._readability(features)))
+    
+    def _readability(self, features):
+        """Readability metrics from extracted features"""
         # Basic metrics
-        word_count = len(words)
-        sentence_count = len([s for s in sentences if s.strip()])
+        word_count = features.word_count
+        sentence_count = features.sentence_count
         avg_words_per_sentence = word_count / max(sentence_count, 1)
         
         # Complex word analysis
-        complex_words = [w for w in words if len(w) > 6]
-        complex_word_ratio = len(complex_words) / max(word_count, 1)
+        complex_word_ratio = features.complex_word_count / max(word_count, 1)
         
         # Academic vocabulary analysis
-        academic_indicators = ['however', 'furthermore', 'consequently', 'nevertheless', 'therefore', 'moreover']
-        academic_score = sum(1 for word in words if word.lower() in academic_indicators)
+        academic_score = self._indicators(features)['counts']['academic']
+        
+        # Syllable-based formulas
+        syllables, polysyllables = self._syllables(features)
+        formulas = self.readability_formulas(word_count, sentence_count, syllables, polysyllables)
         
         return {
             'word_count': word_count,
@@ -31,30 +65,84 @@ class AnalyticsService:
             'avg_words_per_sentence': round(avg_words_per_sentence, 2),
             'complex_word_ratio': round(complex_word_ratio, 3),
             'academic_score': academic_score,
-            'readability_level': self._calculate_readability_level(avg_words_per_sentence, complex_word_ratio)
+            'syllables_per_word': round(syllables / max(word_count, 1), 2),
+            'flesch_reading_ease': round(formulas['flesch_reading_ease'], 1),
+            'flesch_kincaid_grade': round(formulas['flesch_kincaid_grade'], 1),
+            'gunning_fog': round(formulas['gunning_fog'], 1),
+            'smog_index': round(formulas['smog_index'], 1),
+            'readability_level': self._calculate_readability_level(formulas['flesch_kincaid_grade'])
         }
     
-    def _calculate_readability_level(self, avg_words, complex_ratio):
-        """Calculate readability level"""
-        if avg_words > 20 and complex_ratio > 0.3:
+    @staticmethod
+    def readability_formulas(word_count, sentence_count, syllables, polysyllables):
+        """Flesch reading ease, Flesch-Kincaid grade, Gunning Fog and SMOG (unrounded)"""
+        if not word_count:
+            return {'flesch_reading_ease': 0.0, 'flesch_kincaid_grade': 0.0, 'gunning_fog': 0.0, 'smog_index': 0.0}
+        
+        words_per_sentence = word_count / max(sentence_count, 1)
+        syllables_per_word = syllables / word_count
+        return {
+            'flesch_reading_ease': 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word,
+            'flesch_kincaid_grade': 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59,
+            'gunning_fog': 0.4 * (words_per_sentence + 100 * polysyllables / word_count),
+            'smog_index': 1.0430 * math.sqrt(polysyllables * 30 / max(sentence_count, 1)) + 3.1291
+        }
+    
+    def _calculate_readability_level(self, grade):
+        """Calculate readability level from the Flesch-Kincaid grade"""
+        if grade >= 16:
             return "Graduate"
-        elif avg_words > 15 and complex_ratio > 0.2:
+        elif grade >= 13:
             return "Undergraduate"
-        elif avg_words > 12:
+        elif grade >= 9:
             return "High School"
         else:
             return "General Public"
     
+    def _syllables(self, features):
+        """(syllables, polysyllabic words) for a document, memoized"""
+        return features.memo('syllables', lambda: syllable_totals(features.token_counts))
+    
+    def analyze_vocabulary(self, content):
+        """Counts and character positions of every indicator phrase, by category"""
+        indicators = self._indicators(self.extract_features(content))
+        return {
+            'counts': dict(indicators['counts']),
+            'positions': {
+                category: [{'start': start, 'end': end, 'phrase': phrase} for start, end, phrase in matches]
+                for category, matches in indicators['positions'].items()
+            }
+        }
+    
+    def analyze_totals(self, word_count, sentence_count, complex_word_count, indicator_counts,
+                       syllables=0, polysyllables=0):
+        """Full analytics from running counters kept by streaming or incremental analysis"""
+        features = DocumentFeatures(None, None, word_count, sentence_count, complex_word_count)
+        features.results['indicators'] = {'counts': indicator_counts, 'positions': None}
+        features.results['syllables'] = (syllables, polysyllables)
+        return {
+            'readability': self.analyze_readability(features),
+            'argument_structure': self.analyze_argument_structure(features),
+            'quality_score': self.generate_quality_score(features),
+            'suggestions': self.generate_improvement_suggestions(features)
+        }
+    
+    def _indicators(self, features):
+        """Single phrase-matcher scan shared by every indicator metric"""
+        return features.memo('indicators', lambda: self.phrase_matcher.scan(features.content))
+    
     def analyze_argument_structure(self, content):
         """Analyze argument structure and flow"""
+        features = self.extract_features(content)
+        return dict(features.memo('argument_structure', lambda: self._argument_structure(features)))
+    
+    def _argument_structure(self, features):
+        """Argument metrics from extracted features"""
         # Identify argument indicators
-        claim_indicators = ['argue', 'claim', 'assert', 'propose', 'suggest']
-        evidence_indicators = ['evidence', 'data', 'research', 'study', 'findings']
-        transition_indicators = ['however', 'furthermore', 'in contrast', 'similarly', 'therefore']
-        
-        claims = sum(1 for word in content.lower().split() if word in claim_indicators)
-        evidence = sum(1 for word in content.lower().split() if word in evidence_indicators)
-        transitions = sum(1 for word in content.lower().split() if word in transition_indicators)
+        counts = self._indicators(features)['counts']
+        claims = counts['claim']
+        evidence = counts['evidence']
+        transitions = counts['transition']
         
         return {
             'claim_density': claims,
@@ -66,8 +154,13 @@ class AnalyticsService:
     
     def generate_improvement_suggestions(self, content):
         """Generate specific improvement suggestions"""
-        readability = self.analyze_readability(content)
-        argument = self.analyze_argument_structure(content)
+        features = self.extract_features(content)
+        return list(features.memo('suggestions', lambda: self._suggestions(features)))
+    
+    def _suggestions(self, features):
+        """Improvement suggestions from extracted features"""
+        readability = self.analyze_readability(features)
+        argument = self.analyze_argument_structure(features)
         
         suggestions = []
         
@@ -89,8 +182,13 @@ class AnalyticsService:
     
     def generate_quality_score(self, content):
         """Generate overall quality score"""
-        readability = self.analyze_readability(content)
-        argument = self.analyze_argument_structure(content)
+        features = self.extract_features(content)
+        return dict(features.memo('quality_score', lambda: self._quality_score(features)))
+    
+    def _quality_score(self, features):
+        """Quality score from extracted features"""
+        readability = self.analyze_readability(features)
+        argument = self.analyze_argument_structure(features)
         
         # Scoring algorithm
         readability_score = min(100, (readability['academic_score'] * 5) + 50)
@@ -0,0 +1,218 @@
+from .analytics_service import AnalyticsService
+from .metrics import instrumented
+
+# Column order of the per-document feature matrix
+FEATURES = ['word_count', 'sentence_count', 'complex_word_count', 'syllables', 'polysyllables',
+            'academic', 'claim', 'evidence', 'transition']
+DISTRIBUTION_PERCENTILES = [5, 25, 50, 75, 95]
+
+def _numpy():
+    """Import NumPy on first use so the rest of the app runs without it"""
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError('Batch quality scoring requires numpy (pip install numpy)')
+    return numpy
+
+@instrumented('batch_analytics')
+class BatchAnalyticsService:
+    """Score many documents at once with array operations over feature vectors"""
+    
+    # Same wording and order as AnalyticsService.generate_improvement_suggestions
+    SUGGESTIONS = [
+        "Consider breaking down long sentences for better readability",
+        "Balance complex terminology with clearer explanations",
+        "Strengthen arguments with more evidence and supporting data",
+        "Add more transitional phrases to improve logical flow"
+    ]
+    
+    def __init__(self, analytics_service=None):
+        self.analytics_service = analytics_service or AnalyticsService()
+    
+    def feature_matrix(self, contents):
+        """One row of FEATURES per document"""
+        np = _numpy()
+        parallel = self.analytics_service.parallel
+        if parallel and sum(len(content or '') for content in contents) >= parallel.threshold:
+            return self._parallel_feature_matrix(np, parallel, contents)
+        
+        matrix = np.zeros((len(contents), len(FEATURES)), dtype=np.int64)
+        for row, content in enumerate(contents):
+            features = self.analytics_service.extract_features(content)
+            counts = self.analytics_service._indicators(features)['counts']
+            syllables, polysyllables = self.analytics_service._syllables(features)
+            matrix[row] = (
+                features.word_count,
+                features.sentence_count,
+                features.complex_word_count,
+                syllables,
+                polysyllables,
+                counts['academic'],
+                counts['claim'],
+                counts['evidence'],
+                counts['transition']
+            )
+        return matrix
+    
+    def _parallel_feature_matrix(self, np, parallel, contents):
+        """Feature rows computed by the analytics pool, documents batched per task"""
+        summaries = parallel.summarize_many(contents, self.analytics_service.lexicon_path)
+        return np.array([
+            (
+                summary['words'],
+                summary['sentences'],
+                summary['complex_words'],
+                summary['syllables'],
+                summary['polysyllables'],
+                summary['indicators']['counts']['academic'],
+                summary['indicators']['counts']['claim'],
+                summary['indicators']['counts']['evidence'],
+                summary['indicators']['counts']['transition']
+            )
+            for summary in summaries
+        ], dtype=np.int64).reshape(len(contents), len(FEATURES))
+    
+    def score(self, contents, percentiles=None):
+        """Per-document analytics identical to AnalyticsService, plus corpus distributions"""
+        np = _numpy()
+        matrix = self.feature_matrix(contents)
+        (word_count, sentence_count, complex_words, syllables, polysyllables,
+         academic, claims, evidence, transitions) = matrix.T
+        
+        # Readability
+        avg_words = word_count / np.maximum(sentence_count, 1)
+        complex_ratio = complex_words / np.maximum(word_count, 1)
+        formulas = self.readability_formulas(np, word_count, sentence_count, syllables, polysyllables)
+        levels = np.select(
+            [formulas['flesch_kincaid_grade'] >= 16, formulas['flesch_kincaid_grade'] >= 13,
+             formulas['flesch_kincaid_grade'] >= 9],
+            ['Graduate', 'Undergraduate', 'High School'],
+            default='General Public'
+        )
+        syllables_per_word = self._round(syllables / np.maximum(word_count, 1), 2)
+        rounded_formulas = {name: self._round(values, 1) for name, values in formulas.items()}
+        
+        # Argument structure; later scores use the rounded balance like the per-document path
+        balance = self._round(evidence / np.maximum(claims, 1), 2)
+        
+        # Quality score
+        readability_score = np.minimum(100, academic * 5 + 50)
+        argument_score = np.minimum(100, balance * 30 + transitions * 5)
+        overall_score = (readability_score + argument_score) / 2
+        grades = np.select(
+            [overall_score >= 90, overall_score >= 80, overall_score >= 70, overall_score >= 60],
+            ['A', 'B', 'C', 'D'],
+            default='F'
+        )
+        
+        avg_words_rounded = self._round(avg_words, 2)
+        complex_ratio_rounded = self._round(complex_ratio, 3)
+        overall_rounded = self._round(overall_score, 1)
+        suggestion_flags = np.stack([
+            avg_words_rounded > 25,
+            complex_ratio_rounded > 0.4,
+            balance < 0.5,
+            transitions < 5
+        ], axis=1)
+        
+        results = []
+        columns = zip(
+            matrix.tolist(), avg_words_rounded.tolist(), complex_ratio_rounded.tolist(), levels.tolist(),
+            syllables_per_word.tolist(), rounded_formulas['flesch_reading_ease'].tolist(),
+            rounded_formulas['flesch_kincaid_grade'].tolist(), rounded_formulas['gunning_fog'].tolist(),
+            rounded_formulas['smog_index'].tolist(),
+            balance.tolist(), readability_score.tolist(), argument_score.tolist(), overall_rounded.tolist(),
+            grades.tolist(), suggestion_flags.tolist()
+        )
+        for (row, avg, ratio, level, per_word, flesch, grade_level, fog, smog,
+             arg_balance, r_score, a_score, overall, grade, flags) in columns:
+            row = dict(zip(FEATURES, row))
+            results.append({
+                'readability': {
+                    'word_count': row['word_count'],
+                    'sentence_count': row['sentence_count'],
+                    'avg_words_per_sentence': avg,
+                    'complex_word_ratio': ratio,
+                    'academic_score': row['academic'],
+                    'syllables_per_word': per_word,
+                    'flesch_reading_ease': flesch,
+                    'flesch_kincaid_grade': grade_level,
+                    'gunning_fog': fog,
+                    'smog_index': smog,
+                    'readability_level': level
+                },
+                'argument_structure': {
+                    'claim_density': row['claim'],
+                    'evidence_density': row['evidence'],
+                    'transition_density': row['transition'],
+                    'argument_balance': arg_balance,
+                    'flow_score': row['transition']
+                },
+                'quality_score': {
+                    'overall_score': overall,
+                    'readability_score': r_score,
+                    # min(100, x) keeps the int 100 when the score is capped
+                    'argument_score': 100 if a_score >= 100 else round(a_score, 1),
+                    'grade': grade
+                },
+                'suggestions': [text for text, flag in zip(self.SUGGESTIONS, flags) if flag]
+            })
+        
+        metrics = {
+            'word_count': word_count,
+            'avg_words_per_sentence': avg_words,
+            'complex_word_ratio': complex_ratio,
+            'flesch_reading_ease': formulas['flesch_reading_ease'],
+            'flesch_kincaid_grade': formulas['flesch_kincaid_grade'],
+            'gunning_fog': formulas['gunning_fog'],
+            'smog_index': formulas['smog_index'],
+            'argument_balance': balance,
+            'readability_score': readability_score,
+            'argument_score': argument_score,
+            'overall_score': overall_score
+        }
+        return {
+            'results': results,
+            'distribution': self.distribution(metrics, percentiles or DISTRIBUTION_PERCENTILES),
+            'grades': {str(grade): int(count) for grade, count in zip(*np.unique(grades, return_counts=True))}
+        }
+    
+    @staticmethod
+    def readability_formulas(np, word_count, sentence_count, syllables, polysyllables):
+        """Array form of AnalyticsService.readability_formulas, same operation order"""
+        empty = word_count == 0
+        words = np.maximum(word_count, 1)
+        words_per_sentence = word_count / np.maximum(sentence_count, 1)
+        syllables_per_word = syllables / words
+        formulas = {
+            'flesch_reading_ease': 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word,
+            'flesch_kincaid_grade': 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59,
+            'gunning_fog': 0.4 * (words_per_sentence + 100 * polysyllables / words),
+            'smog_index': 1.0430 * np.sqrt(polysyllables * 30 / np.maximum(sentence_count, 1)) + 3.1291
+        }
+        return {name: np.where(empty, 0.0, values) for name, values in formulas.items()}
+    
+    def distribution(self, metrics, percentiles):
+        """Mean, spread and percentiles for each corpus metric"""
+        np = _numpy()
+        summary = {}
+        for name, values in metrics.items():
+            values = np.asarray(values, dtype=np.float64)
+            if not values.size:
+                summary[name] = {}
+                continue
+            points = np.percentile(values, percentiles)
+            summary[name] = {
+                'mean': round(float(values.mean()), 3),
+                'std': round(float(values.std()), 3),
+                'min': round(float(values.min()), 3),
+                'max': round(float(values.max()), 3),
+                'percentiles': {f"p{p:g}": round(float(v), 3) for p, v in zip(percentiles, points)}
+            }
+        return summary
+    
+    @staticmethod
+    def _round(values, digits):
+        """Python round() per element so results match the per-document path exactly"""
+        np = _numpy()
+        return np.array([round(value, digits) for value in values.tolist()], dtype=np.float64)
@@ -0,0 +1,149 @@
+import json
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from config import Config
+from .zip_stream import zip_stream
+from .metrics import instrumented
+
+_worker_latex_service = None
+
+def render_export_item(item):
+    """Render one paper to .tex and .bib inside a worker process"""
+    global _worker_latex_service
+    if _worker_latex_service is None:
+        from .latex_service import LatexService
+        _worker_latex_service = LatexService()
+    
+    service = _worker_latex_service
+    content = item.get('paper_content') or item.get('content')
+    if not content:
+        raise ValueError('Paper content is required')
+    
+    template = item.get('template') or Config.LATEX_DEFAULT_TEMPLATE
+    latex = service.generate_latex(
+        content=content,
+        title=item.get('title'),
+        author=item.get('author', 'Research Assistant'),
+        template=template,
+        bibliography='references'
+    )
+    bibtex = service.generate_bibtex(item.get('citations') or [], content)
+    return latex, bibtex
+
+@instrumented('bulk_export_service')
+class BulkExportService:
+    """Render many papers in parallel and stream them into one ZIP archive"""
+    
+    def __init__(self, workers=None, paper_loader=None):
+        self.workers = workers or Config.EXPORT_WORKERS
+        self.paper_loader = paper_loader
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def _pool(self):
+        """Create the worker pool on first use"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+    
+    def _replace_pool(self, broken):
+        """Drop a pool that a dead worker broke and return a working one"""
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+        return self._pool()
+    
+    def resolve_items(self, papers=None, paper_ids=None):
+        """Combine inline papers and stored paper ids into export items"""
+        items = [dict(paper) for paper in papers or []]
+        for paper_id in paper_ids or []:
+            paper = self.paper_loader(paper_id) if self.paper_loader else None
+            items.append(paper if paper is not None else {'paper_id': paper_id, 'missing': True})
+        return items
+    
+    def stream(self, items, default_template=None):
+        """Yield ZIP chunks; each paper is written as soon as its render finishes"""
+        return zip_stream(self._entries(items, default_template))
+    
+    def _entries(self, items, default_template):
+        """Archive entries in completion order, followed by a manifest"""
+        pool = self._pool()
+        manifest = []
+        pending = {}
+        retried = set()
+        queue = iter(enumerate(items, 1))
+        window = self.workers * 2
+        
+        def submit(index, name, item):
+            nonlocal pool
+            try:
+                future = pool.submit(render_export_item, item)
+            except BrokenProcessPool:
+                pool = self._replace_pool(pool)
+                future = pool.submit(render_export_item, item)
+            pending[future] = (index, name, item)
+        
+        def submit_next():
+            for index, item in queue:
+                name = self._entry_name(index, item)
+                if item.get('missing'):
+                    manifest.append({'index': index, 'name': name, 'paper_id': item.get('paper_id'),
+                                     'status': 'error', 'error': 'Unknown paper id'})
+                    continue
+                if default_template and not item.get('template'):
+                    item['template'] = default_template
+                submit(index, name, item)
+                return True
+            return False
+        
+        while len(pending) < window and submit_next():
+            pass
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, name, item = pending.pop(future)
+                record = {'index': index, 'name': name, 'paper_id': item.get('paper_id'), 'title': item.get('title')}
+                try:
+                    latex, bibtex = future.result()
+                except BrokenProcessPool as e:
+                    # A dead worker fails every task in its pool; each gets one more try, and submit replaces the pool
+                    if index not in retried:
+                        retried.add(index)
+                        submit(index, name, item)
+                        continue
+                    record.update({'status': 'error', 'error': str(e)})
+                except Exception as e:
+                    record.update({'status': 'error', 'error': str(e)})
+                else:
+                    record['status'] = 'ok'
+                    yield f'{name}/{name}.tex', latex
+                    yield f'{name}/references.bib', bibtex
+                manifest.append(record)
+                
+                while len(pending) < window and submit_next():
+                    pass
+        
+        manifest.sort(key=lambda record: record['index'])
+        summary = {
+            'total': len(manifest),
+            'succeeded': sum(1 for record in manifest if record['status'] == 'ok'),
+            'failed': sum(1 for record in manifest if record['status'] == 'error'),
+            'items': manifest
+        }
+        yield 'manifest.json', json.dumps(summary, indent=2)
+    
+    @staticmethod
+    def _entry_name(index, item):
+        """Unique, filesystem-safe folder name for an archive entry"""
+        label = item.get('filename') or item.get('title') or item.get('paper_id') or 'paper'
+        label = re.sub(r'[^A-Za-z0-9_-]+', '_', str(label)).strip('_')[:60] or 'paper'
+        return f"{index:03d}_{label}"
@@ -0,0 +1,332 @@
+import math
+import os
+import sqlite3
+import threading
+from collections import deque
+from config import Config
+
+class CitationGraph:
+    """Persistent citation graph with incrementally maintained PageRank-style authority scores"""
+    
+    def __init__(self, path=None, damping=0.85, tolerance=1e-6, max_iterations=100,
+                 push_tolerance=None, recompute_every=None):
+        self.path = path
+        self.damping = damping
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.push_tolerance = Config.CITATION_GRAPH_PUSH_TOLERANCE if push_tolerance is None else push_tolerance
+        self.recompute_every = Config.CITATION_GRAPH_RECOMPUTE_EVERY if recompute_every is None else recompute_every
+        
+        # Sparse adjacency: doi -> set of cited dois, plus the reverse index
+        self.references = {}
+        self.cited_by = {}
+        self.cited_by_count = {}
+        self.metadata = {}
+        
+        # Unnormalized scores x of x = (1 - d) w + d A x, with the prior w from global citation counts.
+        # The residual r = (1 - d) w + d A x - x is what x still lacks; pushing a node's residual moves
+        # it into its score and passes the damped share on to the works it cites.
+        self._rank = {}
+        self._residual = {}
+        self._total = 0.0
+        self._changes = 0
+        # Graph changes made while a background recompute runs, replayed onto its result
+        self._journal = None
+        self._lock = threading.RLock()
+        self._db = None
+        
+        if path:
+            self._open()
+    
+    @staticmethod
+    def normalize_doi(doi):
+        """Normalize DOI for use as a graph key"""
+        if not doi:
+            return ''
+        doi = doi.strip().lower()
+        for prefix in ('https://doi.org/', 'http://doi.org/', 'http://dx.doi.org/', 'doi:'):
+            if doi.startswith(prefix):
+                doi = doi[len(prefix):]
+        return doi
+    
+    def ingest(self, papers):
+        """Add parsed records to the graph, updating scores only around what changed"""
+        changed = 0
+        
+        with self._lock:
+            pending = []
+            dirty = set()
+            new_edges = []
+            for paper in papers:
+                doi = self.normalize_doi(paper.get('doi'))
+                if not doi:
+                    continue
+                
+                references = {self.normalize_doi(ref) for ref in paper.get('references', [])}
+                references.discard('')
+                references.discard(doi)
+                
+                paper_changed = False
+                self._add_node(doi, pending)
+                old_refs = self.references.get(doi, set())
+                new_refs = references - old_refs
+                if new_refs or doi not in self.references:
+                    for ref in new_refs:
+                        self._add_node(ref, pending)
+                        self.cited_by.setdefault(ref, set()).add(doi)
+                    updated = old_refs | new_refs
+                    self._relink(doi, tuple(old_refs), tuple(updated), pending)
+                    self.references[doi] = updated
+                    new_edges.extend((doi, ref) for ref in new_refs)
+                    dirty.update(new_refs)
+                    paper_changed = True
+                
+                count = paper.get('cited_by_count') or 0
+                if count != self.cited_by_count.get(doi):
+                    old_weight = self._weight(doi)
+                    self.cited_by_count[doi] = count
+                    self._reweight(doi, old_weight, self._weight(doi), pending)
+                    paper_changed = True
+                
+                meta = {'title': paper.get('title', ''), 'year': paper.get('year')}
+                if self.metadata.get(doi) != meta:
+                    self.metadata[doi] = meta
+                    paper_changed = True
+                
+                if paper_changed:
+                    dirty.add(doi)
+                    changed += 1
+            
+            if changed:
+                dirty |= self._push(pending)
+                self._save(dirty, new_edges)
+                self._changes += changed
+                if self._changes >= self.recompute_every:
+                    self._changes = 0
+                    self.recompute()
+        
+        return changed > 0
+    
+    def authority(self, doi, default=0.0):
+        """Authority of a work relative to the average node (1.0 == average)"""
+        rank = self._rank.get(self.normalize_doi(doi))
+        if rank is None or self._total <= 0:
+            return default
+        return rank * len(self._rank) / self._total
+    
+    def rank(self, papers):
+        """Sort papers by authority, keeping input order for ties"""
+        return sorted(papers, key=lambda paper: -self.authority(paper.get('doi')))
+    
+    def top(self, limit=10, dois=None):
+        """Return the most authoritative works, optionally within a candidate set"""
+        with self._lock:
+            candidates = self._rank if dois is None else {
+                self.normalize_doi(doi) for doi in dois
+            }
+            ranked = sorted(
+                (doi for doi in candidates if doi in self._rank),
+                key=lambda doi: -self._rank[doi]
+            )
+            
+            return [{
+                'doi': doi,
+                'title': self.metadata.get(doi, {}).get('title', ''),
+                'year': self.metadata.get(doi, {}).get('year'),
+                'authority': round(self.authority(doi), 4),
+                'local_citations': len(self.cited_by.get(doi, ())),
+                'cited_by_count': self.cited_by_count.get(doi, 0)
+            } for doi in ranked[:limit]]
+    
+    def recompute(self):
+        """Start a full power-iteration recompute on a background thread, unless one is running"""
+        with self._lock:
+            if self._journal is not None:
+                return False
+            self._journal = []
+            snapshot = (
+                {doi: tuple(refs) for doi, refs in self.references.items()},
+                {doi: self._weight(doi) for doi in self._rank},
+                dict(self._rank)
+            )
+        threading.Thread(
+            target=self._recompute, args=snapshot, name='citation-graph-recompute', daemon=True
+        ).start()
+        return True
+    
+    def _weight(self, doi):
+        """Teleport weight, biased by global citation counts from CrossRef"""
+        return 1.0 + math.log1p(self.cited_by_count.get(doi, 0))
+    
+    def _add_node(self, doi, pending):
+        if doi not in self._rank:
+            self._rank[doi] = 0.0
+            self._reweight(doi, 0.0, self._weight(doi), pending)
+    
+    def _reweight(self, doi, old_weight, new_weight, pending):
+        """Keep the residual invariant after a node's prior changes"""
+        if self._journal is not None:
+            self._journal.append(('weight', doi, old_weight, new_weight))
+        self._residual[doi] = self._residual.get(doi, 0.0) + (1.0 - self.damping) * (new_weight - old_weight)
+        pending.append(doi)
+    
+    def _relink(self, source, old_targets, new_targets, pending):
+        """Keep the residual invariant after a node's reference list changes"""
+        if self._journal is not None:
+            self._journal.append(('links', source, old_targets, new_targets))
+        rank = self._rank.get(source, 0.0)
+        if not rank:
+            return
+        residual = self._residual
+        if old_targets:
+            share = self.damping * rank / len(old_targets)
+            for target in old_targets:
+                residual[target] = residual.get(target, 0.0) - share
+                pending.append(target)
+        if new_targets:
+            share = self.damping * rank / len(new_targets)
+            for target in new_targets:
+                residual[target] = residual.get(target, 0.0) + share
+                pending.append(target)
+    
+    def _push(self, pending):
+        """Settle residuals above push_tolerance, starting from the given nodes; return nodes whose score moved"""
+        rank, residual, references = self._rank, self._residual, self.references
+        damping, tolerance = self.damping, self.push_tolerance
+        touched = set()
+        pending = deque(pending)
+        while pending:
+            doi = pending.popleft()
+            amount = residual.get(doi, 0.0)
+            if abs(amount) <= tolerance:
+                continue
+            residual[doi] = 0.0
+            rank[doi] += amount
+            self._total += amount
+            touched.add(doi)
+            targets = references.get(doi)
+            if targets:
+                share = damping * amount / len(targets)
+                for target in targets:
+                    value = residual.get(target, 0.0) + share
+                    residual[target] = value
+                    if abs(value) > tolerance:
+                        pending.append(target)
+        return touched
+    
+    def _recompute(self, references, weights, rank):
+        """Power iteration over a snapshot, then swap it in and replay the changes made meanwhile"""
+        damping = self.damping
+        base = {doi: (1.0 - damping) * weight for doi, weight in weights.items()}
+        for _ in range(self.max_iterations):
+            new_rank = dict(base)
+            for source, targets in references.items():
+                if targets:
+                    share = damping * rank[source] / len(targets)
+                    for target in targets:
+                        new_rank[target] += share
+            delta = sum(abs(new_rank[doi] - rank[doi]) for doi in new_rank)
+            rank = new_rank
+            if delta <= self.tolerance * sum(rank.values()):
+                break
+        
+        # What the iteration left unconverged, as residuals on the snapshot graph
+        residual = dict(base)
+        for source, targets in references.items():
+            if targets:
+                share = damping * rank[source] / len(targets)
+                for target in targets:
+                    residual[target] += share
+        for doi, value in rank.items():
+            residual[doi] -= value
+        
+        with self._lock:
+            journal, self._journal = self._journal, None
+            self._rank, self._residual, self._total = rank, residual, sum(rank.values())
+            pending = []
+            for kind, doi, old, new in journal:
+                if kind == 'weight':
+                    self._rank.setdefault(doi, 0.0)
+                    self._reweight(doi, old, new, pending)
+                else:
+                    self._relink(doi, old, new, pending)
+            pending.extend(doi for doi, value in residual.items() if abs(value) > self.push_tolerance)
+            self._push(pending)
+            snapshot = list(self._rank)
+        
+        # Stored scores only warm-start the next load, so chunks may interleave with ingests
+        for start in range(0, len(snapshot), 2000):
+            with self._lock:
+                self._save(snapshot[start:start + 2000], ())
+    
+    def _open(self):
+        """Open the SQLite store and load the graph into memory"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS citation_nodes ("
+            "doi TEXT PRIMARY KEY, title TEXT, year INTEGER, cited_by_count INTEGER, "
+            "rank REAL NOT NULL DEFAULT 0);"
+            "CREATE TABLE IF NOT EXISTS citation_edges ("
+            "source TEXT NOT NULL, target TEXT NOT NULL, PRIMARY KEY (source, target)) WITHOUT ROWID;"
+        )
+        self._db.commit()
+        
+        for doi, title, year, count, rank in self._db.execute(
+            "SELECT doi, title, year, cited_by_count, rank FROM citation_nodes"
+        ):
+            self._rank[doi] = rank
+            # Only ingested works carry metadata; nodes known from reference lists do not
+            if title is not None:
+                self.metadata[doi] = {'title': title, 'year': year}
+                self.references[doi] = set()
+            if count is not None:
+                self.cited_by_count[doi] = count
+        for source, target in self._db.execute("SELECT source, target FROM citation_edges"):
+            self.references.setdefault(source, set()).add(target)
+            self.cited_by.setdefault(target, set()).add(source)
+        
+        # Any stored scores are a valid warm start: derive their residuals, settle them in the background
+        damping = self.damping
+        residual = {doi: (1.0 - damping) * self._weight(doi) - rank for doi, rank in self._rank.items()}
+        for source, targets in self.references.items():
+            if targets:
+                share = damping * self._rank[source] / len(targets)
+                for target in targets:
+                    residual[target] += share
+        self._residual = residual
+        self._total = sum(self._rank.values())
+        if any(abs(value) > self.push_tolerance for value in residual.values()):
+            self.recompute()
+    
+    def _save(self, dois, edges):
+        """Write the given nodes and new edges; cost follows the size of the change"""
+        if self._db is None:
+            return
+        
+        self._db.executemany(
+            "INSERT INTO citation_nodes (doi, title, year, cited_by_count, rank) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (doi) DO UPDATE SET title = excluded.title, year = excluded.year, "
+            "cited_by_count = excluded.cited_by_count, rank = excluded.rank",
+            ((doi, self.metadata[doi]['title'] if doi in self.metadata else None,
+              self.metadata.get(doi, {}).get('year'), self.cited_by_count.get(doi), self._rank.get(doi, 0.0))
+             for doi in dois)
+        )
+        if edges:
+            self._db.executemany("INSERT OR IGNORE INTO citation_edges (source, target) VALUES (?, ?)", edges)
+        self._db.commit()
+
+_shared_graph = None
+_shared_lock = threading.Lock()
+
+def get_citation_graph():
+    """Return the process-wide citation graph"""
+    global _shared_graph
+    with _shared_lock:
+        if _shared_graph is None:
+            _shared_graph = CitationGraph(os.path.join(Config.DATA_FOLDER, 'citation_graph.sqlite3'))
+        return _shared_graph
@@ -0,0 +1,129 @@
+import re
+import unicodedata
+
+class CitationLinker:
+    """Resolve [Author, Year] placeholders to numbered citations in one scan"""
+    
+    PLACEHOLDER_PATTERN = re.compile(r'\[([^\[\]\n]*?\d{4}[a-z]?)\]')
+    PART_PATTERN = re.compile(r'^\s*(.+?),\s*(\d{4})[a-z]?\s*$')
+    AUTHOR_SPLIT = re.compile(r'\s+(?:et al\.?|and|&)(?:\s|$)|,', re.IGNORECASE)
+    
+    def __init__(self, papers, year_tolerance=1):
+        self.papers = list(papers)
+        self.year_tolerance = year_tolerance
+        self.by_surname_year = {}
+        self.by_surname = {}
+        self._build_index()
+    
+    @staticmethod
+    def normalize_surname(name):
+        """Reduce a name to a lowercase ASCII surname key"""
+        if not name:
+            return ''
+        name = unicodedata.normalize('NFKD', name)
+        name = ''.join(c for c in name if not unicodedata.combining(c))
+        tokens = re.findall(r'[A-Za-z0-9\'-]+', name)
+        if not tokens:
+            return ''
+        return re.sub(r'[^a-z0-9]', '', tokens[-1].lower())
+    
+    def _build_index(self):
+        """Index papers by (surname, year) and surname, first authors first"""
+        max_authors = max((len(p.get('authors') or []) for p in self.papers), default=0)
+        
+        for position in range(max_authors):
+            for idx, paper in enumerate(self.papers):
+                authors = paper.get('authors') or []
+                if position >= len(authors):
+                    continue
+                
+                surname = self.normalize_surname(authors[position])
+                if not surname:
+                    continue
+                
+                year = str(paper.get('year') or '')
+                self.by_surname_year.setdefault((surname, year), []).append(idx)
+                self.by_surname.setdefault(surname, []).append(idx)
+    
+    def _resolve(self, author_text, year):
+        """Find the paper index for one author/year pair, or None"""
+        first_author = self.AUTHOR_SPLIT.split(author_text, maxsplit=1)[0]
+        surname = self.normalize_surname(first_author)
+        if not surname:
+            return None
+        
+        candidates = self.by_surname_year.get((surname, year))
+        if candidates:
+            return candidates[0]
+        
+        # Tolerate preprint/print year drift for the same author
+        for idx in self.by_surname.get(surname, []):
+            paper_year = self.papers[idx].get('year')
+            if paper_year and abs(int(paper_year) - int(year)) <= self.year_tolerance:
+                return idx
+        
+        return None
+    
+    def link(self, content):
+        """Replace placeholders with [n] numbers, reusing numbers for repeats"""
+        numbers = {}
+        resolved_cache = {}
+        unresolved = {}
+        pieces = []
+        last_end = 0
+        
+        for match in self.PLACEHOLDER_PATTERN.finditer(content):
+            parts = match.group(1).split(';')
+            rendered = []
+            linked = False
+            
+            for part in parts:
+                part_match = self.PART_PATTERN.match(part)
+                if not part_match:
+                    rendered.append((False, part.strip()))
+                    continue
+                
+                author_text, year = part_match.group(1), part_match.group(2)
+                key = (author_text.strip().lower(), year)
+                if key not in resolved_cache:
+                    resolved_cache[key] = self._resolve(author_text, year)
+                idx = resolved_cache[key]
+                
+                if idx is None:
+                    placeholder = part.strip()
+                    entry = unresolved.setdefault(placeholder, {'placeholder': placeholder, 'count': 0, 'offsets': []})
+                    entry['count'] += 1
+                    entry['offsets'].append(match.start())
+                    rendered.append((False, placeholder))
+                    continue
+                
+                if idx not in numbers:
+                    numbers[idx] = len(numbers) + 1
+                rendered.append((True, str(numbers[idx])))
+                linked = True
+            
+            if not linked:
+                continue
+            
+            pieces.append(content[last_end:match.start()])
+            pieces.append(self._render(rendered))
+            last_end = match.end()
+        
+        pieces.append(content[last_end:])
+        
+        references = sorted(numbers.items(), key=lambda item: item[1])
+        return {
+            'content': ''.join(pieces),
+            'references': [{'number': number, 'paper': self.papers[idx]} for idx, number in references],
+            'unresolved': list(unresolved.values())
+        }
+    
+    @staticmethod
+    def _render(parts):
+        """Render (resolved, text) parts of a citation group, keeping unresolved parts readable"""
+        numbers = [text for resolved, text in parts if resolved]
+        others = [text for resolved, text in parts if not resolved]
+        text = ', '.join(numbers)
+        if others:
+            text = '; '.join([text] + others)
+        return f"[{text}]"
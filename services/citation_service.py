@@ -1,37 +1,151 @@
+import asyncio
+import logging
 import requests
 import json
 import re
+import weakref
+from urllib.parse import quote
 from datetime import datetime
+from config import Config
+from .citation_graph import get_citation_graph
+from .doi_cache import get_doi_cache
+from .metrics import counter, instrumented, upstream_call
+from .tracing import span, traced
 
+logger = logging.getLogger(__name__)
+
+PARSE_ERRORS = counter('crossref_parse_errors_total', 'CrossRef items that could not be parsed')
+
+JATS_TAG = re.compile(r'<[^>]+>')
+
+@instrumented('citation_service')
+@traced('citation_service')
 class CitationService:
     def __init__(self):
         self.crossref_base_url = "https://api.crossref.org/works"
         self.arxiv_base_url = "http://export.arxiv.org/api/query"
+        self.citation_graph = get_citation_graph()
+        self.doi_cache = get_doi_cache()
+        # One pooled client per event loop; connections belong to the loop that opened them
+        self._clients = weakref.WeakKeyDictionary()
     
     def search_papers(self, query, max_results=10):
         """Search for academic papers using CrossRef API"""
         try:
+            with upstream_call('crossref', 'search'):
+                response = requests.get(self.crossref_base_url, params=self._search_params(query, max_results))
+                response.raise_for_status()
+                data = response.json()
+            return self._collect_papers(data)
+        except Exception as e:
+            logger.warning("Error searching papers: %s", e)
+            return []
+    
+    async def search_papers_async(self, query, max_results=10):
+        """Async variant of search_papers; the CrossRef round trip does not hold a thread"""
+        try:
+            with upstream_call('crossref', 'search'):
+                response = await self._async_client().get(
+                    self.crossref_base_url, params=self._search_params(query, max_results)
+                )
+                response.raise_for_status()
+                data = response.json()
+            # Graph ingest and DOI cache writes block, so they run off the event loop
+            return await asyncio.to_thread(self._collect_papers, data)
+        except Exception as e:
+            logger.warning("Error searching papers: %s", e)
+            return []
+    
+    def _search_params(self, query, max_results):
+        return {
+            'query': query,
+            'rows': max_results,
+            'sort': 'relevance'
+        }
+    
+    def _collect_papers(self, data):
+        """Parse a search response, feeding the citation graph and DOI cache"""
+        papers = []
+        for item in data.get('message', {}).get('items', []):
+            paper = self._parse_crossref_item(item)
+            if paper:
+                papers.append(paper)
+        
+        # Feed reference lists into the citation graph, then expose authority
+        self.citation_graph.ingest(papers)
+        self.doi_cache.put_many(
+            {k: v for k, v in paper.items() if k != 'references'} for paper in papers
+        )
+        for paper in papers:
+            paper.pop('references', None)
+            paper['authority'] = round(self.citation_graph.authority(paper['doi']), 4)
+        
+        return papers
+    
+    def _async_client(self):
+        """Pooled HTTP client for the running event loop"""
+        import httpx
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = httpx.AsyncClient(timeout=Config.HTTP_TIMEOUT, limits=httpx.Limits(
+                max_connections=Config.HTTP_MAX_CONNECTIONS
+            ))
+        return client
+    
+    async def close_async(self):
+        """Close the running loop's HTTP client"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+    
+    def get_paper_by_doi(self, doi):
+        """Look up paper metadata by DOI, served from cache when known"""
+        return self.doi_cache.get(doi, self._fetch_by_dois)
+    
+    def get_papers_by_doi(self, dois):
+        """Look up many DOIs at once, batching cache misses"""
+        return self.doi_cache.get_many(dois, self._fetch_by_dois)
+    
+    def _fetch_by_dois(self, dois):
+        """Fetch a batch of works from CrossRef with a single DOI filter query"""
+        # The filter separates its clauses with commas, so DOIs containing one are looked up on their own
+        listed = [doi for doi in dois if ',' not in doi]
+        papers = {}
+        if listed:
             params = {
-                'query': query,
-                'rows': max_results,
-                'sort': 'relevance'
+                'filter': ','.join(f'doi:{doi}' for doi in listed),
+                'rows': len(listed)
             }
             
-            response = requests.get(self.crossref_base_url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            papers = []
+            with span('crossref.doi_lookup', dois=len(listed)), upstream_call('crossref', 'doi_lookup'):
+                response = requests.get(self.crossref_base_url, params=params)
+                response.raise_for_status()
+                data = response.json()
             
             for item in data.get('message', {}).get('items', []):
-                paper = self._parse_crossref_item(item)
-                if paper:
-                    papers.append(paper)
-            
-            return papers
-        except Exception as e:
-            print(f"Error searching papers: {e}")
-            return []
+                self._add_fetched(papers, item)
+        
+        for doi in dois:
+            if ',' in doi:
+                self._add_fetched(papers, self._fetch_work(doi))
+        return papers
+    
+    def _fetch_work(self, doi):
+        """Fetch one work by DOI; None when CrossRef does not know it"""
+        with span('crossref.doi_lookup', dois=1), upstream_call('crossref', 'doi_lookup'):
+            response = requests.get(f"{self.crossref_base_url}/{quote(doi, safe='')}")
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return response.json().get('message')
+    
+    def _add_fetched(self, papers, item):
+        """Parse a fetched CrossRef item into papers, keyed by DOI"""
+        paper = self._parse_crossref_item(item) if item else None
+        if paper and paper['doi']:
+            paper.pop('references', None)
+            papers[paper['doi']] = paper
     
     def _parse_crossref_item(self, item):
         """Parse CrossRef API response item"""
@@ -54,6 +168,9 @@ class CitationService:
             
             journal = item.get('container-title', [''])[0] if item.get('container-title') else ''
             doi = item.get('DOI', '')
+            references = [ref['DOI'] for ref in item.get('reference', []) if ref.get('DOI')]
+            # CrossRef abstracts are JATS XML; plain text is enough for overlap checks
+            abstract = ' '.join(JATS_TAG.sub(' ', item.get('abstract') or '').split())
             
             return {
                 'title': title,
@@ -61,12 +178,24 @@ class CitationService:
                 'year': year,
                 'journal': journal,
                 'doi': doi,
-                'url': f"https://doi.org/{doi}" if doi else ''
+                'url': f"https://doi.org/{doi}" if doi else '',
+                'references': references,
+                'abstract': abstract,
+                'cited_by_count': item.get('is-referenced-by-count', 0)
             }
         except Exception as e:
-            print(f"Error parsing paper: {e}")
+            PARSE_ERRORS.inc()
+            logger.warning("Error parsing paper: %s", e)
             return None
     
+    def rank_by_authority(self, papers):
+        """Order papers by citation-graph authority"""
+        return self.citation_graph.rank(papers)
+    
+    def seminal_works(self, papers, limit=8):
+        """Most authoritative works among the given papers"""
+        return self.citation_graph.top(limit, dois=[p['doi'] for p in papers if p.get('doi')])
+    
     def format_citation(self, paper, style='apa'):
         """Format citation in specified style"""
         if not paper:
@@ -147,4 +276,4 @@ class CitationService:
         citation += "."
         
         return citation
- 
+
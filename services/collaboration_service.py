@@ -1,15 +1,22 @@
-import google.generativeai as genai
-from config import Config
+from .llm import complete, complete_async
+from .metrics import instrumented
+from .tracing import traced
 import json
 from datetime import datetime
 
+@instrumented('collaboration_service')
+@traced('collaboration_service')
 class CollaborationService:
-    def __init__(self):
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-    
     def generate_peer_review_checklist(self, paper_type, field):
         """Generate comprehensive peer review checklist"""
-        prompt = f"""
+        return complete(self._generate_peer_review_checklist_prompt(paper_type, field))
+    
+    async def generate_peer_review_checklist_async(self, paper_type, field):
+        """Async variant of generate_peer_review_checklist"""
+        return await complete_async(self._generate_peer_review_checklist_prompt(paper_type, field))
+    
+    def _generate_peer_review_checklist_prompt(self, paper_type, field):
+        return f"""
         Create a detailed peer review checklist for a {paper_type} in {field}:
         
         Include sections for:
@@ -24,14 +31,17 @@ class CollaborationService:
         
         Provide specific criteria and rating scales.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
     
     def suggest_collaborators(self, research_topic, expertise_needed):
         """Suggest collaboration opportunities"""
-        prompt = f"""
+        return complete(self._suggest_collaborators_prompt(research_topic, expertise_needed))
+    
+    async def suggest_collaborators_async(self, research_topic, expertise_needed):
+        """Async variant of suggest_collaborators"""
+        return await complete_async(self._suggest_collaborators_prompt(research_topic, expertise_needed))
+    
+    def _suggest_collaborators_prompt(self, research_topic, expertise_needed):
+        return f"""
         For research on "{research_topic}" needing expertise in "{expertise_needed}"
         
         Suggest:
@@ -45,14 +55,17 @@ class CollaborationService:
         
         Include specific roles and contributions.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
     
     def generate_conference_abstract(self, paper_content, conference_type):
         """Generate conference-specific abstracts"""
-        prompt = f"""
+        return complete(self._generate_conference_abstract_prompt(paper_content, conference_type))
+    
+    async def generate_conference_abstract_async(self, paper_content, conference_type):
+        """Async variant of generate_conference_abstract"""
+        return await complete_async(self._generate_conference_abstract_prompt(paper_content, conference_type))
+    
+    def _generate_conference_abstract_prompt(self, paper_content, conference_type):
+        return f"""
         Based on this research: "{paper_content[:1000]}..."
         
         Create a {conference_type} conference abstract including:
@@ -65,14 +78,17 @@ class CollaborationService:
         
         Optimize for {conference_type} audience and format requirements.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
     
     def generate_funding_proposal_outline(self, research_idea, funding_type):
         """Generate funding proposal structure"""
-        prompt = f"""
+        return complete(self._generate_funding_proposal_outline_prompt(research_idea, funding_type))
+    
+    async def generate_funding_proposal_outline_async(self, research_idea, funding_type):
+        """Async variant of generate_funding_proposal_outline"""
+        return await complete_async(self._generate_funding_proposal_outline_prompt(research_idea, funding_type))
+    
+    def _generate_funding_proposal_outline_prompt(self, research_idea, funding_type):
+        return f"""
         For research idea: "{research_idea}" seeking {funding_type} funding
         
         Create proposal outline with:
@@ -86,8 +102,4 @@ class CollaborationService:
         8. Risk assessment
         
         Include specific sections and word count suggestions.
-        """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
\ No newline at end of file
+        """
\ No newline at end of file
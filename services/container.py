@@ -0,0 +1,172 @@
+import threading
+
+def _citation_service(container):
+    from .citation_service import CitationService
+    return CitationService()
+
+def _ai_service(container):
+    from .ai_service import AIService
+    return AIService(container.citation_service)
+
+def _innovation_service(container):
+    from .innovation_service import InnovationService
+    return InnovationService()
+
+def _collaboration_service(container):
+    from .collaboration_service import CollaborationService
+    return CollaborationService()
+
+def _analytics_service(container):
+    from .analytics_service import AnalyticsService
+    return AnalyticsService()
+
+def _overlap_detector(container):
+    from .overlap_detector import OverlapDetector, OverlapIndex
+    # Full fingerprints are rebuilt from stored papers, so the index holds no texts
+    index = OverlapIndex(loader=container.paper_store.content)
+    # Papers stored before this process started are sources too
+    index.seed(container.paper_store.recent(index.max_documents))
+    return OverlapDetector(index)
+
+def _paper_store(container):
+    from .paper_store import get_paper_store
+    return get_paper_store()
+
+def _paper_service(container):
+    from .paper_service import PaperService
+    return PaperService(
+        ai_service=container.ai_service,
+        citation_service=container.citation_service,
+        innovation_service=container.innovation_service,
+        collaboration_service=container.collaboration_service,
+        analytics_service=container.analytics_service,
+        overlap_detector=container.overlap_detector,
+        paper_store=container.paper_store
+    )
+
+def _live_sessions(container):
+    from .incremental_analytics import LiveAnalysisSessions
+    return LiveAnalysisSessions(container.analytics_service)
+
+def _latex_service(container):
+    from .latex_service import LatexService
+    return LatexService()
+
+def _pdf_service(container):
+    from .pdf_service import PdfExportService
+    return PdfExportService()
+
+def _bulk_export_service(container):
+    from .bulk_export import BulkExportService
+    # Papers requested by id come from the result store
+    return BulkExportService(paper_loader=container.paper_store.export_item)
+
+def _draft_store(container):
+    from .draft_store import get_draft_store
+    return get_draft_store()
+
+def _trend_predictor(container):
+    from .trend_predictor import TrendPredictor
+    return TrendPredictor()
+
+def _paper_evolution(container):
+    from .paper_evolution import PaperEvolution
+    return PaperEvolution()
+
+def _research_oracle(container):
+    from .research_oracle import ResearchOracle
+    return ResearchOracle(container.trend_predictor, container.paper_evolution)
+
+DEFAULT_FACTORIES = {
+    'citation_service': _citation_service,
+    'ai_service': _ai_service,
+    'innovation_service': _innovation_service,
+    'collaboration_service': _collaboration_service,
+    'analytics_service': _analytics_service,
+    'overlap_detector': _overlap_detector,
+    'paper_store': _paper_store,
+    'paper_service': _paper_service,
+    'live_sessions': _live_sessions,
+    'latex_service': _latex_service,
+    'pdf_service': _pdf_service,
+    'bulk_export_service': _bulk_export_service,
+    'draft_store': _draft_store,
+    'trend_predictor': _trend_predictor,
+    'paper_evolution': _paper_evolution,
+    'research_oracle': _research_oracle
+}
+
+class ServiceContainer:
+    """Create each service once, on first use, sharing dependencies between them"""
+    
+    def __init__(self, factories=None):
+        self._factories = dict(DEFAULT_FACTORIES if factories is None else factories)
+        self._instances = {}
+        # Reentrant because factories resolve their own dependencies through the container
+        self._lock = threading.RLock()
+    
+    def register(self, name, factory):
+        """Add or replace a factory; an already created instance is dropped"""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+    
+    def get(self, name):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                factory = self._factories.get(name)
+                if factory is None:
+                    raise KeyError(f"Unknown service: {name}")
+                instance = factory(self)
+                self._instances[name] = instance
+            return instance
+    
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self.get(name)
+        except KeyError:
+            raise AttributeError(name)
+    
+    def created(self):
+        """Names of the services instantiated so far"""
+        return list(self._instances)
+    
+    def lazy(self, name):
+        return LazyService(self, name)
+
+class LazyService:
+    """Module-level stand-in that resolves its service on first attribute access"""
+    
+    def __init__(self, container, name):
+        object.__setattr__(self, '_container', container)
+        object.__setattr__(self, '_name', name)
+    
+    def __getattr__(self, attribute):
+        return getattr(self._container.get(self._name), attribute)
+    
+    def __setattr__(self, attribute, value):
+        setattr(self._container.get(self._name), attribute, value)
+    
+    def __repr__(self):
+        return f"<lazy {self._name}>"
+
+_shared_container = None
+_shared_lock = threading.Lock()
+
+def get_container():
+    """Return the process-wide service container"""
+    global _shared_container
+    with _shared_lock:
+        if _shared_container is None:
+            _shared_container = ServiceContainer()
+        return _shared_container
+
+def lazy_service(name):
+    """Lazy handle to a service in the process-wide container"""
+    return get_container().lazy(name)
@@ -0,0 +1,438 @@
+import hashlib
+import html
+import re
+import threading
+from collections import OrderedDict
+from .citation_linker import CitationLinker
+from .metrics import cache_lookup
+
+# Block nodes
+
+class Document:
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+class Heading:
+    def __init__(self, level, children):
+        self.level = level
+        self.children = children
+
+class Paragraph:
+    def __init__(self, children):
+        self.children = children
+
+class ListBlock:
+    def __init__(self, ordered, items):
+        self.ordered = ordered
+        self.items = items
+
+# Inline nodes
+
+class Text:
+    def __init__(self, value):
+        self.value = value
+
+class Strong:
+    def __init__(self, children):
+        self.children = children
+
+class Emphasis:
+    def __init__(self, children):
+        self.children = children
+
+class Citation:
+    """Author/year citation group such as [Smith et al., 2020; Lee, 2019]"""
+    def __init__(self, raw, parts):
+        self.raw = raw
+        self.parts = parts
+    
+    @property
+    def keys(self):
+        return [citation_key(author, year) for author, year in self.parts]
+
+class NumericCitation:
+    """Numbered citation group such as [1], [2, 5] or [3–4]"""
+    def __init__(self, raw):
+        self.raw = raw
+    
+    @property
+    def ranges(self):
+        """(first, last) number pairs; a single number is its own range"""
+        ranges = []
+        for part in self.raw[1:-1].split(','):
+            bounds = re.split(r'\s*[–-]\s*', part.strip())
+            ranges.append((int(bounds[0]), int(bounds[-1])))
+        return ranges
+
+def citation_key(author_text, year):
+    """BibTeX key for an author/year pair, e.g. ('Smith et al.', '2020a') -> smith2020a"""
+    first_author = CitationLinker.AUTHOR_SPLIT.split(str(author_text), maxsplit=1)[0]
+    surname = CitationLinker.normalize_surname(first_author) or 'anon'
+    return f"{surname}{year or ''}"
+
+class DocumentParser:
+    """Linear-time parser for the Markdown subset the generators emit"""
+    
+    HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+    BULLET = re.compile(r'^\s*[-*+]\s+(.*)$')
+    ORDERED = re.compile(r'^\s*\d+[.)]\s+(.*)$')
+    # The year keeps its letter, so Smith 2020a and 2020b stay separate works
+    AUTHOR_YEAR = re.compile(r'^\s*(.+?),\s*(\d{4}[a-z]?)\s*$')
+    NUMERIC = re.compile(r'^\d+(?:\s*[,–-]\s*\d+)*$')
+    SPECIAL = re.compile(r'[*\[]')
+    
+    def parse(self, content):
+        """Parse content into a Document"""
+        blocks = []
+        paragraph = []
+        list_block = None
+        
+        def flush():
+            nonlocal list_block
+            if paragraph:
+                blocks.append(Paragraph(self.parse_inline('\n'.join(paragraph))))
+                paragraph.clear()
+            if list_block is not None:
+                blocks.append(list_block)
+                list_block = None
+        
+        for line in (content or '').split('\n'):
+            stripped = line.strip()
+            if not stripped:
+                flush()
+                continue
+            
+            heading = self.HEADING.match(stripped)
+            if heading:
+                flush()
+                blocks.append(Heading(len(heading.group(1)), self.parse_inline(heading.group(2))))
+                continue
+            
+            # "*" / "**" at line start is emphasis, not a bullet, unless followed by a space
+            bullet = self.BULLET.match(line)
+            ordered = None if bullet else self.ORDERED.match(line)
+            if bullet or ordered:
+                is_ordered = ordered is not None
+                if paragraph or (list_block is not None and list_block.ordered != is_ordered):
+                    flush()
+                if list_block is None:
+                    list_block = ListBlock(is_ordered, [])
+                list_block.items.append(self.parse_inline((bullet or ordered).group(1)))
+                continue
+            
+            if list_block is not None:
+                flush()
+            paragraph.append(stripped)
+        
+        flush()
+        return Document(blocks)
+    
+    def parse_inline(self, text):
+        """Tokenize inline markup in a single left-to-right scan"""
+        # Next closing delimiter at or after the last search start; scans only
+        # move forward, so each delimiter search is amortized over the text
+        closers = {}
+        
+        def find_close(delimiter, start):
+            cached = closers.get(delimiter)
+            if cached is not None and (cached == -1 or cached >= start):
+                return cached
+            if delimiter == '*':
+                position = self._find_single_star(text, start)
+            else:
+                position = text.find(delimiter, start)
+            closers[delimiter] = position
+            return position
+        
+        return self._scan(text, 0, len(text), find_close)
+    
+    def _scan(self, text, start, end, find_close):
+        """Scan text[start:end] into inline nodes"""
+        nodes = []
+        buffer_start = start
+        i = start
+        
+        while i < end:
+            # Jump straight to the next character that can open markup
+            special = self.SPECIAL.search(text, i, end)
+            if not special:
+                break
+            i = special.start()
+            char = text[i]
+            node = None
+            next_i = i
+            
+            if char == '*':
+                if text.startswith('**', i):
+                    close = find_close('**', i + 2)
+                    # "***" closes an inner emphasis first, then the strong run
+                    while 0 <= close and text.startswith('***', close) and close + 3 <= end:
+                        close += 1
+                    if i + 2 < close < end:
+                        node = Strong(self._scan(text, i + 2, close, find_close))
+                        next_i = close + 2
+                    else:
+                        # Unmatched "**" stays literal as a whole
+                        i += 2
+                        continue
+                elif i + 1 < end and not text[i + 1].isspace():
+                    close = find_close('*', i + 1)
+                    if i + 1 < close < end:
+                        node = Emphasis(self._scan(text, i + 1, close, find_close))
+                        next_i = close + 1
+            elif char == '[':
+                close = find_close(']', i + 1)
+                if i < close < end:
+                    inner = text[i + 1:close]
+                    if '[' not in inner and '\n' not in inner:
+                        node = self._citation(text[i:close + 1], inner)
+                        next_i = close + 1
+            
+            if node is None:
+                i += 1
+                continue
+            
+            if buffer_start < i:
+                nodes.append(Text(text[buffer_start:i]))
+            nodes.append(node)
+            i = buffer_start = next_i
+        
+        if buffer_start < end:
+            nodes.append(Text(text[buffer_start:end]))
+        return nodes
+    
+    @staticmethod
+    def _find_single_star(text, start):
+        """Find a closing '*' that follows a non-space and does not open '**'"""
+        i = text.find('*', start)
+        while i != -1:
+            if text[i - 1] not in '* \t\n' and (not text.startswith('**', i) or text.startswith('***', i)):
+                return i
+            i = text.find('*', i + 1)
+        return -1
+    
+    def _citation(self, raw, inner):
+        """Build a citation node from bracket contents, or None"""
+        if self.NUMERIC.match(inner.strip()):
+            return NumericCitation(raw)
+        
+        parts = []
+        for part in inner.split(';'):
+            match = self.AUTHOR_YEAR.match(part)
+            if not match:
+                return None
+            parts.append((match.group(1).strip(), match.group(2)))
+        return Citation(raw, parts)
+
+class LatexRenderer:
+    """Render a Document as LaTeX body markup"""
+    
+    def __init__(self, numeric_keys=None):
+        # Bib keys of the numbered reference list, so [n] can become \citep; without them [n] stays literal
+        self.numeric_keys = numeric_keys or []
+    
+    ESCAPES = str.maketrans({
+        '&': r'\&',
+        '%': r'\%',
+        '$': r'\$',
+        '#': r'\#',
+        '^': r'\textasciicircum{}',
+        '_': r'\_',
+        '{': r'\{',
+        '}': r'\}',
+        '~': r'\textasciitilde{}',
+        '\\': r'\textbackslash{}'
+    })
+    SECTIONS = {1: 'section', 2: 'subsection', 3: 'subsubsection', 4: 'paragraph', 5: 'subparagraph', 6: 'subparagraph'}
+    
+    def escape(self, text):
+        """Escape LaTeX special characters in a single pass"""
+        return text.translate(self.ESCAPES)
+    
+    def render(self, document):
+        return '\n\n'.join(self.render_block(block) for block in document.blocks) + '\n'
+    
+    def render_block(self, block):
+        if isinstance(block, Heading):
+            return f"\\{self.SECTIONS[block.level]}{{{self.render_inline(block.children)}}}"
+        if isinstance(block, ListBlock):
+            env = 'enumerate' if block.ordered else 'itemize'
+            items = '\n'.join(f"  \\item {self.render_inline(item, leading=True)}" for item in block.items)
+            return f"\\begin{{{env}}}\n{items}\n\\end{{{env}}}"
+        return self.render_inline(block.children, leading=True)
+    
+    def render_inline(self, nodes, leading=False):
+        out = []
+        for index, node in enumerate(nodes):
+            if isinstance(node, Text):
+                out.append(self.escape(node.value))
+            elif isinstance(node, Strong):
+                out.append(f"\\textbf{{{self.render_inline(node.children)}}}")
+            elif isinstance(node, Emphasis):
+                out.append(f"\\textit{{{self.render_inline(node.children)}}}")
+            elif isinstance(node, Citation):
+                out.append(f"\\citep{{{','.join(node.keys)}}}")
+            elif isinstance(node, NumericCitation):
+                # A number opening a paragraph or list item labels a reference list entry
+                keys = None if leading and index == 0 else self._numeric_keys(node)
+                out.append(f"\\citep{{{','.join(keys)}}}" if keys else self.escape(node.raw))
+        return ''.join(out)
+    
+    def _numeric_keys(self, node):
+        """Bib keys for a numbered citation, or None unless every number is in the reference list"""
+        keys = self.numeric_keys
+        ranges = node.ranges
+        if not keys or not all(0 < first <= last <= len(keys) for first, last in ranges):
+            return None
+        return list(dict.fromkeys(key for first, last in ranges for key in keys[first - 1:last]))
+
+class HtmlRenderer:
+    """Render a Document as HTML for the result page"""
+    
+    HEADING_CLASSES = {1: 'text-primary mt-4 mb-3', 2: 'text-secondary mt-3 mb-2', 3: 'text-info mt-3 mb-2'}
+    
+    def render(self, document):
+        return '\n'.join(self.render_block(block) for block in document.blocks)
+    
+    def render_block(self, block):
+        if isinstance(block, Heading):
+            css = self.HEADING_CLASSES.get(block.level, 'mt-2 mb-1')
+            return f'<h{block.level} class="{css}">{self.render_inline(block.children)}</h{block.level}>'
+        if isinstance(block, ListBlock):
+            tag = 'ol' if block.ordered else 'ul'
+            items = ''.join(f"<li>{self.render_inline(item)}</li>" for item in block.items)
+            return f"<{tag}>{items}</{tag}>"
+        return f"<p>{self.render_inline(block.children)}</p>"
+    
+    def render_inline(self, nodes):
+        out = []
+        for node in nodes:
+            if isinstance(node, Text):
+                out.append(html.escape(node.value, quote=False).replace('\n', '<br>\n'))
+            elif isinstance(node, Strong):
+                out.append(f"<strong>{self.render_inline(node.children)}</strong>")
+            elif isinstance(node, Emphasis):
+                out.append(f"<em>{self.render_inline(node.children)}</em>")
+            elif isinstance(node, Citation):
+                label = '; '.join(f"{author}, {year}" for author, year in node.parts)
+                out.append(f'<span class="badge bg-primary">{html.escape(label)}</span>')
+            elif isinstance(node, NumericCitation):
+                out.append(f'<span class="badge bg-secondary">{html.escape(node.raw)}</span>')
+        return ''.join(out)
+
+class MarkdownRenderer:
+    """Render a Document back to normalized Markdown"""
+    
+    def render(self, document):
+        return '\n\n'.join(self.render_block(block) for block in document.blocks) + '\n'
+    
+    def render_block(self, block):
+        if isinstance(block, Heading):
+            return f"{'#' * block.level} {self.render_inline(block.children)}"
+        if isinstance(block, ListBlock):
+            return '\n'.join(
+                f"{f'{i}.' if block.ordered else '-'} {self.render_inline(item)}"
+                for i, item in enumerate(block.items, 1)
+            )
+        return self.render_inline(block.children)
+    
+    def render_inline(self, nodes):
+        out = []
+        for node in nodes:
+            if isinstance(node, Text):
+                out.append(node.value)
+            elif isinstance(node, Strong):
+                out.append(f"**{self.render_inline(node.children)}**")
+            elif isinstance(node, Emphasis):
+                out.append(f"*{self.render_inline(node.children)}*")
+            else:
+                out.append(node.raw)
+        return ''.join(out)
+
+RENDERERS = {
+    'latex': LatexRenderer(),
+    'html': HtmlRenderer(),
+    'markdown': MarkdownRenderer()
+}
+
+_parser = DocumentParser()
+_cache_lock = threading.Lock()
+_document_cache = OrderedDict()
+_render_cache = OrderedDict()
+CACHE_SIZE = 128
+
+def register_renderer(name, renderer):
+    """Register an additional output format"""
+    RENDERERS[name] = renderer
+
+def content_hash(content):
+    return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
+
+def _cache_get(cache, key):
+    with _cache_lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+def _cache_put(cache, key, value):
+    with _cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+
+def split_sections(content):
+    """Split content at heading lines; joining the pieces with newlines restores it"""
+    sections = []
+    current = []
+    for line in (content or '').split('\n'):
+        if current and DocumentParser.HEADING.match(line.strip()):
+            sections.append('\n'.join(current))
+            current = []
+        current.append(line)
+    sections.append('\n'.join(current))
+    return sections
+
+def render_blocks(content, fmt):
+    """Render the blocks of a content fragment without caching or document framing"""
+    renderer = RENDERERS[fmt]
+    return [renderer.render_block(block) for block in _parser.parse(content).blocks]
+
+def citation_keys(content):
+    """Citation keys referenced by author/year citations, in order of first use"""
+    keys = {}
+    pending = list(parse_document(content).blocks)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, Citation):
+            for key in node.keys:
+                keys.setdefault(key, None)
+        elif isinstance(node, ListBlock):
+            pending.extend(child for item in reversed(node.items) for child in reversed(item))
+        elif hasattr(node, 'children'):
+            pending.extend(reversed(node.children))
+    return list(keys)
+
+def parse_document(content, digest=None):
+    """Parse content once; repeated calls with the same content hit the cache"""
+    digest = digest or content_hash(content)
+    document = _cache_get(_document_cache, digest)
+    cache_lookup('parsed_documents', document is not None)
+    if document is None:
+        document = _parser.parse(content)
+        _cache_put(_document_cache, digest, document)
+    return document
+
+def render_document(content, fmt='html'):
+    """Render content in the given format, caching by content hash"""
+    if fmt not in RENDERERS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    
+    digest = content_hash(content)
+    rendered = _cache_get(_render_cache, (digest, fmt))
+    cache_lookup('rendered_documents', rendered is not None)
+    if rendered is None:
+        rendered = RENDERERS[fmt].render(parse_document(content, digest))
+        _cache_put(_render_cache, (digest, fmt), rendered)
+    return rendered
@@ -0,0 +1,85 @@
+import hashlib
+import re
+import threading
+from collections import Counter, OrderedDict
+from .metrics import cache_lookup
+
+# A sentence is a run between [.!?] marks that contains a non-blank character;
+# the match starts at that character so blank runs are skipped by the scanner
+SENTENCE = re.compile(r'[^\s.!?][^.!?]*')
+
+class DocumentFeatures:
+    """Token and sentence counts extracted from a document in one pass"""
+    
+    def __init__(self, digest, content, word_count, sentence_count, complex_word_count, token_counts=None):
+        self.digest = digest
+        self.content = content
+        self.word_count = word_count
+        self.sentence_count = sentence_count
+        self.complex_word_count = complex_word_count
+        
+        # Only kept when the document was tokenized in this process
+        self.token_counts = token_counts
+        
+        # Per-document analytics results, memoized alongside the features
+        self.results = {}
+    
+    @classmethod
+    def from_content(cls, content, digest=None):
+        """Tokenize content once"""
+        content = content or ''
+        digest = digest or content_hash(content)
+        # Count distinct tokens first; per-word work then runs once per type
+        token_counts = Counter(content.split())
+        word_count = sum(token_counts.values())
+        complex_word_count = sum(count for token, count in token_counts.items() if len(token) > 6)
+        sentence_count = sum(1 for _ in SENTENCE.finditer(content))
+        
+        return cls(digest, content, word_count, sentence_count, complex_word_count, token_counts=token_counts)
+    
+    def memo(self, name, compute):
+        """Compute a result once per document"""
+        if name not in self.results:
+            self.results[name] = compute()
+        return self.results[name]
+
+def content_hash(content):
+    return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
+
+def sentence_spans(content):
+    """(start, end) offsets of non-blank sentences between [.!?] runs"""
+    return [match.span() for match in SENTENCE.finditer(content)]
+
+class FeatureCache:
+    """LRU of extracted features bounded by total cached characters"""
+    
+    def __init__(self, max_chars=32 * 1024 * 1024):
+        self.max_chars = max_chars
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total = 0
+        self._lock = threading.Lock()
+    
+    def get(self, content, extractor=None):
+        """Return features for content, extracting them on a miss"""
+        digest = content_hash(content)
+        with self._lock:
+            features = self._entries.get(digest)
+            if features is not None:
+                self._entries.move_to_end(digest)
+        cache_lookup('document_features', features is not None)
+        if features is not None:
+            return features
+        
+        features = (extractor or DocumentFeatures.from_content)(content, digest)
+        
+        with self._lock:
+            size = len(content or '')
+            if digest not in self._entries and size <= self.max_chars:
+                self._entries[digest] = features
+                self._sizes[digest] = size
+                self._total += size
+                while self._total > self.max_chars:
+                    old_digest, _ = self._entries.popitem(last=False)
+                    self._total -= self._sizes.pop(old_digest)
+        return features
@@ -0,0 +1,177 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+from .metrics import CACHE_REQUESTS
+
+class DOICache:
+    """DOI-keyed metadata cache with negative caching, persisted in SQLite"""
+    
+    DOI_PATTERN = re.compile(r'^10\.\d{4,9}/\S+$')
+    
+    def __init__(self, path=None, positive_ttl=None, negative_ttl=None, batch_size=20, max_memory_entries=10000):
+        self.path = path
+        self.positive_ttl = positive_ttl or Config.DOI_CACHE_TTL
+        self.negative_ttl = negative_ttl or Config.DOI_NEGATIVE_CACHE_TTL
+        self.batch_size = batch_size
+        self.max_memory_entries = max_memory_entries
+        
+        # doi -> (metadata or None, expires_at)
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        self._db = None
+        self.stats = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'upstream_calls': 0}
+        
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS doi_cache ("
+                "doi TEXT PRIMARY KEY, payload TEXT, negative INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+    
+    @staticmethod
+    def normalize_doi(doi):
+        """Normalize DOI for use as a cache key"""
+        if not doi:
+            return ''
+        doi = doi.strip().lower()
+        for prefix in ('https://doi.org/', 'http://doi.org/', 'https://dx.doi.org/', 'http://dx.doi.org/', 'doi:'):
+            if doi.startswith(prefix):
+                doi = doi[len(prefix):]
+        return doi
+    
+    def get(self, doi, fetcher=None):
+        """Return cached metadata for a DOI, or None if unknown"""
+        return self.get_many([doi], fetcher).get(self.normalize_doi(doi))
+    
+    def get_many(self, dois, fetcher=None):
+        """Return {doi: metadata or None}, batching cache misses into few upstream calls"""
+        now = time.time()
+        results = {}
+        pending = []
+        
+        with self._lock:
+            for doi in dict.fromkeys(self.normalize_doi(d) for d in dois):
+                if not doi:
+                    continue
+                if not self.DOI_PATTERN.match(doi):
+                    self._store(doi, None, now)
+                    results[doi] = None
+                    continue
+                
+                entry = self._memory.get(doi)
+                if entry and entry[1] > now:
+                    self._memory.move_to_end(doi)
+                    self._count_hit(entry[0])
+                    results[doi] = entry[0]
+                else:
+                    pending.append(doi)
+            
+            if pending and self._db is not None:
+                for doi, metadata, expires_at in self._load(pending, now):
+                    self._remember(doi, metadata, expires_at)
+                    self._count_hit(metadata)
+                    results[doi] = metadata
+                pending = [doi for doi in pending if doi not in results]
+            
+            self.stats['misses'] += len(pending)
+            if pending:
+                CACHE_REQUESTS.inc('doi', 'miss', amount=len(pending))
+        
+        if not pending or fetcher is None:
+            results.update((doi, None) for doi in pending)
+            return results
+        
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            with self._lock:
+                self.stats['upstream_calls'] += 1
+            try:
+                fetched = {self.normalize_doi(k): v for k, v in fetcher(batch).items()}
+            except Exception:
+                # Upstream failure says nothing about the DOI itself; do not cache it
+                results.update((doi, None) for doi in batch)
+                continue
+            
+            now = time.time()
+            with self._lock:
+                for doi in batch:
+                    metadata = fetched.get(doi)
+                    self._store(doi, metadata, now)
+                    results[doi] = metadata
+        
+        return results
+    
+    def put_many(self, papers):
+        """Store metadata for papers that were fetched by other code paths"""
+        now = time.time()
+        with self._lock:
+            for paper in papers:
+                doi = self.normalize_doi(paper.get('doi'))
+                if doi:
+                    self._store(doi, paper, now, commit=False)
+            if self._db is not None:
+                self._db.commit()
+    
+    def _count_hit(self, metadata):
+        """Record a positive or negative cache hit"""
+        if metadata is None:
+            self.stats['negative_hits'] += 1
+            CACHE_REQUESTS.inc('doi', 'negative_hit')
+        else:
+            self.stats['hits'] += 1
+            CACHE_REQUESTS.inc('doi', 'hit')
+    
+    def _remember(self, doi, metadata, expires_at):
+        """Keep an entry in the bounded in-memory layer"""
+        self._memory[doi] = (metadata, expires_at)
+        self._memory.move_to_end(doi)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+    
+    def _store(self, doi, metadata, now, commit=True):
+        """Cache an entry with the TTL for its kind"""
+        ttl = self.positive_ttl if metadata is not None else self.negative_ttl
+        expires_at = now + ttl
+        self._remember(doi, metadata, expires_at)
+        
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO doi_cache (doi, payload, negative, expires_at) VALUES (?, ?, ?, ?)",
+                (doi, json.dumps(metadata) if metadata is not None else None, int(metadata is None), expires_at)
+            )
+            if commit:
+                self._db.commit()
+    
+    def _load(self, dois, now):
+        """Read unexpired entries from disk"""
+        rows = []
+        for start in range(0, len(dois), 500):
+            chunk = dois[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows.extend(self._db.execute(
+                f"SELECT doi, payload, negative, expires_at FROM doi_cache "
+                f"WHERE doi IN ({placeholders}) AND expires_at > ?",
+                (*chunk, now)
+            ))
+        return [(doi, None if negative else json.loads(payload), expires_at)
+                for doi, payload, negative, expires_at in rows]
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+def get_doi_cache():
+    """Return the process-wide DOI cache"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = DOICache(os.path.join(Config.DATA_FOLDER, 'doi_cache.sqlite3'))
+        return _shared_cache
@@ -0,0 +1,249 @@
+import difflib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from config import Config
+from .metrics import instrumented
+
+class DraftNotFound(Exception):
+    """Raised when a draft or one of its versions does not exist"""
+
+def line_delta(old, new):
+    """Line-level edit script turning old into new: [[start, end, replacement], ...]"""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+    return [
+        [i1, i2, ''.join(new_lines[j1:j2])]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal'
+    ]
+
+def apply_delta(old, delta):
+    """Replay an edit script from line_delta"""
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    position = 0
+    for start, end, replacement in delta:
+        parts.extend(old_lines[position:start])
+        parts.append(replacement)
+        position = end
+    parts.extend(old_lines[position:])
+    return ''.join(parts)
+
+@instrumented('draft_store')
+class DraftStore:
+    """Versioned paper drafts in SQLite: compressed line deltas with periodic full snapshots"""
+    
+    def __init__(self, path, snapshot_interval=None, max_versions=None, retention_days=None, compression_level=None):
+        self.path = path
+        self.snapshot_interval = snapshot_interval or Config.DRAFT_SNAPSHOT_INTERVAL
+        self.max_versions = max_versions or Config.DRAFT_MAX_VERSIONS
+        self.retention = (retention_days or Config.DRAFT_RETENTION_DAYS) * 24 * 3600
+        self.compression_level = compression_level if compression_level is not None else Config.DRAFT_COMPRESSION_LEVEL
+        self._lock = threading.RLock()
+        self._last_prune = 0
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # WAL lets other workers read while one writes; NORMAL skips the fsync per autosave
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS drafts ("
+            "id TEXT PRIMARY KEY, title TEXT, metadata TEXT, head_hash TEXT NOT NULL, "
+            "version INTEGER NOT NULL, snapshot_version INTEGER NOT NULL, length INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS drafts_updated ON drafts (updated_at);"
+            "CREATE TABLE IF NOT EXISTS draft_versions ("
+            "draft_id TEXT NOT NULL, version INTEGER NOT NULL, snapshot INTEGER NOT NULL, "
+            "payload BLOB NOT NULL, saved_at REAL NOT NULL, "
+            "PRIMARY KEY (draft_id, version)) WITHOUT ROWID;"
+        )
+        self._db.commit()
+    
+    @staticmethod
+    def new_id():
+        """Fresh draft id for saves that do not name one"""
+        return f"draft_{int(time.time())}_{os.urandom(4).hex()}"
+    
+    def save(self, draft_id, content, title=None, metadata=None):
+        """Store content as the next version of draft_id; unchanged content adds no version"""
+        now = time.time()
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        
+        with self._lock:
+            row = self._db.execute(
+                "SELECT head_hash, version, snapshot_version FROM drafts WHERE id = ?", (draft_id,)
+            ).fetchone()
+            
+            if row is None:
+                version, snapshot, payload = 1, True, self._pack(content)
+                self._db.execute(
+                    "INSERT INTO drafts (id, title, metadata, head_hash, version, snapshot_version, "
+                    "length, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (draft_id, title, json.dumps(metadata or {}), digest, version, version,
+                     len(content), now, now)
+                )
+            else:
+                head_hash, previous, snapshot_version = row
+                if head_hash == digest:
+                    # Autosave of an unchanged draft: refresh the listing fields only
+                    self._db.execute(
+                        "UPDATE drafts SET title = COALESCE(?, title), metadata = COALESCE(?, metadata), "
+                        "updated_at = ? WHERE id = ?",
+                        (title, json.dumps(metadata) if metadata is not None else None, now, draft_id)
+                    )
+                    self._db.commit()
+                    return {'draft_id': draft_id, 'version': previous, 'changed': False}
+                
+                version = previous + 1
+                full = self._pack(content)
+                delta = line_delta(self._replay(draft_id, previous)[0], content)
+                payload = self._pack(json.dumps(delta, separators=(',', ':')))
+                # Snapshots bound how many deltas a history read replays; big rewrites store one anyway
+                snapshot = version - snapshot_version >= self.snapshot_interval or len(payload) >= len(full)
+                if snapshot:
+                    payload = full
+                    snapshot_version = version
+                # Content lives only in draft_versions, so an ordinary autosave writes just its delta
+                self._db.execute(
+                    "UPDATE drafts SET title = COALESCE(?, title), metadata = COALESCE(?, metadata), "
+                    "head_hash = ?, version = ?, snapshot_version = ?, length = ?, updated_at = ? WHERE id = ?",
+                    (title, json.dumps(metadata) if metadata is not None else None, digest,
+                     version, snapshot_version, len(content), now, draft_id)
+                )
+            
+            self._db.execute(
+                "INSERT INTO draft_versions (draft_id, version, snapshot, payload, saved_at) VALUES (?, ?, ?, ?, ?)",
+                (draft_id, version, int(snapshot), payload, now)
+            )
+            self._trim_versions(draft_id, version)
+            self._db.commit()
+            
+            if now - self._last_prune > 3600:
+                self.prune(now)
+        
+        return {'draft_id': draft_id, 'version': version, 'changed': True}
+    
+    def latest(self, draft_id):
+        """Current content and listing fields of a draft"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, title, metadata, version, length, created_at, updated_at FROM drafts WHERE id = ?",
+                (draft_id,)
+            ).fetchone()
+            if row is None:
+                raise DraftNotFound(draft_id)
+            content = self._replay(draft_id, row[3])[0]
+        draft = self._summary(row[:2] + row[3:])
+        draft['metadata'] = json.loads(row[2])
+        draft['content'] = content
+        return draft
+    
+    def version(self, draft_id, version):
+        """Content of one historical version"""
+        with self._lock:
+            content, saved_at = self._replay(draft_id, version)
+        return {'id': draft_id, 'version': version, 'saved_at': saved_at, 'content': content}
+    
+    def history(self, draft_id):
+        """Retained versions of a draft, newest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT version, snapshot, LENGTH(payload), saved_at FROM draft_versions "
+                "WHERE draft_id = ? ORDER BY version DESC",
+                (draft_id,)
+            ).fetchall()
+        if not rows:
+            raise DraftNotFound(draft_id)
+        return [
+            {'version': version, 'snapshot': bool(snapshot), 'stored_bytes': size, 'saved_at': saved_at}
+            for version, snapshot, size, saved_at in rows
+        ]
+    
+    def list_drafts(self, limit=50, offset=0):
+        """Drafts by most recent save"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, title, version, length, created_at, updated_at FROM drafts "
+                "ORDER BY updated_at DESC LIMIT ? OFFSET ?",
+                (limit, offset)
+            ).fetchall()
+        return [self._summary(row) for row in rows]
+    
+    def delete(self, draft_id):
+        """Remove a draft and all of its versions"""
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM drafts WHERE id = ?", (draft_id,)).rowcount
+            self._db.execute("DELETE FROM draft_versions WHERE draft_id = ?", (draft_id,))
+            self._db.commit()
+        if not deleted:
+            raise DraftNotFound(draft_id)
+    
+    def prune(self, now=None):
+        """Drop drafts that have not been saved within the retention period"""
+        now = now or time.time()
+        with self._lock:
+            self._last_prune = now
+            cutoff = now - self.retention
+            self._db.execute(
+                "DELETE FROM draft_versions WHERE draft_id IN (SELECT id FROM drafts WHERE updated_at < ?)", (cutoff,)
+            )
+            removed = self._db.execute("DELETE FROM drafts WHERE updated_at < ?", (cutoff,)).rowcount
+            self._db.commit()
+        return removed
+    
+    def _replay(self, draft_id, version):
+        """(content, saved_at) of a version, rebuilt from the nearest snapshot at or before it"""
+        rows = self._db.execute(
+            "SELECT version, payload, saved_at FROM draft_versions "
+            "WHERE draft_id = ? AND version <= ? AND version >= ("
+            "SELECT MAX(version) FROM draft_versions WHERE draft_id = ? AND snapshot = 1 AND version <= ?"
+            ") ORDER BY version",
+            (draft_id, version, draft_id, version)
+        ).fetchall()
+        if not rows or rows[-1][0] != version:
+            raise DraftNotFound(f"{draft_id} version {version}")
+        
+        content = self._unpack(rows[0][1])
+        for _, payload, _ in rows[1:]:
+            content = apply_delta(content, json.loads(self._unpack(payload)))
+        return content, rows[-1][2]
+    
+    def _trim_versions(self, draft_id, version):
+        """Keep at least max_versions, cutting history only at a snapshot so nothing is re-encoded"""
+        if version <= self.max_versions + self.snapshot_interval:
+            return
+        self._db.execute(
+            "DELETE FROM draft_versions WHERE draft_id = ? AND version < ("
+            "SELECT MAX(version) FROM draft_versions WHERE draft_id = ? AND snapshot = 1 AND version <= ?)",
+            (draft_id, draft_id, version - self.max_versions + 1)
+        )
+    
+    def _summary(self, row):
+        draft_id, title, version, length, created_at, updated_at = row
+        return {'id': draft_id, 'title': title, 'version': version, 'length': length,
+                'created_at': created_at, 'updated_at': updated_at}
+    
+    def _pack(self, text):
+        return zlib.compress(text.encode('utf-8'), self.compression_level)
+    
+    def _unpack(self, payload):
+        return zlib.decompress(payload).decode('utf-8')
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+def get_draft_store():
+    """Return the process-wide draft store"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = DraftStore(Config.DRAFT_DB_PATH)
+        return _shared_store
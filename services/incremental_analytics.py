@@ -0,0 +1,232 @@
+import codecs
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from .parallel_analytics import merge_summaries, summarize_text
+from .metrics import instrumented
+
+PARAGRAPH_SPLIT = re.compile(r'\n[^\S\n]*\n')
+MAX_CARRY = 1024 * 1024  # longest run of text held back waiting for whitespace
+
+class StreamingAnalyzer:
+    """Analyze text chunk by chunk, keeping only running counters and a short carry"""
+    
+    def __init__(self, analytics_service, max_carry=MAX_CARRY):
+        self.analytics_service = analytics_service
+        self.matcher = analytics_service.phrase_matcher
+        self.max_carry = max_carry
+        self.chars = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._cursor = self.matcher.cursor()
+        self._summary = None
+        self._carry = ''
+    
+    def feed(self, chunk):
+        """Consume bytes or text; a trailing partial token waits for the next chunk"""
+        if isinstance(chunk, (bytes, bytearray)):
+            chunk = self._decoder.decode(chunk)
+        buffer = self._carry + chunk
+        cut = self._safe_cut(buffer)
+        if cut:
+            self._consume(buffer[:cut])
+        self._carry = buffer[cut:]
+    
+    def finish(self):
+        """Flush the carry and return the final analysis"""
+        self._carry += self._decoder.decode(b'', final=True)
+        if self._carry:
+            self._consume(self._carry)
+            self._carry = ''
+        return self.analysis()
+    
+    def analysis(self):
+        """Analytics for everything fed so far, counting the carry without committing it"""
+        summary = self._summary
+        if self._carry:
+            pending = summarize_text(self._carry, self.matcher, positions=False, cursor=self._cursor.copy())
+            summary = merge_summaries([summary, pending]) if summary else pending
+        return _analyze(self.analytics_service, summary)
+    
+    def _consume(self, text):
+        """Fold a chunk that ends on a whitespace boundary into the running counters"""
+        part = summarize_text(text, self.matcher, positions=False, cursor=self._cursor)
+        self._summary = merge_summaries([self._summary, part]) if self._summary else part
+        self.chars += len(text)
+    
+    def _safe_cut(self, buffer):
+        """Split before the last whitespace run so no token or blank line is cut in two"""
+        stripped = buffer.rstrip()
+        if not stripped:
+            # Only whitespace: hold back a lone line break that a later one could turn into a blank line
+            newline = buffer.find('\n')
+            if newline < 0 or PARAGRAPH_SPLIT.search(buffer) or len(buffer) > self.max_carry:
+                return len(buffer)
+            return newline
+        if len(stripped) < len(buffer):
+            return len(stripped)
+        
+        parts = stripped.rsplit(None, 1)
+        if len(parts) == 2:
+            return len(parts[0])
+        if len(buffer) > self.max_carry:
+            # A single token longer than max_carry; counting it as two keeps memory bounded
+            return len(buffer)
+        return 0
+
+class EditableDocument:
+    """Per-paragraph summaries with totals adjusted by delta on every edit"""
+    
+    def __init__(self, analytics_service, content=''):
+        self.analytics_service = analytics_service
+        self.matcher = analytics_service.phrase_matcher
+        self.paragraphs = []
+        self.summaries = []
+        self.totals = {
+            'words': 0,
+            'complex_words': 0,
+            'syllables': 0,
+            'polysyllables': 0,
+            'sentences': 0,
+            'counts': {category: 0 for category in self.matcher.categories}
+        }
+        self.splice(0, 0, content)
+    
+    @staticmethod
+    def split(text):
+        """Non-blank paragraphs separated by blank lines"""
+        return [paragraph for paragraph in PARAGRAPH_SPLIT.split(text or '') if paragraph.strip()]
+    
+    @property
+    def content(self):
+        return '\n\n'.join(self.paragraphs)
+    
+    def replace(self, index, text):
+        """Replace paragraph index; text may hold several paragraphs or none"""
+        self._check_index(index)
+        self.splice(index, index + 1, text)
+    
+    def insert(self, index, text):
+        """Insert paragraphs before index (index == len appends)"""
+        if not 0 <= index <= len(self.paragraphs):
+            raise IndexError(f"Paragraph index {index} out of range")
+        self.splice(index, index, text)
+    
+    def delete(self, index):
+        """Remove paragraph index"""
+        self._check_index(index)
+        self.splice(index, index + 1, '')
+    
+    def splice(self, start, stop, text):
+        """Swap paragraphs[start:stop] for the paragraphs of text, updating totals by delta"""
+        new_paragraphs = self.split(text)
+        new_summaries = [summarize_text(paragraph, self.matcher, positions=False) for paragraph in new_paragraphs]
+        
+        low = max(start - 1, 0)
+        self._pairs(low, min(stop + 1, len(self.summaries)), -1)
+        for summary in self.summaries[start:stop]:
+            self._add(summary, -1)
+        
+        self.paragraphs[start:stop] = new_paragraphs
+        self.summaries[start:stop] = new_summaries
+        
+        for summary in new_summaries:
+            self._add(summary, 1)
+        self._pairs(low, min(start + len(new_summaries) + 1, len(self.summaries)), 1)
+    
+    def analysis(self):
+        """Live analytics for the current content"""
+        totals = self.totals
+        result = self.analytics_service.analyze_totals(
+            totals['words'], totals['sentences'], totals['complex_words'], dict(totals['counts']),
+            totals['syllables'], totals['polysyllables']
+        )
+        result['paragraph_count'] = len(self.paragraphs)
+        return result
+    
+    def _add(self, summary, sign):
+        """Add or remove one paragraph's counts"""
+        totals = self.totals
+        totals['words'] += sign * summary['words']
+        totals['complex_words'] += sign * summary['complex_words']
+        totals['syllables'] += sign * summary['syllables']
+        totals['polysyllables'] += sign * summary['polysyllables']
+        totals['sentences'] += sign * summary['sentences']
+        for category, count in summary['indicators']['counts'].items():
+            totals['counts'][category] = totals['counts'].get(category, 0) + sign * count
+    
+    def _pairs(self, low, high, sign):
+        """Account for sentences that run across the paragraph breaks in [low, high)"""
+        # Paragraphs are never blank, so each pair's join depends only on its two neighbours
+        for index in range(low, high - 1):
+            if self.summaries[index]['trail_open'] and self.summaries[index + 1]['lead_open']:
+                self.totals['sentences'] -= sign
+    
+    def _check_index(self, index):
+        if not 0 <= index < len(self.paragraphs):
+            raise IndexError(f"Paragraph index {index} out of range")
+
+@instrumented('live_sessions')
+class LiveAnalysisSessions:
+    """In-memory LRU of editable documents for live analytics"""
+    
+    def __init__(self, analytics_service, max_sessions=256):
+        self.analytics_service = analytics_service
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def create(self, content):
+        """Start a session and return its id with the initial analysis"""
+        document = EditableDocument(self.analytics_service, content)
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._sessions[session_id] = document
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session_id, document.analysis()
+    
+    def edit(self, session_id, operation, index, text=''):
+        """Apply a paragraph edit and return the updated analysis"""
+        with self._lock:
+            document = self._get(session_id)
+            if operation == 'replace':
+                document.replace(index, text)
+            elif operation == 'insert':
+                document.insert(index, text)
+            elif operation == 'delete':
+                document.delete(index)
+            else:
+                raise ValueError(f"Unknown edit operation: {operation}")
+            return document.analysis()
+    
+    def analysis(self, session_id, include_content=False):
+        """Current analysis of a session"""
+        with self._lock:
+            document = self._get(session_id)
+            result = document.analysis()
+            if include_content:
+                result['content'] = document.content
+            return result
+    
+    def close(self, session_id):
+        """Drop a session"""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+    
+    def _get(self, session_id):
+        document = self._sessions.get(session_id)
+        if document is None:
+            raise KeyError(session_id)
+        self._sessions.move_to_end(session_id)
+        return document
+
+def _analyze(analytics_service, summary):
+    """Analytics from a merged summary (or nothing at all)"""
+    if summary is None:
+        counts = {category: 0 for category in analytics_service.phrase_matcher.categories}
+        return analytics_service.analyze_totals(0, 0, 0, counts)
+    return analytics_service.analyze_totals(
+        summary['words'], summary['sentences'], summary['complex_words'], dict(summary['indicators']['counts']),
+        summary['syllables'], summary['polysyllables']
+    )
@@ -1,16 +1,23 @@
-import google.generativeai as genai
-from config import Config
+from .llm import complete, complete_async
+from .metrics import instrumented
+from .tracing import traced
 import json
 import re
 from datetime import datetime
 
+@instrumented('innovation_service')
+@traced('innovation_service')
 class InnovationService:
-    def __init__(self):
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-    
     def generate_research_gaps(self, topic):
         """Identify research gaps and future directions"""
-        prompt = f"""
+        return complete(self._generate_research_gaps_prompt(topic))
+    
+    async def generate_research_gaps_async(self, topic):
+        """Async variant of generate_research_gaps"""
+        return await complete_async(self._generate_research_gaps_prompt(topic))
+    
+    def _generate_research_gaps_prompt(self, topic):
+        return f"""
         Analyze the current state of research on "{topic}" and identify:
         1. Key research gaps that need addressing
         2. Emerging trends and opportunities
@@ -20,14 +27,17 @@ class InnovationService:
         
         Format as structured sections with specific, actionable insights.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
     
     def generate_counterarguments(self, main_argument, topic):
         """Generate balanced counterarguments and rebuttals"""
-        prompt = f"""
+        return complete(self._generate_counterarguments_prompt(main_argument, topic))
+    
+    async def generate_counterarguments_async(self, main_argument, topic):
+        """Async variant of generate_counterarguments"""
+        return await complete_async(self._generate_counterarguments_prompt(main_argument, topic))
+    
+    def _generate_counterarguments_prompt(self, main_argument, topic):
+        return f"""
         For the argument: "{main_argument}" in the context of "{topic}"
         
         Provide:
@@ -38,14 +48,17 @@ class InnovationService:
         
         Maintain academic objectivity and intellectual rigor.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
     
     def generate_methodology_suggestions(self, research_question, field):
         """Suggest innovative research methodologies"""
-        prompt = f"""
+        return complete(self._generate_methodology_suggestions_prompt(research_question, field))
+    
+    async def generate_methodology_suggestions_async(self, research_question, field):
+        """Async variant of generate_methodology_suggestions"""
+        return await complete_async(self._generate_methodology_suggestions_prompt(research_question, field))
+    
+    def _generate_methodology_suggestions_prompt(self, research_question, field):
+        return f"""
         For research question: "{research_question}" in {field}
         
         Suggest:
@@ -58,14 +71,17 @@ class InnovationService:
         
         Include specific tools, techniques, and frameworks.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
     
     def generate_visual_abstracts(self, abstract_text):
         """Create visual abstract descriptions"""
-        prompt = f"""
+        return complete(self._generate_visual_abstracts_prompt(abstract_text))
+    
+    async def generate_visual_abstracts_async(self, abstract_text):
+        """Async variant of generate_visual_abstracts"""
+        return await complete_async(self._generate_visual_abstracts_prompt(abstract_text))
+    
+    def _generate_visual_abstracts_prompt(self, abstract_text):
+        return f"""
         Based on this abstract: "{abstract_text}"
         
         Create descriptions for:
@@ -77,14 +93,17 @@ class InnovationService:
         
         Provide specific visual elements and layout suggestions.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
     
     def generate_impact_assessment(self, research_topic, findings):
         """Assess potential research impact"""
-        prompt = f"""
+        return complete(self._generate_impact_assessment_prompt(research_topic, findings))
+    
+    async def generate_impact_assessment_async(self, research_topic, findings):
+        """Async variant of generate_impact_assessment"""
+        return await complete_async(self._generate_impact_assessment_prompt(research_topic, findings))
+    
+    def _generate_impact_assessment_prompt(self, research_topic, findings):
+        return f"""
         For research on "{research_topic}" with findings: "{findings}"
         
         Analyze:
@@ -97,8 +116,4 @@ class InnovationService:
         7. Stakeholder benefits
         
         Provide specific examples and metrics where possible.
-        """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
\ No newline at end of file
+        """
\ No newline at end of file
@@ -1,110 +1,159 @@
 import re
 import os
+import hashlib
+import threading
+from collections import Counter, OrderedDict
 from datetime import datetime
+from config import Config
+from .document_ast import (render_document, render_blocks, split_sections, parse_document, citation_key, citation_keys,
+                           LatexRenderer, RENDERERS)
+from .template_registry import get_template_registry
+from .metrics import cache_lookup, instrumented
 
+@instrumented('latex_service')
 class LatexService:
     def __init__(self):
-        self.template_dir = 'latex_templates'
+        self.template_dir = Config.LATEX_TEMPLATE_FOLDER
+        self.templates = get_template_registry()
+        
+        # document_id -> {section hash: rendered fragment}
+        self._section_cache = OrderedDict()
+        self._section_lock = threading.Lock()
+    
+    def generate_latex(self, content, title, author="Research Assistant", template=None, document_id=None,
+                       bibliography=None, date=None, numeric_keys=None):
+        """Generate LaTeX document from content; numeric_keys maps [n] citations to bib keys"""
+        
+        # Clean and format content; drafts with an id only re-render edited sections
+        if numeric_keys:
+            formatted_content = LatexRenderer(numeric_keys).render(parse_document(content)) if content else ""
+        elif document_id:
+            formatted_content = self._format_sections_for_latex(content, document_id)
+        else:
+            formatted_content = self._format_content_for_latex(content)
+        
+        # Load template and fill its slots in one pass
+        return self._load_template(template).render({
+            'TITLE': self._escape_latex(title),
+            'AUTHOR': self._escape_latex(author),
+            'DATE': self.today() if date is None else date,
+            'CONTENT': formatted_content,
+            'BIBLIOGRAPHY': f"\\bibliography{{{bibliography}}}" if bibliography else ''
+        })
+    
+    @staticmethod
+    def today():
+        """Date line for a generated document"""
+        return datetime.now().strftime('%B %d, %Y')
     
-    def generate_latex(self, content, title, author="Research Assistant"):
-        """Generate LaTeX document from content"""
+    def bibtex_keys(self, citations):
+        """BibTeX keys of the citation records, in order"""
+        keys = []
+        used_keys = set()
+        base_keys = [citation_key((paper.get('authors') or ['Anon'])[0], paper.get('year')) for paper in citations]
+        shared = Counter(base_keys)
+        lettered = Counter()
         
-        # Clean and format content
-        formatted_content = self._format_content_for_latex(content)
+        for base_key in base_keys:
+            key = base_key
+            # Works sharing first author and year are lettered in order, as the text cites them: 2020a, 2020b
+            if shared[base_key] > 1:
+                key = f"{base_key}{chr(ord('a') + lettered[base_key])}"
+                lettered[base_key] += 1
+            # A record whose year already carries a letter can still collide
+            while key in used_keys:
+                key += 'x'
+            used_keys.add(key)
+            keys.append(key)
+        return keys
+    
+    def generate_bibtex(self, citations, content=None):
+        """Generate BibTeX entries whose keys match the \\citep keys in the LaTeX"""
+        entries = []
+        papers = list(citations or [])
+        keys = self.bibtex_keys(papers)
+        used_keys = set(keys)
         
-        # Load template
-        template = self._load_template()
+        for paper, key in zip(papers, keys):
+            authors = paper.get('authors') or []
+            fields = [('author', ' and '.join(authors) or 'Unknown Author'), ('title', paper.get('title', 'Untitled'))]
+            if paper.get('journal'):
+                fields.append(('journal', paper['journal']))
+            if paper.get('year'):
+                fields.append(('year', str(paper['year'])))
+            if paper.get('doi'):
+                fields.append(('doi', paper['doi']))
+            if paper.get('url'):
+                fields.append(('url', paper['url']))
+            
+            entries.append(self._bibtex_entry('article', key, fields))
         
-        # Replace placeholders
-        latex_content = template.replace('{{TITLE}}', self._escape_latex(title))
-        latex_content = latex_content.replace('{{AUTHOR}}', self._escape_latex(author))
-        latex_content = latex_content.replace('{{DATE}}', datetime.now().strftime('%B %d, %Y'))
-        latex_content = latex_content.replace('{{CONTENT}}', formatted_content)
+        # Placeholders without a matching record still need an entry to compile
+        if content:
+            for key in citation_keys(content):
+                if key not in used_keys:
+                    used_keys.add(key)
+                    entries.append(self._bibtex_entry('misc', key, [('note', 'Citation placeholder without a matching record')]))
         
-        return latex_content
+        return '\n'.join(entries)
     
-    def _load_template(self):
+    def _bibtex_entry(self, entry_type, key, fields):
+        """Format one BibTeX entry"""
+        lines = [f"@{entry_type}{{{key},"]
+        for name, value in fields:
+            # URLs and DOIs are verbatim; everything else is LaTeX-escaped text
+            value = value if name in ('url', 'doi') else self._escape_latex(value)
+            lines.append(f"  {name} = {{{value}}},")
+        lines.append("}\n")
+        return '\n'.join(lines)
+    
+    def available_templates(self):
+        """List selectable LaTeX templates"""
+        return self.templates.names()
+    
+    def _load_template(self, name=None):
         """Load LaTeX template"""
-        template = r"""
-\documentclass[12pt,a4paper]{article}
-\usepackage[utf8]{inputenc}
-\usepackage[T1]{fontenc}
-\usepackage{amsmath}
-\usepackage{amsfonts}
-\usepackage{amssymb}
-\usepackage{graphicx}
-\usepackage{natbib}
-\usepackage{url}
-\usepackage{hyperref}
-\usepackage{geometry}
-\usepackage{setspace}
-
-\geometry{margin=1in}
-\doublespacing
-
-\title{{{TITLE}}}
-\author{{{AUTHOR}}}
-\date{{{DATE}}}
-
-\begin{document}
-
-\maketitle
-
-\begin{abstract}
-This research paper was generated using an AI-powered research assistant. The content provides a comprehensive analysis of the given topic with proper academic structure and formatting.
-\end{abstract}
-
-{{CONTENT}}
-
-\end{document}
-"""
-        return template
+        return self.templates.get(name or Config.LATEX_DEFAULT_TEMPLATE)
     
     def _format_content_for_latex(self, content):
         """Format content for LaTeX"""
         if not content:
             return ""
         
-        # Replace markdown-style headers with LaTeX sections
-        content = re.sub(r'^# (.*?)$', r'\\section{\1}', content, flags=re.MULTILINE)
-        content = re.sub(r'^## (.*?)$', r'\\subsection{\1}', content, flags=re.MULTILINE)
-        content = re.sub(r'^### (.*?)$', r'\\subsubsection{\1}', content, flags=re.MULTILINE)
-        
-        # Handle bold and italic text
-        content = re.sub(r'\*\*(.*?)\*\*', r'\\textbf{\1}', content)
-        content = re.sub(r'\*(.*?)\*', r'\\textit{\1}', content)
+        # Parsed once per content hash; escaping applies only to text nodes
+        return render_document(content, 'latex')
+    
+    def _format_sections_for_latex(self, content, document_id):
+        """Format content for LaTeX, reusing cached fragments of unchanged sections"""
+        if not content:
+            return ""
         
-        # Handle citations
-        content = re.sub(r'\[([^\]]+), (\d{4})\]', r'\\citep{\1\2}', content)
+        with self._section_lock:
+            cached = self._section_cache.pop(document_id, {})
         
-        # Escape special LaTeX characters
-        content = self._escape_latex(content)
+        fragments = {}
+        blocks = []
+        for section in split_sections(content):
+            digest = hashlib.sha1(section.encode('utf-8')).hexdigest()
+            if digest not in fragments:
+                fragment = cached.get(digest)
+                cache_lookup('latex_sections', fragment is not None)
+                fragments[digest] = fragment if fragment is not None else render_blocks(section, 'latex')
+            blocks.extend(fragments[digest])
         
-        # Handle paragraphs (double newlines)
-        content = re.sub(r'\n\s*\n', r'\n\n', content)
+        # Keep only the current sections so the cache tracks the latest draft
+        with self._section_lock:
+            self._section_cache[document_id] = fragments
+            while len(self._section_cache) > Config.LATEX_SECTION_CACHE_DOCUMENTS:
+                self._section_cache.popitem(last=False)
         
-        return content
+        if not blocks:
+            return ""
+        return '\n\n'.join(blocks) + '\n'
     
     def _escape_latex(self, text):
         """Escape special LaTeX characters"""
         if not text:
             return ""
         
-        # Escape special characters
-        special_chars = {
-            '&': r'\&',
-            '%': r'\%',
-            '$': r'\$',
-            '#': r'\#',
-            '^': r'\textasciicircum{}',
-            '_': r'\_',
-            '{': r'\{',
-            '}': r'\}',
-            '~': r'\textasciitilde{}',
-            '\\': r'\textbackslash{}'
-        }
-        
-        for char, replacement in special_chars.items():
-            text = text.replace(char, replacement)
-        
-        return text
+        return RENDERERS['latex'].escape(text)
@@ -0,0 +1,49 @@
+import threading
+from config import Config
+from .metrics import LLM_PROMPT_SIZE, LLM_RESPONSE_SIZE, upstream_call
+from .tracing import span
+
+DEFAULT_MODEL = "models/gemini-1.5-flash"
+
+_genai = None
+_models = {}
+_lock = threading.Lock()
+
+def _sdk():
+    """Import and configure the Gemini SDK once, on the first model request"""
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        genai.configure(api_key=Config.GEMINI_API_KEY)
+        _genai = genai
+    return _genai
+
+def generative_model(model_name=DEFAULT_MODEL):
+    """Shared GenerativeModel for model_name"""
+    model = _models.get(model_name)
+    if model is None:
+        with _lock:
+            model = _models.get(model_name)
+            if model is None:
+                model = _sdk().GenerativeModel(model_name)
+                _models[model_name] = model
+    return model
+
+def complete(prompt, model_name=DEFAULT_MODEL):
+    """Text of one completion"""
+    LLM_PROMPT_SIZE.observe(len(prompt), model_name)
+    with span('gemini.generate_content', model=model_name, prompt_chars=len(prompt)):
+        with upstream_call('gemini', 'generate_content'):
+            text = generative_model(model_name).generate_content(prompt).text
+    LLM_RESPONSE_SIZE.observe(len(text), model_name)
+    return text
+
+async def complete_async(prompt, model_name=DEFAULT_MODEL):
+    """Text of one completion, awaited on the event loop instead of holding a thread"""
+    LLM_PROMPT_SIZE.observe(len(prompt), model_name)
+    with span('gemini.generate_content', model=model_name, prompt_chars=len(prompt)):
+        with upstream_call('gemini', 'generate_content'):
+            response = await generative_model(model_name).generate_content_async(prompt)
+            text = response.text
+    LLM_RESPONSE_SIZE.observe(len(text), model_name)
+    return text
@@ -0,0 +1,225 @@
+import bisect
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+class _Sharded:
+    """Per-thread value dicts, merged on collection"""
+    
+    kind = None
+    
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._lock = threading.Lock()
+    
+    def _shard(self):
+        # Each thread records into its own dict, so recording a value takes no lock
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), values))
+            return values
+    
+    def _collect(self):
+        """Merged {labels: value}; shards of finished threads are folded into one"""
+        with self._lock:
+            live = []
+            for thread, values in self._shards:
+                if thread.is_alive():
+                    live.append((thread, values))
+                else:
+                    self._merge(self._retired, values)
+            self._shards = live
+            merged = self._merge({}, self._retired)
+            for _, values in live:
+                self._merge(merged, dict(values))
+        return merged
+
+class Counter(_Sharded):
+    kind = 'counter'
+    
+    def inc(self, *labels, amount=1):
+        values = self._shard()
+        values[labels] = values.get(labels, 0) + amount
+    
+    @staticmethod
+    def _merge(into, values):
+        for labels, value in values.items():
+            into[labels] = into.get(labels, 0) + value
+        return into
+    
+    def samples(self):
+        return [(self.name, labels, value) for labels, value in sorted(self._collect().items())]
+
+class Histogram(_Sharded):
+    kind = 'histogram'
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+    
+    def observe(self, value, *labels):
+        values = self._shard()
+        entry = values.get(labels)
+        if entry is None:
+            # One slot per bucket plus +Inf, then sum and count
+            entry = values[labels] = [0] * (len(self.buckets) + 3)
+        entry[bisect.bisect_left(self.buckets, value)] += 1
+        entry[-2] += value
+        entry[-1] += 1
+    
+    @staticmethod
+    def _merge(into, values):
+        for labels, entry in values.items():
+            total = into.get(labels)
+            if total is None:
+                into[labels] = list(entry)
+            else:
+                for index, value in enumerate(entry):
+                    total[index] += value
+        return into
+    
+    def samples(self):
+        samples = []
+        for labels, entry in sorted(self._collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), entry):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", labels + (('le', _format(bound)),), cumulative))
+            samples.append((f"{self.name}_sum", labels, entry[-2]))
+            samples.append((f"{self.name}_count", labels, entry[-1]))
+        return samples
+
+def _metric(cls, name, documentation, labelnames, **options):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, documentation, labelnames, **options)
+        return metric
+
+def counter(name, documentation, labelnames=()):
+    """Registered counter, created on first use of the name"""
+    return _metric(Counter, name, documentation, labelnames)
+
+def histogram(name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+    """Registered histogram, created on first use of the name"""
+    return _metric(Histogram, name, documentation, labelnames, buckets=buckets)
+
+def _format(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return repr(value)
+    return str(value)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def render():
+    """Every registered metric in the Prometheus text exposition format"""
+    # Only this process's numbers; each worker process is scraped on its own
+    lines = []
+    with _registry_lock:
+        metrics = list(_registry.values())
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            pairs = list(zip(metric.labelnames, labels[:len(metric.labelnames)])) + list(labels[len(metric.labelnames):])
+            label_text = ','.join(f'{key}="{_escape(label)}"' for key, label in pairs)
+            lines.append(f"{name}{{{label_text}}} {_format(value)}" if label_text else f"{name} {_format(value)}")
+    return '\n'.join(lines) + '\n'
+
+HTTP_REQUESTS = counter('http_requests_total', 'HTTP requests by route, method and status', ['route', 'method', 'status'])
+HTTP_LATENCY = histogram('http_request_duration_seconds', 'HTTP request latency', ['route', 'method'])
+SERVICE_LATENCY = histogram('service_call_duration_seconds', 'Service method latency', ['service', 'method'])
+SERVICE_ERRORS = counter(
+    'service_call_errors_total', 'Service calls that raised or returned success: false', ['service', 'method', 'error']
+)
+UPSTREAM_LATENCY = histogram('upstream_request_duration_seconds', 'Calls to external APIs', ['upstream', 'operation'])
+UPSTREAM_ERRORS = counter('upstream_errors_total', 'Failed calls to external APIs', ['upstream', 'operation', 'error'])
+CACHE_REQUESTS = counter('cache_requests_total', 'Cache lookups by result', ['cache', 'result'])
+LLM_PROMPT_SIZE = histogram('llm_prompt_characters', 'Prompt length sent to the model', ['model'], SIZE_BUCKETS)
+LLM_RESPONSE_SIZE = histogram('llm_response_characters', 'Completion length returned by the model', ['model'], SIZE_BUCKETS)
+
+def observe_request(route, method, status, seconds):
+    HTTP_REQUESTS.inc(route, method, str(status))
+    HTTP_LATENCY.observe(seconds, route, method)
+
+def cache_lookup(cache, hit):
+    CACHE_REQUESTS.inc(cache, 'hit' if hit else 'miss')
+
+@contextmanager
+def upstream_call(upstream, operation):
+    """Time one external call; exceptions are counted by type and re-raised"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        UPSTREAM_ERRORS.inc(upstream, operation, type(e).__name__)
+        raise
+    finally:
+        UPSTREAM_LATENCY.observe(time.perf_counter() - start, upstream, operation)
+
+def _failed(result):
+    """Services that fold errors into their result report success: false"""
+    return isinstance(result, dict) and result.get('success') is False
+
+def _timed(service, name, method):
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def timed_async(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = await method(*args, **kwargs)
+            except Exception as e:
+                SERVICE_ERRORS.inc(service, name, type(e).__name__)
+                raise
+            finally:
+                SERVICE_LATENCY.observe(time.perf_counter() - start, service, name)
+            if _failed(result):
+                SERVICE_ERRORS.inc(service, name, 'unsuccessful')
+            return result
+        return timed_async
+    
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except Exception as e:
+            SERVICE_ERRORS.inc(service, name, type(e).__name__)
+            raise
+        finally:
+            SERVICE_LATENCY.observe(time.perf_counter() - start, service, name)
+        if _failed(result):
+            SERVICE_ERRORS.inc(service, name, 'unsuccessful')
+        return result
+    return timed
+
+def instrumented(service):
+    """Class decorator timing every public method; generators are left alone since they return at once"""
+    def decorate(cls):
+        for name, member in list(vars(cls).items()):
+            if name.startswith('_') or not inspect.isfunction(member) or inspect.isgeneratorfunction(member):
+                continue
+            setattr(cls, name, _timed(service, name, member))
+        return cls
+    return decorate
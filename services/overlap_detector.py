@@ -0,0 +1,338 @@
+import hashlib
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from config import Config
+from .metrics import instrumented
+
+WORD = re.compile(r'\w+')
+HASH_MASK = (1 << 64) - 1
+EMPTY_BIN = HASH_MASK
+
+def shingle_hash(shingle):
+    """64-bit hash that is the same in every process, unlike the salted built-in str hash"""
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+
+class Fingerprint:
+    """Word shingles of a text with their positions and a one-permutation MinHash signature"""
+    
+    def __init__(self, text, shingle_size, num_bins):
+        self.shingle_size = shingle_size
+        self.word_spans = array('q')
+        words = []
+        for match in WORD.finditer(text):
+            words.append(match.group().lower())
+            self.word_spans.append(match.start())
+            self.word_spans.append(match.end())
+        
+        # Shingle i covers words i .. i + shingle_size - 1
+        self.shingles = array('Q', (
+            shingle_hash(' '.join(words[i:i + shingle_size]))
+            for i in range(len(words) - shingle_size + 1)
+        ))
+        self.shingle_set = frozenset(self.shingles)
+        self.signature = self._signature(num_bins)
+    
+    def _signature(self, num_bins):
+        """Minimum hash per bin in a single pass, with empty bins densified by rotation"""
+        signature = [EMPTY_BIN] * num_bins
+        for value in self.shingle_set:
+            slot = value % num_bins
+            rest = value // num_bins
+            if rest < signature[slot]:
+                signature[slot] = rest
+        
+        if len(self.shingle_set) and EMPTY_BIN in signature:
+            filled = [i for i, value in enumerate(signature) if value != EMPTY_BIN]
+            for i in range(num_bins):
+                if signature[i] == EMPTY_BIN:
+                    # Borrow from the next filled bin; the distance keeps borrowed values distinct
+                    donor = next((j for j in filled if j > i), filled[0])
+                    signature[i] = (signature[donor] + (donor - i) % num_bins * 0x9E3779B97F4A7C15) & HASH_MASK
+        return signature
+    
+    def span(self, first_shingle, last_shingle):
+        """Character range covered by shingles first..last"""
+        last_word = last_shingle + self.shingle_size - 1
+        return self.word_spans[2 * first_shingle], self.word_spans[2 * last_word + 1]
+
+class OverlapIndex:
+    """LSH index over MinHash signatures and sampled shingles of sources and stored papers"""
+    
+    def __init__(self, shingle_size=None, num_bins=None, bands=None, max_documents=None, sample_rate=None,
+                 min_sampled_matches=None, loader=None):
+        self.shingle_size = shingle_size or Config.OVERLAP_SHINGLE_SIZE
+        self.num_bins = num_bins or Config.OVERLAP_SIGNATURE_SIZE
+        self.bands = bands or Config.OVERLAP_LSH_BANDS
+        self.rows = self.num_bins // self.bands
+        self.max_documents = max_documents or Config.OVERLAP_INDEX_MAX_DOCUMENTS
+        self.sample_rate = sample_rate or Config.OVERLAP_SAMPLE_RATE
+        self.min_sampled_matches = min_sampled_matches or Config.OVERLAP_MIN_SAMPLED_MATCHES
+        # doc_id -> text or None; without a loader the index keeps each text itself
+        self.loader = loader
+        
+        # doc_id -> (signature, sampled shingles, metadata, text); full fingerprints are rebuilt on demand
+        self._documents = OrderedDict()
+        self._fingerprints = OrderedDict()
+        self._buckets = [{} for _ in range(self.bands)]
+        # Bands catch near-duplicates; sampled shingle postings catch short passages in long documents
+        self._postings = {}
+        self._lock = threading.Lock()
+        self._seeded = False
+    
+    def fingerprint(self, text):
+        return Fingerprint(text or '', self.shingle_size, self.num_bins)
+    
+    def add(self, doc_id, text, metadata=None):
+        """Index a document, replacing any earlier version with the same id"""
+        fingerprint = self.fingerprint(text)
+        with self._lock:
+            self._remove(doc_id)
+            self._insert(doc_id, fingerprint, metadata, text)
+            while len(self._documents) > self.max_documents:
+                self._remove(next(iter(self._documents)))
+        return fingerprint
+    
+    def seed(self, papers):
+        """Index (doc_id, text, metadata) entries, newest first, on a background thread; runs once per index"""
+        with self._lock:
+            if self._seeded:
+                return None
+            self._seeded = True
+        thread = threading.Thread(target=self._seed, args=(papers,), name='overlap-seed', daemon=True)
+        thread.start()
+        return thread
+    
+    def _seed(self, papers):
+        for doc_id, text, metadata in papers:
+            fingerprint = self.fingerprint(text)
+            with self._lock:
+                # Papers added since startup are newer and stay as they are; seeding never evicts them
+                if len(self._documents) >= self.max_documents:
+                    return
+                if doc_id in self._documents:
+                    continue
+                self._insert(doc_id, fingerprint, metadata, text)
+                self._documents.move_to_end(doc_id, last=False)
+    
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+    
+    def __len__(self):
+        return len(self._documents)
+    
+    def candidates(self, fingerprint, exclude=None):
+        """(doc_id, metadata) of documents sharing an LSH band or enough sampled shingles with the fingerprint"""
+        found = set()
+        hits = {}
+        with self._lock:
+            for band, key in enumerate(self._band_keys(self._signature(fingerprint))):
+                found.update(self._buckets[band].get(key, ()))
+            postings = self._postings
+            for value in self._sampled(fingerprint):
+                for doc_id in postings.get(value, ()):
+                    hits[doc_id] = hits.get(doc_id, 0) + 1
+            found.update(doc_id for doc_id, count in hits.items() if count >= self.min_sampled_matches)
+            found.discard(exclude)
+            return [(doc_id, self._documents[doc_id][2]) for doc_id in found]
+    
+    def source(self, doc_id):
+        """Full fingerprint of an indexed document, rebuilt from its text, or None"""
+        with self._lock:
+            source = self._fingerprints.get(doc_id)
+            if source is not None:
+                self._fingerprints.move_to_end(doc_id)
+                return source
+            entry = self._documents.get(doc_id)
+        if entry is None:
+            return None
+        text = entry[3] if self.loader is None else self.loader(doc_id)
+        if text is None:
+            return None
+        
+        source = self.fingerprint(text)
+        with self._lock:
+            if doc_id in self._documents:
+                self._fingerprints[doc_id] = source
+                while len(self._fingerprints) > Config.OVERLAP_FINGERPRINT_CACHE:
+                    self._fingerprints.popitem(last=False)
+        return source
+    
+    def query(self, text, exclude=None, min_containment=0.0, fingerprint=None):
+        """Overlap report for text against every indexed document it collides with"""
+        fingerprint = fingerprint or self.fingerprint(text)
+        matches = []
+        for doc_id, metadata in self.candidates(fingerprint, exclude):
+            source = self.source(doc_id)
+            if source is None:
+                continue
+            match = compare(fingerprint, source, text)
+            if match and match['containment'] >= min_containment:
+                match.update({'doc_id': doc_id, 'metadata': metadata})
+                matches.append(match)
+        return report(fingerprint, matches)
+    
+    @staticmethod
+    def _signature(fingerprint):
+        return array('Q', fingerprint.signature) if fingerprint.shingle_set else array('Q')
+    
+    def _band_keys(self, signature):
+        if not signature:
+            return []
+        return [hash(tuple(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)]
+    
+    def _sampled(self, fingerprint):
+        """Roughly one shingle in sample_rate, chosen by hash so both sides pick the same ones"""
+        rate = self.sample_rate
+        return array('Q', (value for value in fingerprint.shingle_set if value % rate == 0))
+    
+    def _insert(self, doc_id, fingerprint, metadata, text):
+        signature, sampled = self._signature(fingerprint), self._sampled(fingerprint)
+        self._documents[doc_id] = (signature, sampled, metadata or {}, None if self.loader else text)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, set()).add(doc_id)
+        for value in sampled:
+            self._postings.setdefault(value, set()).add(doc_id)
+    
+    def _remove(self, doc_id):
+        self._fingerprints.pop(doc_id, None)
+        entry = self._documents.pop(doc_id, None)
+        if entry is None:
+            return
+        signature, sampled = entry[0], entry[1]
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._buckets[band][key]
+        for value in sampled:
+            documents = self._postings.get(value)
+            if documents is not None:
+                documents.discard(doc_id)
+                if not documents:
+                    del self._postings[value]
+
+def compare(query, source, text=None):
+    """Exact shared shingles between two fingerprints, merged into passages"""
+    shared = query.shingle_set & source.shingle_set
+    if not shared:
+        return None
+    
+    positions = {}
+    for index, value in enumerate(source.shingles):
+        if value in shared:
+            positions.setdefault(value, []).append(index)
+    
+    passages = []
+    run = None
+    for index, value in enumerate(query.shingles):
+        if value not in shared:
+            continue
+        source_positions = positions[value]
+        if run and run['last'] == index - 1:
+            # A repeated shingle occurs at several source positions; keep every alignment the run still fits
+            following = {position for position in source_positions if position - 1 in run['ends']}
+            if following:
+                run['last'] = index
+                run['ends'] = following
+                continue
+        if run:
+            passages.append(run)
+        run = {'first': index, 'last': index, 'ends': set(source_positions)}
+    if run:
+        passages.append(run)
+    for run in passages:
+        run['source_last'] = min(run['ends'])
+        run['source_first'] = run['source_last'] - (run['last'] - run['first'])
+    
+    result_passages = []
+    for run in passages:
+        start, end = query.span(run['first'], run['last'])
+        source_start, source_end = source.span(run['source_first'], run['source_last'])
+        passage = {
+            'start': start,
+            'end': end,
+            'source_start': source_start,
+            'source_end': source_end,
+            'words': run['last'] - run['first'] + query.shingle_size
+        }
+        if text is not None:
+            passage['text'] = text[start:end]
+        result_passages.append(passage)
+    
+    union = len(query.shingle_set | source.shingle_set)
+    return {
+        'containment': round(len(shared) / max(len(query.shingle_set), 1), 4),
+        'similarity': round(len(shared) / max(union, 1), 4),
+        'estimated_similarity': round(signature_similarity(query, source), 4),
+        'passages': result_passages
+    }
+
+def signature_similarity(first, second):
+    """Jaccard estimate from MinHash signatures"""
+    if not first.signature:
+        return 0.0
+    equal = sum(1 for a, b in zip(first.signature, second.signature) if a == b)
+    return equal / len(first.signature)
+
+def report(fingerprint, matches):
+    """Summary across all matched documents, most overlapping first"""
+    matches.sort(key=lambda match: match['containment'], reverse=True)
+    ranges = sorted((passage['start'], passage['end']) for match in matches for passage in match['passages'])
+    covered = 0
+    reached = 0
+    for start, end in ranges:
+        if end > reached:
+            covered += end - max(start, reached)
+            reached = end
+    
+    total_chars = (fingerprint.word_spans[-1] - fingerprint.word_spans[0]) if fingerprint.word_spans else 0
+    return {
+        'overlap_ratio': round(covered / total_chars, 4) if total_chars else 0.0,
+        'max_containment': matches[0]['containment'] if matches else 0.0,
+        'matches': matches
+    }
+
+@instrumented('overlap_detector')
+class OverlapDetector:
+    """Compare generated text against supplied sources and previously stored papers"""
+    
+    def __init__(self, index=None):
+        self.index = index or get_overlap_index()
+    
+    def check(self, text, sources=None, exclude=None):
+        """Overlap report against ad-hoc sources (compared directly) and the shared index"""
+        fingerprint = self.index.fingerprint(text)
+        result = self.index.query(text, exclude=exclude, fingerprint=fingerprint)
+        
+        for position, source in enumerate(sources or []):
+            if isinstance(source, str):
+                source = {'id': f"source-{position + 1}", 'content': source}
+            content = source.get('content') or source.get('abstract') or ''
+            match = compare(fingerprint, self.index.fingerprint(content), text)
+            if match:
+                match.update({
+                    'doc_id': source.get('id') or source.get('doi') or f"source-{position + 1}",
+                    'metadata': {key: source[key] for key in ('title', 'doi') if source.get(key)}
+                })
+                result['matches'].append(match)
+        
+        return report(fingerprint, result['matches'])
+    
+    def remember(self, doc_id, text, metadata=None):
+        """Add a generated or stored paper to the shared index"""
+        self.index.add(doc_id, text, metadata)
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+def get_overlap_index():
+    """Return the process-wide overlap index"""
+    global _shared_index
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = OverlapIndex()
+        return _shared_index
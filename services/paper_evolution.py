@@ -1,17 +1,25 @@
-import google.generativeai as genai
-from config import Config
+from .llm import complete, complete_async
+from .metrics import instrumented
+from .tracing import traced
+import asyncio
 import json
 
+@instrumented('paper_evolution')
+@traced('paper_evolution')
 class PaperEvolution:
-    def __init__(self):
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-    
     def generate_paper_versions(self, base_paper, target_audiences):
         """Generate multiple versions for different audiences"""
-        versions = {}
-        
-        for audience in target_audiences:
-            prompt = f"""
+        return {audience: complete(self._paper_version_prompt(base_paper, audience)) for audience in target_audiences}
+    
+    async def generate_paper_versions_async(self, base_paper, target_audiences):
+        """Async variant of generate_paper_versions; audiences are requested concurrently"""
+        texts = await asyncio.gather(*(
+            complete_async(self._paper_version_prompt(base_paper, audience)) for audience in target_audiences
+        ))
+        return dict(zip(target_audiences, texts))
+    
+    def _paper_version_prompt(self, base_paper, audience):
+        return f"""
             Adapt this paper for {audience} audience: "{base_paper[:500]}..."
             
             Adjustments needed:
@@ -23,18 +31,30 @@ class PaperEvolution:
             
             Maintain core research integrity while optimizing for audience.
             """
-            
-            model = genai.GenerativeModel("models/gemini-1.5-flash")
-            response = model.generate_content(prompt)
-            versions[audience] = response.text
-        
-        return versions
     
-    def create_research_timeline(self, topic):
+    def create_research_timeline(self, topic, seminal_works=None):
         """Create interactive research timeline"""
+        return complete(self._create_research_timeline_prompt(topic, seminal_works))
+    
+    async def create_research_timeline_async(self, topic, seminal_works=None):
+        """Async variant of create_research_timeline"""
+        return await complete_async(self._create_research_timeline_prompt(topic, seminal_works))
+    
+    def _create_research_timeline_prompt(self, topic, seminal_works=None):
+        anchors = ""
+        if seminal_works:
+            works = "\n".join(
+                f"- {w['title']} ({w['year'] or 'n.d.'}), authority {w['authority']}"
+                for w in seminal_works
+            )
+            anchors = f"""
+        Anchor the timeline on these seminal works, ranked by citation-graph authority:
+        {works}
+        """
+        
         prompt = f"""
         Create a comprehensive research timeline for "{topic}":
-        
+        {anchors}
         Format as JSON with:
         - year: timeline year
         - milestone: key development
@@ -45,14 +65,18 @@ class PaperEvolution:
         
         Cover past 15 years and predict next 5 years.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
+        return prompt
     
     def generate_research_ecosystem_map(self, central_topic):
         """Map research ecosystem around topic"""
-        prompt = f"""
+        return complete(self._generate_research_ecosystem_map_prompt(central_topic))
+    
+    async def generate_research_ecosystem_map_async(self, central_topic):
+        """Async variant of generate_research_ecosystem_map"""
+        return await complete_async(self._generate_research_ecosystem_map_prompt(central_topic))
+    
+    def _generate_research_ecosystem_map_prompt(self, central_topic):
+        return f"""
         Create ecosystem map for "{central_topic}" research:
         
         Include:
@@ -66,18 +90,26 @@ class PaperEvolution:
         
         Format as structured relationship data.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
+    
+    IMPACT_SCENARIOS = ['conservative', 'moderate', 'breakthrough']
     
     def simulate_paper_impact_scenarios(self, paper_concept):
         """Simulate different impact scenarios"""
-        scenarios = ['conservative', 'moderate', 'breakthrough']
-        results = {}
-        
-        for scenario in scenarios:
-            prompt = f"""
+        return {
+            scenario: complete(self._impact_scenario_prompt(paper_concept, scenario))
+            for scenario in self.IMPACT_SCENARIOS
+        }
+    
+    async def simulate_paper_impact_scenarios_async(self, paper_concept):
+        """Async variant of simulate_paper_impact_scenarios; scenarios are requested concurrently"""
+        texts = await asyncio.gather(*(
+            complete_async(self._impact_scenario_prompt(paper_concept, scenario))
+            for scenario in self.IMPACT_SCENARIOS
+        ))
+        return dict(zip(self.IMPACT_SCENARIOS, texts))
+    
+    def _impact_scenario_prompt(self, paper_concept, scenario):
+        return f"""
             Simulate {scenario} impact scenario for: "{paper_concept}"
             
             Predict:
@@ -91,16 +123,17 @@ class PaperEvolution:
             
             Provide specific metrics and timelines.
             """
-            
-            model = genai.GenerativeModel("models/gemini-1.5-flash")
-            response = model.generate_content(prompt)
-            results[scenario] = response.text
-        
-        return results
     
     def generate_research_mutation_paths(self, original_idea):
         """Generate how research idea could mutate/evolve"""
-        prompt = f"""
+        return complete(self._generate_research_mutation_paths_prompt(original_idea))
+    
+    async def generate_research_mutation_paths_async(self, original_idea):
+        """Async variant of generate_research_mutation_paths"""
+        return await complete_async(self._generate_research_mutation_paths_prompt(original_idea))
+    
+    def _generate_research_mutation_paths_prompt(self, original_idea):
+        return f"""
         Show evolution paths for research idea: "{original_idea}"
         
         Generate 5 mutation paths:
@@ -116,8 +149,4 @@ class PaperEvolution:
         - Potential obstacles
         - Timeline estimates
         - Impact amplification factors
-        """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
\ No newline at end of file
+        """
\ No newline at end of file
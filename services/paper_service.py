@@ -3,29 +3,36 @@ from .citation_service import CitationService
 from .innovation_service import InnovationService
 from .collaboration_service import CollaborationService
 from .analytics_service import AnalyticsService
+from .batch_analytics import BatchAnalyticsService
+from .reference_verifier import ReferenceVerifier
+from .overlap_detector import OverlapDetector
+from .paper_store import get_paper_store
+from .document_features import content_hash
+from .metrics import instrumented
+from .tracing import span, traced
+import asyncio
 import json
 import re
 
+@instrumented('paper_service')
+@traced('paper_service')
 class PaperService:
-    def __init__(self):
-        self.ai_service = AIService()
-        self.citation_service = CitationService()
-        self.innovation_service = InnovationService()
-        self.collaboration_service = CollaborationService()
-        self.analytics_service = AnalyticsService()
+    def __init__(self, ai_service=None, citation_service=None, innovation_service=None,
+                 collaboration_service=None, analytics_service=None, overlap_detector=None, paper_store=None):
+        self.citation_service = citation_service or CitationService()
+        self.ai_service = ai_service or AIService(self.citation_service)
+        self.innovation_service = innovation_service or InnovationService()
+        self.collaboration_service = collaboration_service or CollaborationService()
+        self.analytics_service = analytics_service or AnalyticsService()
+        self.batch_analytics = BatchAnalyticsService(self.analytics_service)
+        self.reference_verifier = ReferenceVerifier(self.citation_service)
+        self.overlap_detector = overlap_detector or OverlapDetector()
+        self.paper_store = paper_store or get_paper_store()
     
     def generate_paper(self, topic, paper_type='research', length='medium', 
                       citation_style='apa', include_references=True):
         """Generate complete research paper"""
-        
-        result = {
-            'success': False,
-            'paper': {},
-            'citations': [],
-            'references': [],
-            'outline': '',
-            'word_count': 0
-        }
+        result = self._paper_result()
         
         try:
             # Generate outline first
@@ -33,53 +40,123 @@ class PaperService:
             result['outline'] = outline
             
             # Generate main content with citations
+            candidates = None
             if include_references:
                 content = self.ai_service.generate_paper_with_citations(
                     topic, paper_type, length, citation_style
                 )
+                # Same candidate pool the generator cited from, best sources first
+                candidates = self.search_citations(topic, max_results=15)
             else:
                 content = self.ai_service.generate_paper_content(
                     topic, paper_type, length, outline
                 )
             
-            # Extract title from content or generate one
-            title = self._extract_title(content) or f"{paper_type.title()} on {topic}"
-            
-            # Get citations info if references were included
-            citations = []
-            references = []
+            self._finish_paper(result, topic, paper_type, length, citation_style, content, candidates)
             
+        except Exception as e:
+            result['error'] = str(e)
+        
+        return result
+    
+    async def generate_paper_async(self, topic, paper_type='research', length='medium',
+                                   citation_style='apa', include_references=True):
+        """Async variant of generate_paper; outline, content and citation search run concurrently"""
+        result = self._paper_result()
+        
+        try:
+            candidates = None
             if include_references:
-                citations = self.search_citations(topic, max_results=10)
-                references = self._format_references(citations, citation_style)
-            
-            # Calculate word count
-            word_count = len(content.split())
+                outline, content, candidates = await asyncio.gather(
+                    self.ai_service.generate_outline_async(topic, paper_type),
+                    self.ai_service.generate_paper_with_citations_async(topic, paper_type, length, citation_style),
+                    self.search_citations_async(topic, max_results=15)
+                )
+            else:
+                outline, content = await asyncio.gather(
+                    self.ai_service.generate_outline_async(topic, paper_type),
+                    self.ai_service.generate_paper_content_async(topic, paper_type, length)
+                )
+            result['outline'] = outline
             
-            result.update({
-                'success': True,
-                'paper': {
-                    'title': title,
-                    'content': content,
-                    'topic': topic,
-                    'type': paper_type,
-                    'length': length,
-                    'citation_style': citation_style
-                },
-                'citations': citations,
-                'references': references,
-                'word_count': word_count
-            })
+            # Reference verification may look up DOIs and overlap checks are CPU-bound; keep both off the loop
+            await asyncio.to_thread(
+                self._finish_paper, result, topic, paper_type, length, citation_style, content, candidates
+            )
             
         except Exception as e:
             result['error'] = str(e)
         
         return result
     
+    def _paper_result(self):
+        return {
+            'success': False,
+            'paper_id': None,
+            'paper': {},
+            'citations': [],
+            'references': [],
+            'reference_verification': None,
+            'overlap': None,
+            'outline': '',
+            'word_count': 0
+        }
+    
+    def _finish_paper(self, result, topic, paper_type, length, citation_style, content, candidates):
+        """Title, references, verification and overlap for generated content"""
+        # Extract title from content or generate one
+        title = self._extract_title(content) or f"{paper_type.title()} on {topic}"
+        
+        # Get citations info if references were included
+        citations = []
+        references = []
+        verification = None
+        
+        if candidates is not None:
+            citations = self.citation_service.rank_by_authority(candidates)[:10]
+            references = self._format_references(citations, citation_style)
+            with span('reference_verification'):
+                verification = self.reference_verifier.verify(content, candidates)
+        
+        # Verbatim overlap with the cited abstracts and earlier papers, then remember this one
+        paper_id = content_hash(content)
+        with span('overlap_check'):
+            overlap = self.overlap_detector.check(content, candidates, exclude=paper_id)
+            self.overlap_detector.remember(paper_id, content, {'title': title, 'topic': topic})
+        
+        # Calculate word count
+        word_count = len(content.split())
+        
+        fields = {
+            'success': True,
+            'paper_id': paper_id,
+            'paper': {
+                'title': title,
+                'content': content,
+                'topic': topic,
+                'type': paper_type,
+                'length': length,
+                'citation_style': citation_style
+            },
+            'citations': citations,
+            'references': references,
+            'reference_verification': verification,
+            'overlap': overlap,
+            'word_count': word_count
+        }
+        # Persist before answering so the returned id can always be loaded
+        with span('paper_store.put'):
+            self.paper_store.put(paper_id, {**result, **fields})
+        result.update(fields)
+    
     def search_citations(self, query, max_results=5):
         """Search for citations related to topic"""
         return self.citation_service.search_papers(query, max_results)
     
+    async def search_citations_async(self, query, max_results=5):
+        """Async variant of search_citations"""
+        return await self.citation_service.search_papers_async(query, max_results)
+    
     def _extract_title(self, content):
         """Extract title from content"""
         lines = content.split('\n')
@@ -125,13 +202,15 @@ class PaperService:
     def enhance_paper_citations(self, content, topic, citation_style='apa'):
         """Enhance existing paper content with real citations"""
         try:
-            enhanced_content = self.ai_service.enhance_citations_in_content(
+            linked = self.ai_service.link_citations_in_content(
                 content, topic, citation_style
             )
+            enhanced_content = linked['content']
             return {
                 'success': True,
                 'content': enhanced_content,
-                'word_count': len(enhanced_content.split())
+                'word_count': len(enhanced_content.split()),
+                'unresolved_citations': linked['unresolved']
             }
         except Exception as e:
             return {
@@ -140,6 +219,53 @@ class PaperService:
                 'content': content
             }
     
+    def enhance_paper_from_source(self, topic, source_content, paper_type='research'):
+        """Generate a paper from user-supplied source material and report copied passages"""
+        try:
+            content = self.ai_service.enhance_paper_from_source(topic, source_content, paper_type)
+            return self._source_paper_result(topic, source_content, paper_type, content)
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    
+    async def enhance_paper_from_source_async(self, topic, source_content, paper_type='research'):
+        """Async variant of enhance_paper_from_source"""
+        try:
+            content = await self.ai_service.enhance_paper_from_source_async(topic, source_content, paper_type)
+            return await asyncio.to_thread(self._source_paper_result, topic, source_content, paper_type, content)
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    
+    def _source_paper_result(self, topic, source_content, paper_type, content):
+        title = self._extract_title(content) or f"{paper_type.title()} on {topic}"
+        
+        paper_id = content_hash(content)
+        overlap = self.overlap_detector.check(
+            content, [{'id': 'source', 'content': source_content}], exclude=paper_id
+        )
+        self.overlap_detector.remember(paper_id, content, {'title': title, 'topic': topic})
+        
+        result = {
+            'success': True,
+            'paper_id': paper_id,
+            'paper': {
+                'title': title,
+                'content': content,
+                'topic': topic,
+                'type': paper_type
+            },
+            'overlap': overlap,
+            'word_count': len(content.split())
+        }
+        self.paper_store.put(paper_id, result)
+        return result
+    
+    def check_overlap(self, content, sources=None):
+        """Overlap report for any text against given sources and stored papers"""
+        try:
+            return {'success': True, 'overlap': self.overlap_detector.check(content, sources)}
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    
     def generate_enhanced_paper(self, topic, paper_type='research', length='medium'):
         """Generate paper with innovative features"""
         try:
@@ -157,8 +283,10 @@ class PaperService:
             impact_assessment = self.innovation_service.generate_impact_assessment(topic, "preliminary findings")
             
             # Analytics
-            quality_score = self.analytics_service.generate_quality_score(content)
-            suggestions = self.analytics_service.generate_improvement_suggestions(content)
+            with span('analytics'):
+                features = self.analytics_service.extract_features(content)
+                quality_score = self.analytics_service.generate_quality_score(features)
+                suggestions = self.analytics_service.generate_improvement_suggestions(features)
             
             # Collaboration features
             peer_review_checklist = self.collaboration_service.generate_peer_review_checklist(paper_type, "general")
@@ -171,6 +299,48 @@ class PaperService:
                 'improvement_suggestions': suggestions,
                 'peer_review_checklist': peer_review_checklist
             })
+            # Same content and id, so this only swaps in the enhanced result
+            with span('paper_store.put'):
+                self.paper_store.put(paper_result['paper_id'], paper_result)
+            
+            return paper_result
+            
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    
+    async def generate_enhanced_paper_async(self, topic, paper_type='research', length='medium'):
+        """Async variant of generate_enhanced_paper; the paper and every feature are requested concurrently"""
+        try:
+            (paper_result, research_gaps, methodology, impact_assessment,
+             peer_review_checklist) = await asyncio.gather(
+                self.generate_paper_async(topic, paper_type, length),
+                self.innovation_service.generate_research_gaps_async(topic),
+                self.innovation_service.generate_methodology_suggestions_async(f"Research on {topic}", "academic"),
+                self.innovation_service.generate_impact_assessment_async(topic, "preliminary findings"),
+                self.collaboration_service.generate_peer_review_checklist_async(paper_type, "general")
+            )
+            
+            if not paper_result['success']:
+                return paper_result
+            
+            # Analytics
+            with span('analytics'):
+                features = await asyncio.to_thread(
+                    self.analytics_service.extract_features, paper_result['paper']['content']
+                )
+                quality_score = self.analytics_service.generate_quality_score(features)
+                suggestions = self.analytics_service.generate_improvement_suggestions(features)
+            
+            paper_result.update({
+                'research_gaps': research_gaps,
+                'methodology_suggestions': methodology,
+                'impact_assessment': impact_assessment,
+                'quality_score': quality_score,
+                'improvement_suggestions': suggestions,
+                'peer_review_checklist': peer_review_checklist
+            })
+            with span('paper_store.put'):
+                await asyncio.to_thread(self.paper_store.put, paper_result['paper_id'], paper_result)
             
             return paper_result
             
@@ -180,17 +350,41 @@ class PaperService:
     def analyze_paper_quality(self, content):
         """Comprehensive paper quality analysis"""
         try:
-            readability = self.analytics_service.analyze_readability(content)
-            argument_structure = self.analytics_service.analyze_argument_structure(content)
-            quality_score = self.analytics_service.generate_quality_score(content)
-            suggestions = self.analytics_service.generate_improvement_suggestions(content)
+            # Tokenize once and share the features across every metric
+            features = self.analytics_service.extract_features(content)
+            readability = self.analytics_service.analyze_readability(features)
+            argument_structure = self.analytics_service.analyze_argument_structure(features)
+            quality_score = self.analytics_service.generate_quality_score(features)
+            suggestions = self.analytics_service.generate_improvement_suggestions(features)
+            vocabulary = self.analytics_service.analyze_vocabulary(features)
             
             return {
                 'success': True,
                 'readability': readability,
                 'argument_structure': argument_structure,
                 'quality_score': quality_score,
-                'suggestions': suggestions
+                'suggestions': suggestions,
+                'vocabulary': vocabulary
+            }
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    
+    def analyze_quality_batch(self, documents, percentiles=None):
+        """Score a batch of papers together and summarize the cohort"""
+        try:
+            ids = [doc.get('id', index) if isinstance(doc, dict) else index for index, doc in enumerate(documents)]
+            contents = [doc.get('content') or '' if isinstance(doc, dict) else str(doc or '') for doc in documents]
+            
+            scored = self.batch_analytics.score(contents, percentiles)
+            for doc_id, result in zip(ids, scored['results']):
+                result['id'] = doc_id
+            
+            return {
+                'success': True,
+                'count': len(contents),
+                'results': scored['results'],
+                'distribution': scored['distribution'],
+                'grades': scored['grades']
             }
         except Exception as e:
             return {'success': False, 'error': str(e)}
@@ -210,3 +404,21 @@ class PaperService:
             }
         except Exception as e:
             return {'success': False, 'error': str(e)}
+    
+    async def generate_research_proposal_async(self, research_idea, funding_type='academic'):
+        """Async variant of generate_research_proposal"""
+        try:
+            proposal_outline, methodology, impact_assessment = await asyncio.gather(
+                self.collaboration_service.generate_funding_proposal_outline_async(research_idea, funding_type),
+                self.innovation_service.generate_methodology_suggestions_async(research_idea, "research"),
+                self.innovation_service.generate_impact_assessment_async(research_idea, "proposed research")
+            )
+            
+            return {
+                'success': True,
+                'proposal_outline': proposal_outline,
+                'methodology': methodology,
+                'impact_assessment': impact_assessment
+            }
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
@@ -0,0 +1,531 @@
+import html
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from config import Config
+from .document_ast import split_sections
+from .metrics import instrumented
+
+logger = logging.getLogger(__name__)
+
+class PaperNotFound(Exception):
+    """Raised when no paper is stored under an id"""
+
+# Dictionary 0, used until enough papers are stored to train one. Text near the
+# end of a zlib dictionary is cheapest to reference, so the commonest strings go last.
+SEED_DICTIONARY = (
+    '{"success":true,"paper":{"title":"","content":"","topic":"","type":"research","length":"medium",'
+    '"citation_style":"apa"},"citations":[{"title":"","authors":[],"year":,"journal":"","doi":"10.",'
+    '"url":"https://doi.org/10.","abstract":"","citation_count":}],"references":[],'
+    '"reference_verification":{"verified":,"unverified":,"claims":[]},"overlap":{"overlap_ratio":,'
+    '"max_containment":,"matches":[]},"outline":"","word_count":}'
+    ' et al. (2019) et al. (2020) et al. (2021) et al. (2022) et al. (2023) et al. (2024) '
+    'Journal of Proceedings of the International Conference on IEEE Transactions on '
+    'statistically significant correlation between the relationship between the impact of '
+    'further research is needed to future research should explore limitations of this study include '
+    'the proposed framework the proposed approach the proposed method state-of-the-art '
+    'this paper examines this study investigates these findings suggest that the results indicate that '
+    'in addition, furthermore, moreover, however, therefore, consequently, in contrast, on the other hand, '
+    'for example, such as, in particular, as well as, with respect to, in terms of, as a result of, '
+    'previous studies have shown that recent studies have research has shown that it is important to '
+    'Keywords: Abstract\n\n## Abstract\n\n## References\n\n## Discussion\n\n## Results\n\n'
+    '## Methodology\n\n## Literature Review\n\n## Conclusion\n\n## Introduction\n\n'
+    ' of the and the in the to the on the for the with the that the is the of this and to '
+).encode('utf-8')
+
+def train_dictionary(samples, size, ngram=6):
+    """Build a zlib preset dictionary from the word n-grams shared by the most samples"""
+    counts = Counter()
+    for sample in samples:
+        words = sample.split(' ')
+        counts.update({' '.join(words[i:i + ngram]) for i in range(len(words) - ngram + 1)})
+    
+    # Worth = bytes saved across the corpus. Overlapping windows of one repeated
+    # passage are chained into a single run instead of being stored once each.
+    ranked = sorted(
+        (gram for gram, count in counts.items() if count > 1),
+        key=lambda gram: counts[gram] * len(gram), reverse=True
+    )
+    runs = []
+    tails = {}
+    total = 0
+    for gram in ranked:
+        if total >= size:
+            break
+        words = gram.split(' ')
+        index = tails.pop(' '.join(words[:-1]), None)
+        if index is None:
+            runs.append(gram)
+            index = len(runs) - 1
+            total += len(gram) + 1
+        else:
+            runs[index] += ' ' + words[-1]
+            total += len(words[-1]) + 1
+        tails[' '.join(words[1:])] = index
+    return ' '.join(reversed(runs)).encode('utf-8')[-size:]
+
+@instrumented('paper_store')
+class PaperStore:
+    """Content-addressed generated papers in SQLite, each section compressed on its own"""
+    
+    def __init__(self, path, dictionary_size=None, retrain_every=None, training_papers=None, compression_level=None):
+        self.path = path
+        self.dictionary_size = dictionary_size or Config.PAPER_DICTIONARY_SIZE
+        self.retrain_every = retrain_every or Config.PAPER_DICTIONARY_RETRAIN_EVERY
+        self.training_papers = training_papers or Config.PAPER_DICTIONARY_TRAINING_PAPERS
+        self.compression_level = compression_level if compression_level is not None else Config.PAPER_COMPRESSION_LEVEL
+        self._lock = threading.RLock()
+        self._training = False
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS paper_dictionaries ("
+            "id INTEGER PRIMARY KEY, data BLOB NOT NULL, created_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS papers ("
+            "id TEXT PRIMARY KEY, title TEXT, topic TEXT, type TEXT, dictionary INTEGER NOT NULL, "
+            "result BLOB NOT NULL, sections TEXT NOT NULL, size INTEGER NOT NULL, stored INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS paper_sections ("
+            "paper_id TEXT NOT NULL, position INTEGER NOT NULL, payload BLOB NOT NULL, "
+            "PRIMARY KEY (paper_id, position)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS papers_dictionary ON papers (dictionary);"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(papers)")}
+        if 'search_rowid' not in columns:
+            self._db.execute("ALTER TABLE papers ADD COLUMN search_rowid INTEGER")
+            self._db.execute("ALTER TABLE papers ADD COLUMN citation_style TEXT")
+        self._db.execute("CREATE UNIQUE INDEX IF NOT EXISTS papers_search_rowid ON papers (search_rowid)")
+        
+        # Search text is read back through this view, decompressing only the rows a snippet needs,
+        # so the full-text tables hold their index and no second copy of every paper
+        self._search_row = None
+        self._db.create_function('paper_search_text', 3, self._search_column, deterministic=True)
+        self._db.execute(
+            "CREATE VIEW IF NOT EXISTS paper_search_source AS SELECT search_rowid, "
+            "COALESCE(title, '') AS title, COALESCE(topic, '') AS topic, paper_search_text(id, updated_at, 2) AS body, "
+            "paper_search_text(id, updated_at, 3) AS citations, paper_search_text(id, updated_at, 4) AS facets "
+            "FROM papers"
+        )
+        legacy = self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'paper_search' AND sql LIKE '%paper_id UNINDEXED%'"
+        ).fetchone()
+        if legacy:
+            # Earlier versions kept the text, paper id and citation style in paper_search itself
+            self._db.executemany(
+                "UPDATE papers SET search_rowid = ?, citation_style = ? WHERE id = ?",
+                self._db.execute("SELECT rowid, NULLIF(citation_style, ''), paper_id FROM paper_search").fetchall()
+            )
+            self._db.execute("DROP TABLE IF EXISTS paper_search_prefix")
+            self._db.execute("DROP TABLE paper_search")
+        indexed = self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'paper_search'"
+        ).fetchone()
+        # The rowid is the save time in microseconds, so date filters are rowid ranges, and
+        # type and citation style are single tokens in facets
+        self._db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS paper_search USING fts5("
+            "title, topic, body, citations, facets, content = 'paper_search_source', content_rowid = 'search_rowid', "
+            "tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+        # Stems are not prefixes of the words they came from ("federated" is indexed as "feder"),
+        # so prefix terms run against an unstemmed index over the same text
+        self._db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS paper_search_prefix USING fts5("
+            "title, topic, body, citations, facets, content = 'paper_search_source', content_rowid = 'search_rowid', "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+        )
+        self._db.commit()
+        
+        self._dictionaries = {0: SEED_DICTIONARY}
+        self._dictionaries.update(self._db.execute("SELECT id, data FROM paper_dictionaries"))
+        self._dictionary = max(self._dictionaries)
+        
+        if not indexed:
+            self._index_existing()
+    
+    def put(self, paper_id, result):
+        """Store a generation result under its content hash; a later put refreshes the non-content fields"""
+        paper = result.get('paper') or {}
+        content = paper.get('content') or ''
+        rest = dict(result, paper={key: value for key, value in paper.items() if key != 'content'})
+        rest.pop('paper_id', None)
+        now = time.time()
+        
+        with self._lock:
+            existing = self._db.execute(
+                "SELECT dictionary, search_rowid FROM papers WHERE id = ?", (paper_id,)
+            ).fetchone()
+            dictionary = existing[0] if existing else self._dictionary
+            result_blob = self._compress(json.dumps(rest, separators=(',', ':')), dictionary)
+            
+            if existing:
+                # The search rows keep their rowid; they are removed with the old text and indexed with the new
+                self._unindex(existing[1])
+                self._db.execute(
+                    "UPDATE papers SET title = ?, topic = ?, type = ?, citation_style = ?, result = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    (paper.get('title'), paper.get('topic'), paper.get('type'), paper.get('citation_style'),
+                     result_blob, now, paper_id)
+                )
+                self._search_row = None
+                self._index_stored(existing[1])
+                self._db.commit()
+                return paper_id
+            
+            # Identical content always hashes to the same id, so sections are written once
+            sections = split_sections(content)
+            payloads = [self._compress(section, dictionary) for section in sections]
+            outline = [
+                {'index': index, 'heading': self._heading(section), 'length': len(section)}
+                for index, section in enumerate(sections)
+            ]
+            rowid = self._next_search_rowid(now)
+            self._db.execute(
+                "INSERT INTO papers (id, title, topic, type, citation_style, dictionary, result, sections, size, "
+                "stored, created_at, updated_at, search_rowid) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (paper_id, paper.get('title'), paper.get('topic'), paper.get('type'), paper.get('citation_style'),
+                 dictionary, result_blob, json.dumps(outline), len(content.encode('utf-8')),
+                 sum(map(len, payloads)) + len(result_blob), now, now, rowid)
+            )
+            self._index(rowid, self._search_text(paper, content, result.get('citations')))
+            self._db.executemany(
+                "INSERT INTO paper_sections (paper_id, position, payload) VALUES (?, ?, ?)",
+                [(paper_id, index, payload) for index, payload in enumerate(payloads)]
+            )
+            self._db.commit()
+            stored_since = self._db.execute(
+                "SELECT COUNT(*) FROM papers WHERE dictionary = ?", (self._dictionary,)
+            ).fetchone()[0]
+            retrain = stored_since >= self.retrain_every and not self._training
+            if retrain:
+                self._training = True
+        
+        if retrain:
+            # _training keeps later puts from starting another run meanwhile
+            threading.Thread(target=self._train_in_background, name='paper-dictionary', daemon=True).start()
+        return paper_id
+    
+    def get(self, paper_id):
+        """Full generation result with the content reassembled from its sections"""
+        return self._result(paper_id)
+    
+    def _result(self, paper_id):
+        with self._lock:
+            row = self._db.execute("SELECT dictionary, result FROM papers WHERE id = ?", (paper_id,)).fetchone()
+            if row is None:
+                raise PaperNotFound(paper_id)
+            payloads = [payload for payload, in self._db.execute(
+                "SELECT payload FROM paper_sections WHERE paper_id = ? ORDER BY position", (paper_id,)
+            )]
+        dictionary, result_blob = row
+        result = json.loads(self._decompress(result_blob, dictionary))
+        result['paper']['content'] = '\n'.join(self._decompress(payload, dictionary) for payload in payloads)
+        result['paper_id'] = paper_id
+        return result
+    
+    def sections(self, paper_id):
+        """Index, heading and length of each section"""
+        with self._lock:
+            row = self._db.execute("SELECT sections FROM papers WHERE id = ?", (paper_id,)).fetchone()
+        if row is None:
+            raise PaperNotFound(paper_id)
+        return json.loads(row[0])
+    
+    def section(self, paper_id, index):
+        """One section's text, without touching the rest of the paper"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT papers.dictionary, paper_sections.payload FROM paper_sections "
+                "JOIN papers ON papers.id = paper_sections.paper_id "
+                "WHERE paper_sections.paper_id = ? AND paper_sections.position = ?",
+                (paper_id, index)
+            ).fetchone()
+        if row is None:
+            raise PaperNotFound(f"{paper_id} section {index}")
+        content = self._decompress(row[1], row[0])
+        return {'paper_id': paper_id, 'index': index, 'heading': self._heading(content), 'content': content}
+    
+    def search(self, query, paper_type=None, citation_style=None, since=None, until=None, limit=20, offset=0):
+        """Papers matching every query word, best bm25 first, with a highlighted snippet"""
+        words, prefixes = self.query_terms(query)
+        if not words and not prefixes:
+            return {'results': [], 'has_more': False}
+        
+        facets = ' '.join(
+            f'facets : "{self._facet(facet, value)}"'
+            for facet, value in (('type', paper_type), ('style', citation_style)) if value
+        )
+        # Whole words drive the stemmed index and prefixes only filter; a query of
+        # prefixes alone is ranked and highlighted by the unstemmed index instead
+        table = 'paper_search' if words else 'paper_search_prefix'
+        match = ' '.join(filter(None, [self.match_expression(words or prefixes, prefix=not words), facets]))
+        conditions = ''
+        params = [match]
+        if words and prefixes:
+            conditions += " AND paper_search.rowid IN (SELECT rowid FROM paper_search_prefix WHERE paper_search_prefix MATCH ?)"
+            params.append(self.match_expression(prefixes, prefix=True))
+        if since:
+            conditions += f" AND {table}.rowid >= ?"
+            params.append(int(self._timestamp(since) * 1e6))
+        if until:
+            conditions += f" AND {table}.rowid < ?"
+            params.append(int(self._timestamp(until, end_of_day=True) * 1e6))
+        params.extend([limit + 1, offset])
+        
+        with self._lock:
+            # Title and topic hits outrank the same words deep in the body
+            ranked = self._db.execute(
+                f"SELECT {table}.rowid, bm25({table}, 10.0, 5.0, 1.0, 2.0, 0.0) AS score "
+                f"FROM {table} WHERE {table} MATCH ?{conditions} ORDER BY score LIMIT ? OFFSET ?",
+                params
+            ).fetchall()
+            page = ranked[:limit]
+            # Snippets read the text back through the content view, so only the returned page is decompressed
+            rows = {row[0]: row[1:] for row in self._db.execute(
+                f"SELECT {table}.rowid, papers.id, papers.title, papers.topic, papers.type, papers.citation_style, "
+                f"snippet({table}, 2, char(2), char(3), '…', 16) "
+                f"FROM {table} JOIN papers ON papers.search_rowid = {table}.rowid "
+                f"WHERE {table} MATCH ? AND {table}.rowid IN ({', '.join('?' * len(page))})",
+                [match] + [rowid for rowid, _ in page]
+            )} if page else {}
+        
+        results = []
+        for rowid, score in page:
+            paper_id, title, topic, paper_type, style, snippet = rows[rowid]
+            results.append({
+                'paper_id': paper_id, 'title': title, 'topic': topic, 'type': paper_type or None,
+                'citation_style': style or None, 'created_at': rowid / 1e6, 'snippet': self._highlight(snippet),
+                'score': round(-score, 4)
+            })
+        return {'results': results, 'has_more': len(ranked) > limit}
+    
+    @staticmethod
+    def _highlight(snippet):
+        """Escape snippet text for HTML and turn the match markers into <mark> tags"""
+        return html.escape(snippet).replace('\x02', '<mark>').replace('\x03', '</mark>')
+    
+    @staticmethod
+    def query_terms(query):
+        """Whole words and prefixes (words written with a trailing *) of a search query"""
+        words, prefixes = [], []
+        for word, star in re.findall(r'(\w+)(\*?)', query or ''):
+            (prefixes if star else words).append(word)
+        return words, prefixes
+    
+    @staticmethod
+    def match_expression(words, prefix=False):
+        """FTS5 query requiring every word, or every prefix"""
+        return ' '.join(f'"{word}"*' if prefix else f'"{word}"' for word in words)
+    
+    @staticmethod
+    def _facet(name, value):
+        """One token per facet value, e.g. styleieee, so filtering is a single doclist lookup"""
+        return name + ''.join(re.findall(r'\w', str(value).lower()))
+    
+    def export_item(self, paper_id):
+        """Bulk export item for a stored paper, or None"""
+        try:
+            result = self.get(paper_id)
+        except PaperNotFound:
+            return None
+        return {
+            'paper_id': paper_id,
+            'title': result['paper'].get('title'),
+            'content': result['paper']['content'],
+            'citations': result.get('citations') or []
+        }
+    
+    def recent(self, limit):
+        """(paper_id, content, {'title', 'topic'}) of the newest papers, newest first, read one at a time"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, title, topic FROM papers ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        for paper_id, title, topic in rows:
+            content = self.content(paper_id)
+            if content is not None:
+                yield paper_id, content, {'title': title, 'topic': topic}
+    
+    def content(self, paper_id):
+        """A paper's content reassembled from its sections, or None"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT papers.dictionary, paper_sections.payload FROM paper_sections "
+                "JOIN papers ON papers.id = paper_sections.paper_id "
+                "WHERE paper_sections.paper_id = ? ORDER BY paper_sections.position",
+                (paper_id,)
+            ).fetchall()
+        if not rows:
+            return None
+        return '\n'.join(self._decompress(payload, dictionary) for dictionary, payload in rows)
+    
+    def stats(self):
+        """Paper count, raw and stored sizes, current dictionary"""
+        with self._lock:
+            papers, size, stored = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored), 0) FROM papers"
+            ).fetchone()
+        return {'papers': papers, 'bytes': size, 'stored_bytes': stored, 'dictionary': self._dictionary}
+    
+    def train(self):
+        """Train a new dictionary from the most recent papers' sections and use it for new papers"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT papers.dictionary, paper_sections.payload FROM paper_sections "
+                "JOIN papers ON papers.id = paper_sections.paper_id "
+                "WHERE papers.id IN (SELECT id FROM papers ORDER BY created_at DESC LIMIT ?)",
+                (self.training_papers,)
+            ).fetchall()
+        
+        # Training is the slow part; reads and writes keep going on the current dictionary meanwhile
+        samples = [self._decompress(payload, dictionary) for dictionary, payload in rows]
+        # The seed stays at the front for the JSON keys and headings every result repeats
+        data = SEED_DICTIONARY + train_dictionary(samples, self.dictionary_size - len(SEED_DICTIONARY))
+        
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO paper_dictionaries (data, created_at) VALUES (?, ?)", (data, time.time())
+            )
+            self._db.commit()
+            self._dictionary = cursor.lastrowid
+            self._dictionaries[self._dictionary] = data
+            return self._dictionary
+    
+    def _train_in_background(self):
+        try:
+            self.train()
+        except Exception as e:
+            logger.warning("Error training paper dictionary: %s", e)
+        finally:
+            self._training = False
+    
+    def _search_text(self, paper, content, citations):
+        """Title, topic, body, citations and facets columns of a paper's search rows"""
+        citation_text = '\n'.join(
+            ' '.join(filter(None, [
+                citation.get('title'), ', '.join(citation.get('authors') or []),
+                citation.get('journal'), str(citation.get('year') or '')
+            ]))
+            for citation in citations or []
+        )
+        facets = ' '.join(
+            self._facet(facet, value)
+            for facet, value in (('type', paper.get('type')), ('style', paper.get('citation_style'))) if value
+        )
+        return paper.get('title') or '', paper.get('topic') or '', content, citation_text, facets
+    
+    def _search_column(self, paper_id, updated_at, column):
+        """One column of a paper's search text, for the paper_search_source view"""
+        # The view asks for several columns of a row in turn, so the row is decoded once
+        key = (paper_id, updated_at)
+        if self._search_row is None or self._search_row[0] != key:
+            result = self._result(paper_id)
+            text = self._search_text(result['paper'], result['paper']['content'], result.get('citations'))
+            self._search_row = (key, text)
+        return self._search_row[1][column]
+    
+    def _next_search_rowid(self, saved_at):
+        """Microsecond rowid, bumped past the newest one if two saves land in the same tick"""
+        newest = self._db.execute("SELECT MAX(search_rowid) FROM papers").fetchone()[0] or 0
+        return max(int(saved_at * 1e6), newest + 1)
+    
+    def _index(self, rowid, text):
+        """Add one paper's search text to both full-text tables; the caller commits"""
+        for table in ('paper_search', 'paper_search_prefix'):
+            self._db.execute(
+                f"INSERT INTO {table} (rowid, title, topic, body, citations, facets) VALUES (?, ?, ?, ?, ?, ?)",
+                (rowid, *text)
+            )
+    
+    def _index_stored(self, rowid=None):
+        """Index stored papers, or the one with this rowid, from the content view; the caller commits"""
+        condition = "WHERE search_rowid = ?" if rowid is not None else "WHERE search_rowid IS NOT NULL"
+        for table in ('paper_search', 'paper_search_prefix'):
+            self._db.execute(
+                f"INSERT INTO {table} (rowid, title, topic, body, citations, facets) "
+                f"SELECT search_rowid, title, topic, body, citations, facets FROM paper_search_source {condition}",
+                (rowid,) if rowid is not None else ()
+            )
+    
+    def _unindex(self, rowid):
+        """Remove a paper from both full-text tables while the view still shows its indexed text"""
+        # External-content tables drop an entry by being handed the exact values it was built from
+        for table in ('paper_search', 'paper_search_prefix'):
+            self._db.execute(
+                f"INSERT INTO {table} ({table}, rowid, title, topic, body, citations, facets) "
+                f"SELECT 'delete', search_rowid, title, topic, body, citations, facets "
+                f"FROM paper_search_source WHERE search_rowid = ?",
+                (rowid,)
+            )
+    
+    def _index_existing(self):
+        """Index papers stored before the search tables existed"""
+        with self._lock:
+            for paper_id, created_at in self._db.execute(
+                "SELECT id, created_at FROM papers WHERE search_rowid IS NULL ORDER BY created_at"
+            ).fetchall():
+                style = self._result(paper_id)['paper'].get('citation_style')
+                self._db.execute(
+                    "UPDATE papers SET search_rowid = ?, citation_style = ? WHERE id = ?",
+                    (self._next_search_rowid(created_at), style, paper_id)
+                )
+            self._index_stored()
+            self._db.commit()
+    
+    @staticmethod
+    def _timestamp(value, end_of_day=False):
+        """Epoch seconds from a number or an ISO date; a bare date as an upper bound includes that day"""
+        if isinstance(value, (int, float)):
+            return float(value)
+        parsed = datetime.fromisoformat(value)
+        timestamp = parsed.timestamp()
+        if end_of_day and len(value) == 10:
+            timestamp += 24 * 3600
+        return timestamp
+    
+    def _dictionary_data(self, dictionary):
+        """Preset dictionary bytes, loading ones trained by other workers on first use"""
+        data = self._dictionaries.get(dictionary)
+        if data is None:
+            with self._lock:
+                row = self._db.execute("SELECT data FROM paper_dictionaries WHERE id = ?", (dictionary,)).fetchone()
+            if row is None:
+                raise KeyError(f"Unknown paper dictionary: {dictionary}")
+            data = self._dictionaries[dictionary] = row[0]
+        return data
+    
+    def _compress(self, text, dictionary):
+        compressor = zlib.compressobj(self.compression_level, zdict=self._dictionary_data(dictionary))
+        return compressor.compress(text.encode('utf-8')) + compressor.flush()
+    
+    def _decompress(self, payload, dictionary):
+        decompressor = zlib.decompressobj(zdict=self._dictionary_data(dictionary))
+        return (decompressor.decompress(payload) + decompressor.flush()).decode('utf-8')
+    
+    @staticmethod
+    def _heading(section):
+        first = section.lstrip('\n').split('\n', 1)[0]
+        return first.strip().lstrip('#').strip()
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+def get_paper_store():
+    """Return the process-wide paper store"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = PaperStore(Config.PAPER_DB_PATH)
+        return _shared_store
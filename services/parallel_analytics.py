@@ -0,0 +1,230 @@
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from config import Config
+from collections import Counter
+from .document_features import DocumentFeatures, sentence_spans
+from .syllable_lexicon import syllable_totals
+
+# Preferred shard cut: a blank line between paragraphs. Fallback for long
+# paragraphs: just after clause punctuation. Both are phrase-matcher barriers
+# and whitespace boundaries, so word and phrase counts split exactly.
+PARAGRAPH_CUT = re.compile(rb'\n[ \t\r\f\v]*\n')
+CLAUSE_CUT = re.compile(rb'[.!?;:,]+(?=[ \t\r\n])')
+SENTENCE_BREAK = re.compile(r'[.!?]')
+
+_worker_matchers = {}
+
+def _worker_matcher(lexicon_path):
+    """Phrase matcher compiled once per worker process and lexicon"""
+    matcher = _worker_matchers.get(lexicon_path)
+    if matcher is None:
+        from .analytics_service import AnalyticsService
+        from .phrase_matcher import build_matcher
+        matcher = build_matcher(AnalyticsService.INDICATOR_LEXICONS, lexicon_path)
+        _worker_matchers[lexicon_path] = matcher
+    return matcher
+
+def summarize_text(text, matcher, positions=True, cursor=None):
+    """Partial counts for one shard, plus the sentence edges needed to merge it"""
+    tokens = text.split()
+    spans = sentence_spans(text)
+    if positions:
+        indicators = matcher.scan(text)
+    else:
+        indicators = {'counts': matcher.counts(text, cursor), 'positions': None}
+    
+    token_counts = Counter(tokens)
+    syllables, polysyllables = syllable_totals(token_counts)
+    return {
+        'chars': len(text),
+        'words': len(tokens),
+        'complex_words': sum(count for token, count in token_counts.items() if len(token) > 6),
+        'syllables': syllables,
+        'polysyllables': polysyllables,
+        'sentences': len(spans),
+        # Sentence still open at the start/end of the shard, i.e. no [.!?] between it and the edge
+        'lead_open': bool(spans) and not SENTENCE_BREAK.search(text, 0, spans[0][0]),
+        'trail_open': bool(spans) and spans[-1][1] == len(text),
+        'has_break': bool(SENTENCE_BREAK.search(text)),
+        'indicators': indicators
+    }
+
+def merge_summaries(parts):
+    """Fold shard summaries left to right; exact for any cut at whitespace"""
+    merged = None
+    for part in parts:
+        if merged is None:
+            merged = _copy_summary(part)
+            continue
+        
+        offset = merged['chars']
+        if part['sentences'] and merged['sentences']:
+            joined = merged['trail_open'] and part['lead_open']
+            merged['sentences'] += part['sentences'] - joined
+            merged['trail_open'] = part['trail_open']
+        elif part['sentences']:
+            # Nothing before this shard held a sentence, so its lead decides the edge
+            merged['sentences'] = part['sentences']
+            merged['lead_open'] = part['lead_open'] and not merged['has_break']
+            merged['trail_open'] = part['trail_open']
+        elif part['has_break']:
+            merged['trail_open'] = False
+        
+        merged['chars'] += part['chars']
+        merged['words'] += part['words']
+        merged['complex_words'] += part['complex_words']
+        merged['syllables'] += part['syllables']
+        merged['polysyllables'] += part['polysyllables']
+        merged['has_break'] = merged['has_break'] or part['has_break']
+        
+        counts = merged['indicators']['counts']
+        for category, count in part['indicators']['counts'].items():
+            counts[category] = counts.get(category, 0) + count
+        if merged['indicators']['positions'] is not None:
+            positions = merged['indicators']['positions']
+            for category, matches in part['indicators']['positions'].items():
+                positions.setdefault(category, []).extend(
+                    (start + offset, end + offset, phrase) for start, end, phrase in matches
+                )
+    return merged
+
+def _copy_summary(part):
+    """Shallow copy that is safe to fold further shards into"""
+    merged = dict(part)
+    indicators = part['indicators']
+    merged['indicators'] = {
+        'counts': dict(indicators['counts']),
+        'positions': None if indicators['positions'] is None
+        else {category: list(matches) for category, matches in indicators['positions'].items()}
+    }
+    return merged
+
+def analyze_shards(shm_name, pieces, lexicon_path, positions):
+    """Worker entry point: summarize byte ranges of the shared text block"""
+    # Pool workers share the parent's resource tracker, which unlinks the block once
+    block = shared_memory.SharedMemory(name=shm_name)
+    try:
+        matcher = _worker_matcher(lexicon_path)
+        return [
+            summarize_text(bytes(block.buf[start:end]).decode('utf-8'), matcher, positions)
+            for start, end in pieces
+        ]
+    finally:
+        block.close()
+
+class ParallelAnalytics:
+    """Run feature extraction for large documents and batches in a process pool"""
+    
+    def __init__(self, workers=None, shard_size=None, threshold=None):
+        self.workers = workers or Config.ANALYTICS_WORKERS
+        self.shard_size = shard_size or Config.ANALYTICS_SHARD_SIZE
+        self.threshold = Config.ANALYTICS_PARALLEL_THRESHOLD if threshold is None else threshold
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def _pool(self):
+        """Create the worker pool on first use"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+    
+    def _replace_pool(self, broken):
+        """Drop a pool that a dead worker broke; the next _pool() call starts a fresh one"""
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+    
+    def _run(self, shm_name, tasks, lexicon_path, positions):
+        """Shard summaries per task; a broken pool is replaced once, then the shards run in this process"""
+        for _ in range(2):
+            pool = self._pool()
+            try:
+                futures = [pool.submit(analyze_shards, shm_name, task, lexicon_path, positions) for task in tasks]
+                return [future.result() for future in futures]
+            except BrokenProcessPool:
+                self._replace_pool(pool)
+        return [analyze_shards(shm_name, task, lexicon_path, positions) for task in tasks]
+    
+    def extract(self, content, digest=None, lexicon_path=None):
+        """DocumentFeatures for one large document, with indicator results pre-memoized"""
+        summary = self.summarize_many([content], lexicon_path, positions=True)[0]
+        features = DocumentFeatures(
+            digest, content, summary['words'], summary['sentences'], summary['complex_words']
+        )
+        features.results['indicators'] = summary['indicators']
+        features.results['syllables'] = (summary['syllables'], summary['polysyllables'])
+        return features
+    
+    def summarize_many(self, contents, lexicon_path=None, positions=False):
+        """Merged summaries for many documents sharing one shared-memory block"""
+        encoded = [(content or '').encode('utf-8') for content in contents]
+        block = shared_memory.SharedMemory(create=True, size=max(sum(len(data) for data in encoded), 1))
+        try:
+            tasks = []
+            owners = []
+            batch, batch_owners, batch_size = [], [], 0
+            offset = 0
+            for index, data in enumerate(encoded):
+                block.buf[offset:offset + len(data)] = data
+                for start, end in self._shards(data):
+                    batch.append((offset + start, offset + end))
+                    batch_owners.append(index)
+                    batch_size += end - start
+                    if batch_size >= self.shard_size:
+                        tasks.append(batch)
+                        owners.append(batch_owners)
+                        batch, batch_owners, batch_size = [], [], 0
+                offset += len(data)
+            if batch:
+                tasks.append(batch)
+                owners.append(batch_owners)
+            
+            parts = [[] for _ in contents]
+            for task_owners, summaries in zip(owners, self._run(block.name, tasks, lexicon_path, positions)):
+                for index, summary in zip(task_owners, summaries):
+                    parts[index].append(summary)
+            return [merge_summaries(document_parts) for document_parts in parts]
+        finally:
+            block.close()
+            block.unlink()
+    
+    def _shards(self, data):
+        """Byte ranges of one document, cut at paragraph (or clause) boundaries"""
+        if not data:
+            return [(0, 0)]
+        
+        shards = []
+        start = 0
+        while len(data) - start > self.shard_size:
+            target = start + self.shard_size
+            match = PARAGRAPH_CUT.search(data, target, target + self.shard_size)
+            if match is None:
+                match = CLAUSE_CUT.search(data, target)
+            if match is None:
+                break
+            shards.append((start, match.end()))
+            start = match.end()
+        shards.append((start, len(data)))
+        return shards
+
+_shared_parallel = None
+_shared_lock = threading.Lock()
+
+def get_parallel_analytics():
+    """Return the process-wide analytics pool, or None when disabled"""
+    global _shared_parallel
+    if Config.ANALYTICS_WORKERS <= 0:
+        return None
+    with _shared_lock:
+        if _shared_parallel is None:
+            _shared_parallel = ParallelAnalytics()
+        return _shared_parallel
@@ -0,0 +1,263 @@
+import hashlib
+import os
+import shlex
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from .metrics import cache_lookup, instrumented
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Sets the engine's limits in a fresh interpreter and execs it; preexec_fn is unsafe in threaded servers
+LIMIT_SHIM = (
+    "import os, resource, sys;"
+    "cpu, memory = int(sys.argv[1]), int(sys.argv[2]);"
+    "resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu));"
+    "resource.setrlimit(resource.RLIMIT_AS, (memory, memory));"
+    "os.execv(sys.argv[3], sys.argv[3:])"
+)
+
+# Stands in for the document date, which is filled in only after the cache key is taken
+DATE_SLOT = '\0DATE\0'
+
+class PdfQueueFull(Exception):
+    """Raised when the compile queue is at capacity"""
+
+class PdfCompileError(Exception):
+    """Raised when the TeX engine fails or times out"""
+    def __init__(self, message, log=''):
+        super().__init__(message)
+        self.log = log
+
+@instrumented('pdf_service')
+class PdfExportService:
+    """Compile LaTeX to PDF in a bounded pool of sandboxed engine processes"""
+    
+    def __init__(self, engine_command=None, workers=None, max_queue=None, timeout=None, passes=None, cache_dir=None,
+                 cache_max_bytes=None, cache_grace=None):
+        self.engine_command = shlex.split(engine_command or Config.PDF_ENGINE_COMMAND)
+        self.workers = workers or Config.PDF_WORKERS
+        self.max_queue = Config.PDF_MAX_QUEUE if max_queue is None else max_queue
+        self.timeout = timeout or Config.PDF_TIMEOUT
+        self.passes = passes or Config.PDF_ENGINE_PASSES
+        self.cache_dir = cache_dir or os.path.join(Config.DATA_FOLDER, 'pdf_cache')
+        self.cache_max_bytes = cache_max_bytes or Config.PDF_CACHE_MAX_BYTES
+        self.cache_grace = Config.PDF_CACHE_GRACE if cache_grace is None else cache_grace
+        
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='pdf-compile')
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._lock = threading.Lock()
+        # key -> (size in bytes, monotonic time last returned), least recently used first
+        self._cached = self._scan_cache()
+        self._cached_bytes = sum(size for size, _ in self._cached.values())
+        self._metrics = {
+            'compiled': 0,
+            'cache_hits': 0,
+            'failures': 0,
+            'timeouts': 0,
+            'rejected': 0,
+            'evicted': 0,
+            'in_flight': 0,
+            'compile_seconds_total': 0.0
+        }
+    
+    def cache_key(self, latex, template):
+        """Content address for a compiled PDF"""
+        digest = hashlib.sha256()
+        digest.update((template or '').encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(latex.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def export(self, latex, template=None, assets=(), date=''):
+        """Return the path of the compiled PDF, compiling only on cache miss; DATE_SLOT in latex becomes date"""
+        key = self.cache_key(latex, template)
+        latex = latex.replace(DATE_SLOT, date)
+        pdf_path = self._cache_path(key)
+        cached = os.path.exists(pdf_path)
+        cache_lookup('pdf', cached)
+        if cached:
+            self._count('cache_hits')
+            self._touch(key, pdf_path)
+            return pdf_path
+        
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise PdfQueueFull('PDF export queue is full, try again shortly')
+        
+        self._count('in_flight')
+        try:
+            future = self._executor.submit(self._compile, latex, pdf_path, assets)
+            future.result()
+            self._touch(key, pdf_path)
+            return pdf_path
+        finally:
+            self._count('in_flight', -1)
+            self._slots.release()
+    
+    def metrics(self):
+        """Snapshot of pool and cache counters"""
+        with self._lock:
+            snapshot = dict(self._metrics)
+        snapshot.update({
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'cache_bytes': self._cached_bytes,
+            'cache_max_bytes': self.cache_max_bytes,
+            'engine': self.engine_command[0] if self.engine_command else None
+        })
+        return snapshot
+    
+    def _count(self, name, amount=1):
+        """Update a metric counter"""
+        with self._lock:
+            self._metrics[name] += amount
+    
+    def _cache_path(self, key):
+        """Location of a cached PDF, sharded by key prefix"""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pdf")
+    
+    def _scan_cache(self):
+        """PDFs already on disk, oldest modification first"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.pdf'):
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        entries.sort()
+        return OrderedDict((key, (size, float('-inf'))) for _, key, size in entries)
+    
+    def _touch(self, key, pdf_path):
+        """Mark a PDF as just used and evict the least recently used ones beyond the byte budget"""
+        try:
+            # The modification time carries the order over restarts
+            os.utime(pdf_path)
+            size = os.path.getsize(pdf_path)
+        except OSError:
+            return
+        
+        evicted = []
+        now = time.monotonic()
+        with self._lock:
+            self._cached_bytes += size - self._cached.pop(key, (0, None))[0]
+            self._cached[key] = (size, now)
+            # PDFs returned within the grace period may still be on their way to a client, so the
+            # cache can run over budget for a while; the one just returned is never evicted
+            while self._cached_bytes > self.cache_max_bytes and len(self._cached) > 1:
+                old_key, (old_size, returned_at) = next(iter(self._cached.items()))
+                if returned_at > now - self.cache_grace:
+                    break
+                del self._cached[old_key]
+                self._cached_bytes -= old_size
+                evicted.append(old_key)
+            self._metrics['evicted'] += len(evicted)
+        
+        for old_key in evicted:
+            try:
+                os.remove(self._cache_path(old_key))
+            except OSError:
+                pass
+    
+    def _compile(self, latex, pdf_path, assets):
+        """Run the TeX engine in a throwaway directory and move the PDF into the cache"""
+        started = time.monotonic()
+        workdir = tempfile.mkdtemp(prefix='pdf-export-')
+        try:
+            with open(os.path.join(workdir, 'paper.tex'), 'w', encoding='utf-8') as f:
+                f.write(latex)
+            for relative_path, source_path in assets:
+                target = os.path.join(workdir, relative_path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(source_path, target)
+            
+            command = [arg.replace('{tex}', 'paper.tex') for arg in self.engine_command]
+            if not any('paper.tex' in arg for arg in command):
+                command.append('paper.tex')
+            
+            for _ in range(self.passes):
+                self._run_engine(command, workdir)
+            
+            output = os.path.join(workdir, 'paper.pdf')
+            if not os.path.exists(output):
+                raise PdfCompileError('TeX engine produced no PDF', self._read_log(workdir))
+            
+            os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+            tmp_path = f"{pdf_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.move(output, tmp_path)
+            os.replace(tmp_path, pdf_path)
+            
+            self._count('compiled')
+            return pdf_path
+        except PdfCompileError:
+            self._count('failures')
+            raise
+        finally:
+            self._count('compile_seconds_total', time.monotonic() - started)
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    def _run_engine(self, command, workdir):
+        """Run one engine pass with a timeout, restricted file access and resource limits"""
+        env = {
+            'PATH': os.environ.get('PATH', ''),
+            'HOME': workdir,
+            'TMPDIR': workdir,
+            # TeX "paranoid" mode: no reads/writes outside the working directory
+            'openin_any': 'p',
+            'openout_any': 'p',
+            'shell_escape': 'f'
+        }
+        
+        executable = shutil.which(command[0], path=env['PATH'])
+        if executable is None:
+            raise PdfCompileError(f"TeX engine not found: {command[0]}")
+        command = [executable] + command[1:]
+        if resource:
+            cpu = int(self.timeout) + 1
+            command = [sys.executable, '-I', '-S', '-c', LIMIT_SHIM, str(cpu), str(Config.PDF_MEMORY_LIMIT)] + command
+        
+        try:
+            process = subprocess.Popen(
+                command,
+                cwd=workdir,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                start_new_session=True
+            )
+        except FileNotFoundError:
+            raise PdfCompileError(f"TeX engine not found: {command[0]}")
+        
+        try:
+            output, _ = process.communicate(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.communicate()
+            self._count('timeouts')
+            raise PdfCompileError(f"TeX engine timed out after {self.timeout}s", self._read_log(workdir))
+        
+        if process.returncode != 0:
+            log = self._read_log(workdir) or output.decode('utf-8', errors='replace')
+            raise PdfCompileError(f"TeX engine exited with status {process.returncode}", log)
+    
+    def _read_log(self, workdir, tail=4000):
+        """Last part of the TeX log for error reports"""
+        try:
+            with open(os.path.join(workdir, 'paper.log'), 'r', encoding='utf-8', errors='replace') as f:
+                return f.read()[-tail:]
+        except OSError:
+            return ''
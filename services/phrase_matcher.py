@@ -0,0 +1,148 @@
+import json
+import re
+from collections import deque
+
+# Words (keeping internal apostrophes and hyphens) or a match barrier:
+# sentence/clause punctuation or a blank line between paragraphs
+TOKEN = re.compile(r"([^\W_]+(?:['’\-][^\W_]+)*)|[.,;:!?]|\n[^\S\n]*\n")
+WORD = re.compile(r"[^\W_]+(?:['’\-][^\W_]+)*")
+
+class PhraseMatcher:
+    """Word-level Aho-Corasick automaton over categorized phrase vocabularies"""
+    
+    def __init__(self, lexicons):
+        self.categories = list(lexicons)
+        self._word_ids = {}
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self.max_phrase_length = 0
+        
+        for category, phrases in lexicons.items():
+            for phrase in phrases:
+                self._add(category, phrase)
+        self._build_failure_links()
+    
+    @classmethod
+    def from_file(cls, path, base=None):
+        """Merge a JSON file of {category: [phrases]} into base lexicons"""
+        lexicons = {category: list(phrases) for category, phrases in (base or {}).items()}
+        with open(path, 'r', encoding='utf-8') as f:
+            for category, phrases in json.load(f).items():
+                lexicons.setdefault(category, []).extend(phrases)
+        return cls(lexicons)
+    
+    def _add(self, category, phrase):
+        """Insert one phrase into the trie"""
+        words = [word.lower() for word in WORD.findall(phrase)]
+        if not words:
+            return
+        
+        state = 0
+        for word in words:
+            word_id = self._word_ids.setdefault(word, len(self._word_ids))
+            next_state = self._goto[state].get(word_id)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][word_id] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        
+        entry = (category, len(words), ' '.join(words))
+        if entry not in self._output[state]:
+            self._output[state].append(entry)
+        self.max_phrase_length = max(self.max_phrase_length, len(words))
+    
+    def _build_failure_links(self):
+        """Breadth-first failure links; outputs are merged along them"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word_id, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and word_id not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(word_id, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def cursor(self):
+        """Automaton position that lets a scan resume in the next chunk of text"""
+        return MatchCursor(self.max_phrase_length)
+    
+    def iter_matches(self, text, offset=0, cursor=None):
+        """Yield (category, start, end, phrase) for every match in one scan"""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Case folding changed string length; fall back to per-token lowering
+            lowered = None
+        
+        word_ids = self._word_ids
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        if cursor is None:
+            cursor = self.cursor()
+        starts = cursor.starts
+        state = cursor.state
+        
+        for match in TOKEN.finditer(lowered if lowered is not None else text):
+            word = match.group(1)
+            word_id = None
+            if word is not None:
+                word_id = word_ids.get(word if lowered is not None else word.lower())
+            if word_id is None:
+                # Barrier or out-of-vocabulary word: no phrase can span it
+                if state:
+                    state = 0
+                    starts.clear()
+                continue
+            
+            starts.append(offset + match.start())
+            while state and word_id not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word_id, 0)
+            
+            for category, length, phrase in output[state]:
+                yield category, starts[-length], offset + match.end(), phrase
+        
+        cursor.state = state
+    
+    def scan(self, text, offset=0):
+        """Per-category match counts and (start, end, phrase) positions"""
+        counts = {category: 0 for category in self.categories}
+        positions = {category: [] for category in self.categories}
+        for category, start, end, phrase in self.iter_matches(text, offset):
+            counts[category] += 1
+            positions[category].append((start, end, phrase))
+        return {'counts': counts, 'positions': positions}
+    
+    def counts(self, text, cursor=None):
+        """Per-category match counts"""
+        counts = {category: 0 for category in self.categories}
+        for category, _, _, _ in self.iter_matches(text, cursor=cursor):
+            counts[category] += 1
+        return counts
+
+class MatchCursor:
+    """Automaton state plus start offsets of the words that led to it"""
+    
+    def __init__(self, max_phrase_length):
+        self.state = 0
+        self.starts = deque(maxlen=max(max_phrase_length, 1))
+    
+    def copy(self):
+        """Independent cursor at the same position"""
+        cursor = MatchCursor(self.starts.maxlen)
+        cursor.state = self.state
+        cursor.starts.extend(self.starts)
+        return cursor
+
+def build_matcher(base, path=None):
+    """Compile the default lexicons, merged with a custom lexicon file when configured"""
+    if path:
+        return PhraseMatcher.from_file(path, base)
+    return PhraseMatcher(base)
@@ -0,0 +1,170 @@
+import re
+
+class ReferenceVerifier:
+    """Verify model-written reference lists against real citation records"""
+    
+    HEADING_PATTERN = re.compile(
+        r'^[ \t]*(#{1,6}[ \t]*)?(\*\*)?(References|Bibliography|Works Cited|Reference List)(\*\*)?:?[ \t]*$',
+        re.IGNORECASE | re.MULTILINE
+    )
+    NEXT_HEADING_PATTERN = re.compile(r'^[ \t]*#{1,6}[ \t]+\S', re.MULTILINE)
+    ENTRY_MARKER = re.compile(r'^\s*(?:\[(\d+)\]|(\d+)[.)]|[-*•])\s+')
+    DOI_PATTERN = re.compile(r'10\.\d{4,9}/[^\s,;<>"]+')
+    YEAR_PATTERN = re.compile(r'\((\d{4})[a-z]?\)|\b((?:19|20)\d{2})\b')
+    QUOTED_TITLE = re.compile(r'["“]([^"”]+)["”]')
+    ITALIC_PATTERN = re.compile(r'\*([^*]+)\*')
+    TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+    
+    STOPWORDS = {'a', 'an', 'and', 'the', 'of', 'in', 'on', 'for', 'to', 'with', 'by', 'at', 'from', 'as', 'is'}
+    
+    def __init__(self, citation_service=None, verified_threshold=0.9, fuzzy_threshold=0.6):
+        self.citation_service = citation_service
+        self.verified_threshold = verified_threshold
+        self.fuzzy_threshold = fuzzy_threshold
+    
+    def extract_entries(self, content):
+        """Extract raw reference entries from the last references section"""
+        headings = list(self.HEADING_PATTERN.finditer(content or ''))
+        if not headings:
+            return []
+        
+        section = content[headings[-1].end():]
+        next_heading = self.NEXT_HEADING_PATTERN.search(section)
+        if next_heading:
+            section = section[:next_heading.start()]
+        
+        lines = section.split('\n')
+        has_markers = any(self.ENTRY_MARKER.match(line) for line in lines)
+        
+        entries = []
+        current = []
+        for line in lines:
+            if has_markers and self.ENTRY_MARKER.match(line):
+                if current:
+                    entries.append(' '.join(current))
+                current = [line.strip()]
+            elif not line.strip():
+                if current and not has_markers:
+                    entries.append(' '.join(current))
+                    current = []
+            elif current or not has_markers:
+                current.append(line.strip())
+        if current:
+            entries.append(' '.join(current))
+        
+        return entries
+    
+    def parse_entry(self, text):
+        """Parse one reference entry into structured fields"""
+        marker = self.ENTRY_MARKER.match(text)
+        number = None
+        body = text
+        if marker:
+            number = marker.group(1) or marker.group(2)
+            number = int(number) if number else None
+            body = text[marker.end():]
+        
+        doi_match = self.DOI_PATTERN.search(body)
+        doi = doi_match.group(0).rstrip('.').lower() if doi_match else ''
+        
+        year_match = self.YEAR_PATTERN.search(body)
+        year = int(year_match.group(1) or year_match.group(2)) if year_match else None
+        
+        title = ''
+        authors = ''
+        quoted = self.QUOTED_TITLE.search(body)
+        if quoted:
+            title = quoted.group(1).strip().rstrip('.,')
+            authors = self.YEAR_PATTERN.sub('', body[:quoted.start()]).strip(' .,()')
+        elif year_match:
+            authors = body[:year_match.start()].strip().rstrip('.,(')
+            title = body[year_match.end():].lstrip(' ).').split('. ')[0].strip('* ')
+        
+        journal_match = self.ITALIC_PATTERN.search(body)
+        journal = journal_match.group(1).strip().rstrip('.,') if journal_match else ''
+        
+        return {
+            'number': number,
+            'text': text,
+            'authors': authors,
+            'year': year,
+            'title': title,
+            'journal': journal,
+            'doi': doi
+        }
+    
+    def verify(self, content, papers):
+        """Annotate every reference entry as verified, fuzzy or unverified"""
+        entries = [self.parse_entry(text) for text in self.extract_entries(content)]
+        
+        # One batched DOI lookup for every entry that carries a DOI
+        resolved = {}
+        dois = [entry['doi'] for entry in entries if entry['doi']]
+        if dois and self.citation_service:
+            resolved = self.citation_service.get_papers_by_doi(dois)
+        
+        candidates = list(papers or [])
+        index, title_sizes = self._build_index(candidates)
+        
+        summary = {'verified': 0, 'fuzzy': 0, 'unverified': 0}
+        for entry in entries:
+            status, match, score = self._verify_entry(entry, resolved, candidates, index, title_sizes)
+            entry.update({
+                'status': status,
+                'score': round(score, 3),
+                'matched': {'title': match.get('title', ''), 'doi': match.get('doi', '')} if match else None
+            })
+            summary[status] += 1
+        
+        return {'entries': entries, 'summary': summary}
+    
+    def _tokens(self, text):
+        """Lowercase content tokens used for title matching"""
+        return {t for t in self.TOKEN_PATTERN.findall((text or '').lower()) if t not in self.STOPWORDS}
+    
+    def _build_index(self, papers):
+        """Inverted index from title token to candidate positions, plus title sizes"""
+        index = {}
+        title_sizes = []
+        for idx, paper in enumerate(papers):
+            tokens = self._tokens(paper.get('title'))
+            title_sizes.append(len(tokens))
+            for token in tokens:
+                index.setdefault(token, []).append(idx)
+        return index, title_sizes
+    
+    def _verify_entry(self, entry, resolved, candidates, index, title_sizes):
+        """Return (status, matched paper, score) for one entry"""
+        entry_tokens = self._tokens(entry['text'])
+        
+        record = resolved.get(entry['doi']) if entry['doi'] else None
+        if record:
+            score = self._containment(record, entry_tokens)
+            if score >= self.fuzzy_threshold:
+                return 'verified', record, score
+        
+        hits = {}
+        for token in entry_tokens:
+            for idx in index.get(token, ()):
+                hits[idx] = hits.get(idx, 0) + 1
+        
+        best, best_score = None, 0.0
+        for idx, count in hits.items():
+            score = count / max(title_sizes[idx], 1)
+            if score > best_score:
+                best, best_score = candidates[idx], score
+        
+        if best is None or best_score < self.fuzzy_threshold:
+            return 'unverified', None, best_score
+        
+        years_agree = not entry['year'] or not best.get('year') or entry['year'] == best.get('year')
+        if best_score >= self.verified_threshold and years_agree:
+            return 'verified', best, best_score
+        return 'fuzzy', best, best_score
+    
+    def _containment(self, paper, entry_tokens):
+        """Share of a record's title tokens that appear in the entry"""
+        title_tokens = self._tokens(paper.get('title'))
+        if not title_tokens:
+            return 0.0
+        return len(title_tokens & entry_tokens) / len(title_tokens)
@@ -1,18 +1,28 @@
-import google.generativeai as genai
-from config import Config
+from .llm import complete, complete_async
 from .trend_predictor import TrendPredictor
 from .paper_evolution import PaperEvolution
+from .metrics import instrumented
+from .tracing import traced
+import asyncio
 import json
 
+@instrumented('research_oracle')
+@traced('research_oracle')
 class ResearchOracle:
-    def __init__(self):
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-        self.trend_predictor = TrendPredictor()
-        self.paper_evolution = PaperEvolution()
+    def __init__(self, trend_predictor=None, paper_evolution=None):
+        self.trend_predictor = trend_predictor or TrendPredictor()
+        self.paper_evolution = paper_evolution or PaperEvolution()
     
     def divine_research_future(self, query):
         """AI Oracle for research predictions"""
-        prompt = f"""
+        return complete(self._divine_research_future_prompt(query))
+    
+    async def divine_research_future_async(self, query):
+        """Async variant of divine_research_future"""
+        return await complete_async(self._divine_research_future_prompt(query))
+    
+    def _divine_research_future_prompt(self, query):
+        return f"""
         As a Research Oracle with deep knowledge of scientific patterns, answer: "{query}"
         
         Provide mystical yet scientifically grounded insights on:
@@ -25,14 +35,17 @@ class ResearchOracle:
         
         Blend scientific rigor with intuitive foresight.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
     
     def generate_research_prophecy(self, researcher_profile):
         """Generate personalized research prophecy"""
-        prompt = f"""
+        return complete(self._generate_research_prophecy_prompt(researcher_profile))
+    
+    async def generate_research_prophecy_async(self, researcher_profile):
+        """Async variant of generate_research_prophecy"""
+        return await complete_async(self._generate_research_prophecy_prompt(researcher_profile))
+    
+    def _generate_research_prophecy_prompt(self, researcher_profile):
+        return f"""
         Create research prophecy for: {researcher_profile}
         
         Divine:
@@ -46,14 +59,17 @@ class ResearchOracle:
         
         Format as mystical yet actionable guidance.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
     
     def predict_research_synchronicities(self, topic1, topic2):
         """Predict when two research areas will synchronize"""
-        prompt = f"""
+        return complete(self._predict_research_synchronicities_prompt(topic1, topic2))
+    
+    async def predict_research_synchronicities_async(self, topic1, topic2):
+        """Async variant of predict_research_synchronicities"""
+        return await complete_async(self._predict_research_synchronicities_prompt(topic1, topic2))
+    
+    def _predict_research_synchronicities_prompt(self, topic1, topic2):
+        return f"""
         Predict synchronicity between "{topic1}" and "{topic2}":
         
         Analyze:
@@ -67,17 +83,35 @@ class ResearchOracle:
         
         Provide mystical timing predictions with scientific backing.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
     
     def generate_ultimate_research_vision(self, field):
         """Generate ultimate vision for research field"""
         trends = self.trend_predictor.predict_research_trends(field, "2024-2030")
         evolution = self.paper_evolution.create_research_timeline(field)
+        vision = complete(self._ultimate_vision_prompt(field, trends, evolution))
+        
+        return {
+            'ultimate_vision': vision,
+            'supporting_trends': trends,
+            'evolution_context': evolution
+        }
+    
+    async def generate_ultimate_research_vision_async(self, field):
+        """Async variant of generate_ultimate_research_vision; trends and timeline are fetched concurrently"""
+        trends, evolution = await asyncio.gather(
+            self.trend_predictor.predict_research_trends_async(field, "2024-2030"),
+            self.paper_evolution.create_research_timeline_async(field)
+        )
+        vision = await complete_async(self._ultimate_vision_prompt(field, trends, evolution))
         
-        prompt = f"""
+        return {
+            'ultimate_vision': vision,
+            'supporting_trends': trends,
+            'evolution_context': evolution
+        }
+    
+    def _ultimate_vision_prompt(self, field, trends, evolution):
+        return f"""
         Based on trends: "{trends[:200]}..." and evolution: "{evolution[:200]}..."
         
         Generate ULTIMATE VISION for {field}:
@@ -91,19 +125,17 @@ class ResearchOracle:
         
         Think beyond current limitations - what's the absolute pinnacle?
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        
-        return {
-            'ultimate_vision': response.text,
-            'supporting_trends': trends,
-            'evolution_context': evolution
-        }
     
     def create_research_mandala(self, central_concept):
         """Create research mandala - circular knowledge map"""
-        prompt = f"""
+        return complete(self._create_research_mandala_prompt(central_concept))
+    
+    async def create_research_mandala_async(self, central_concept):
+        """Async variant of create_research_mandala"""
+        return await complete_async(self._create_research_mandala_prompt(central_concept))
+    
+    def _create_research_mandala_prompt(self, central_concept):
+        return f"""
         Create research mandala for "{central_concept}":
         
         Design concentric circles:
@@ -116,8 +148,4 @@ class ResearchOracle:
         - Energy centers: Innovation hotspots
         
         Describe visual and conceptual structure for this knowledge mandala.
-        """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
\ No newline at end of file
+        """
\ No newline at end of file
@@ -0,0 +1,87 @@
+import gzip
+import hashlib
+import json
+from werkzeug.http import parse_accept_header, parse_etags
+from config import Config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+# Preferred first when the client weighs encodings equally
+ENCODINGS = (['br'] if brotli else []) + ['gzip']
+
+def dumps(payload):
+    """Serialize payload to UTF-8 JSON bytes"""
+    if orjson:
+        try:
+            return orjson.dumps(payload, option=ORJSON_OPTIONS)
+        except TypeError:
+            # Integers beyond 64 bits and other types orjson refuses
+            pass
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def content_tag(body):
+    """Hash of the identity body; strong ETags are built from it"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+def negotiate(accept_encoding):
+    """Best content coding the client accepts, or None for identity"""
+    if not accept_encoding:
+        return None
+    accepted = parse_accept_header(accept_encoding)
+    best, best_quality = None, 0
+    for encoding in ENCODINGS:
+        quality = accepted.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compress(body, encoding):
+    """Body in the given content coding"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=Config.RESPONSE_BROTLI_QUALITY)
+    # mtime=0 keeps the gzip bytes identical for identical bodies
+    return gzip.compress(body, compresslevel=Config.RESPONSE_GZIP_LEVEL, mtime=0)
+
+def not_modified(if_none_match, tag):
+    """Whether If-None-Match names any encoding of the body hashed to tag"""
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return any(etags.contains_weak(variant) for variant in [tag] + [f"{tag}-{encoding}" for encoding in ENCODINGS])
+
+def json_response(payload, request, status=200, cache_control=None):
+    """(body, status, headers) for payload, ready to return from a Flask or Quart view"""
+    body = dumps(payload)
+    encoding = None
+    # Small bodies gain less from compression than it costs
+    if len(body) >= Config.RESPONSE_COMPRESSION_MIN_SIZE:
+        encoding = negotiate(request.headers.get('Accept-Encoding'))
+    
+    headers = {'Vary': 'Accept-Encoding'}
+    if cache_control:
+        headers['Cache-Control'] = cache_control
+    
+    # Validators only make sense for reads; a POST has already done its work and may not answer 304
+    if request.method in ('GET', 'HEAD'):
+        tag = content_tag(body)
+        # Each coding of the body is a different representation, so it gets its own strong tag
+        headers['ETag'] = f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+        # The client already holds this body, in whichever coding it was sent
+        if status == 200 and not_modified(request.headers.get('If-None-Match'), tag):
+            return b'', 304, headers
+    
+    headers['Content-Type'] = 'application/json'
+    if encoding:
+        body = compress(body, encoding)
+        headers['Content-Encoding'] = encoding
+    return body, status, headers
@@ -0,0 +1,176 @@
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import zlib
+from functools import lru_cache
+from config import Config
+
+VOWEL_GROUP = re.compile(r'[aeiouy]+')
+# Vowel pairs that are usually pronounced as two syllables (ri-a, vi-o-let, ge-o)
+VOWEL_SPLIT = re.compile(r'(?<![ct])i[ao](?!n)|iu|eo|(?<![gq])u[ao]|ii')
+EDGE_PUNCTUATION = '\'"“”‘’()[]{}<>.,;:!?*_`~'
+LETTER = re.compile(r'[^\W\d_]')
+
+def estimate_syllables(word):
+    """Vowel-group heuristic for words missing from the lexicon"""
+    if len(word) <= 3:
+        return 1
+    count = len(VOWEL_GROUP.findall(word)) + len(VOWEL_SPLIT.findall(word))
+    if word.endswith('e') and not word.endswith(('le', 'ee', 'ye')) and (
+            not word.endswith('ue') or word.endswith(('que', 'gue'))):
+        count -= 1
+    elif word.endswith(('es', 'ed')) and not word.endswith(('ted', 'ded', 'ses', 'zes', 'ces', 'ges', 'shes', 'ches', 'xes')):
+        count -= 1
+    return max(count, 1)
+
+class SyllableLexicon:
+    """Memory-mapped hash table of words with syllable counts"""
+    
+    MAGIC = b'SYL2'
+    HEADER = struct.Struct('<4sII')
+    # word offset into the string blob, word length (0 = empty slot), syllables
+    SLOT = struct.Struct('<IHB')
+    
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.slots = self.HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"Not a syllable lexicon: {path}")
+        self._table = self.HEADER.size
+        self._blob = self._table + self.slots * self.SLOT.size
+    
+    def lookup(self, word):
+        """Syllable count for a lowercase word, or None; one or two slot probes"""
+        key = word.encode('utf-8')
+        data = self._map
+        slot = zlib.crc32(key) % self.slots
+        for _ in range(self.slots):
+            offset, length, syllables = self.SLOT.unpack_from(data, self._table + slot * self.SLOT.size)
+            if length == 0:
+                return None
+            if length == len(key) and data[self._blob + offset:self._blob + offset + length] == key:
+                return syllables
+            slot = (slot + 1) % self.slots
+        return None
+    
+    @classmethod
+    def build(cls, rows, path):
+        """Write (word, syllables) rows as a lexicon file (load factor 0.5)"""
+        entries = {}
+        for word, syllables in rows:
+            key = word.lower().encode('utf-8')
+            if key:
+                entries[key] = min(int(syllables), 255)
+        
+        slots = max(len(entries) * 2, 1)
+        table = [None] * slots
+        blob = []
+        offset = 0
+        for key, syllables in entries.items():
+            slot = zlib.crc32(key) % slots
+            while table[slot] is not None:
+                slot = (slot + 1) % slots
+            table[slot] = cls.SLOT.pack(offset, len(key), syllables)
+            blob.append(key)
+            offset += len(key)
+        
+        empty = cls.SLOT.pack(0, 0, 0)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, len(entries), slots))
+            f.write(b''.join(entry or empty for entry in table))
+            f.write(b''.join(blob))
+        os.replace(tmp_path, path)
+    
+    @staticmethod
+    def read_tsv(path):
+        """Rows from a word<TAB>syllables file; '#' starts a comment"""
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                fields = line.split('\t')
+                yield fields[0].strip(), fields[1]
+
+_shared_lexicon = None
+_shared_lock = threading.Lock()
+
+def get_syllable_lexicon():
+    """Process-wide lexicon; the default one is rebuilt from the bundled word list when that is newer"""
+    global _shared_lexicon
+    with _shared_lock:
+        if _shared_lexicon is None:
+            path = Config.SYLLABLE_LEXICON_PATH
+            source = Config.SYLLABLE_LEXICON_SOURCE
+            # A custom lexicon path is never overwritten once it exists
+            is_default = path == os.path.join(Config.DATA_FOLDER, 'syllables.bin')
+            try:
+                has_source = bool(source) and os.path.exists(source)
+                rebuild = has_source and (not os.path.exists(path) or (
+                    is_default and os.path.getmtime(source) > os.path.getmtime(path)))
+                if not rebuild and has_source and is_default:
+                    with open(path, 'rb') as f:
+                        # Files written in an older layout are rebuilt rather than rejected
+                        rebuild = f.read(len(SyllableLexicon.MAGIC)) != SyllableLexicon.MAGIC
+                if rebuild:
+                    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                    SyllableLexicon.build(SyllableLexicon.read_tsv(source), path)
+                _shared_lexicon = SyllableLexicon(path) if os.path.exists(path) else False
+            except (OSError, ValueError):
+                _shared_lexicon = False
+        return _shared_lexicon or None
+
+@lru_cache(maxsize=100000)
+def word_syllables(word):
+    """Syllables in a lowercase word: lexicon first, heuristic fallback"""
+    lexicon = get_syllable_lexicon()
+    entry = lexicon.lookup(word) if lexicon else None
+    if entry is not None:
+        return entry
+    if '-' in word:
+        return sum(word_syllables(part) for part in word.split('-') if part)
+    return estimate_syllables(word)
+
+def token_syllables(token):
+    """Syllables in a raw whitespace token; tokens without letters count as one"""
+    word = token.strip(EDGE_PUNCTUATION).lower()
+    if not word.isalpha() and not LETTER.search(word):
+        return 1
+    return word_syllables(word)
+
+_token_memo = {}
+TOKEN_MEMO_SIZE = 200000
+
+def syllable_totals(token_counts):
+    """(syllables, polysyllabic words) from a token -> count mapping"""
+    syllables = 0
+    polysyllables = 0
+    memo = _token_memo
+    for token, count in token_counts.items():
+        token_count = memo.get(token)
+        if token_count is None:
+            token_count = token_syllables(token)
+            if len(memo) < TOKEN_MEMO_SIZE:
+                memo[token] = token_count
+        syllables += token_count * count
+        if token_count >= 3:
+            polysyllables += count
+    return syllables, polysyllables
+
+def main(argv):
+    """Build a lexicon: python -m services.syllable_lexicon words.tsv lexicon.bin"""
+    if len(argv) != 2:
+        print(main.__doc__)
+        return 1
+    SyllableLexicon.build(SyllableLexicon.read_tsv(argv[0]), argv[1])
+    print(f"Wrote {SyllableLexicon(argv[1]).count} words to {argv[1]}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
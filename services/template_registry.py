@@ -0,0 +1,115 @@
+import os
+import re
+import threading
+import time
+from config import Config
+
+class CompiledTemplate:
+    """LaTeX template pre-split into literal segments and named slots"""
+    
+    SLOT_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+    
+    def __init__(self, name, source, path=None, mtime=None):
+        self.name = name
+        self.path = path
+        self.mtime = mtime
+        
+        # parts alternates literal, slot, literal, ..., literal
+        parts = self.SLOT_PATTERN.split(source)
+        self.literals = parts[0::2]
+        self.slots = parts[1::2]
+    
+    def render(self, values):
+        """Fill every slot in a single join"""
+        out = [self.literals[0]]
+        for slot, literal in zip(self.slots, self.literals[1:]):
+            out.append(values.get(slot, ''))
+            out.append(literal)
+        return ''.join(out)
+
+class TemplateRegistry:
+    """Loads LaTeX templates from a folder and reloads them when they change"""
+    
+    def __init__(self, folder, check_interval=2.0):
+        self.folder = folder
+        self.check_interval = check_interval
+        self._templates = {}
+        self._last_scan = 0.0
+        self._lock = threading.Lock()
+        self._scan()
+    
+    def names(self):
+        """Available template names"""
+        self._refresh()
+        return sorted(self._templates)
+    
+    def get(self, name):
+        """Return the compiled template, reloading it if its file changed"""
+        self._refresh()
+        template = self._templates.get(name)
+        if template is None:
+            raise ValueError(f"Unknown LaTeX template: {name}")
+        return template
+    
+    def render(self, name, values):
+        """Render a template with slot values"""
+        return self.get(name).render(values)
+    
+    def assets(self, name):
+        """Support files (class files, logos, ...) stored in a folder named after the template"""
+        asset_dir = os.path.join(self.folder, name)
+        if not os.path.isdir(asset_dir):
+            return []
+        
+        assets = []
+        for root, _, files in os.walk(asset_dir):
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                assets.append((os.path.relpath(path, asset_dir), path))
+        return assets
+    
+    def _refresh(self):
+        """Rescan the folder at most once per check interval"""
+        if time.monotonic() - self._last_scan >= self.check_interval:
+            self._scan()
+    
+    def _scan(self):
+        """Load new or modified templates and drop deleted ones"""
+        with self._lock:
+            self._last_scan = time.monotonic()
+            try:
+                filenames = [f for f in os.listdir(self.folder) if f.endswith('.tex')]
+            except OSError:
+                filenames = []
+            
+            seen = set()
+            for filename in filenames:
+                name = filename[:-len('.tex')]
+                path = os.path.join(self.folder, filename)
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                
+                seen.add(name)
+                current = self._templates.get(name)
+                if current is not None and current.mtime == mtime:
+                    continue
+                
+                with open(path, 'r', encoding='utf-8') as f:
+                    source = f.read()
+                self._templates[name] = CompiledTemplate(name, source, path, mtime)
+            
+            for name in set(self._templates) - seen:
+                del self._templates[name]
+
+_shared_registry = None
+_shared_lock = threading.Lock()
+
+def get_template_registry():
+    """Return the process-wide template registry"""
+    global _shared_registry
+    with _shared_lock:
+        if _shared_registry is None:
+            _shared_registry = TemplateRegistry(Config.LATEX_TEMPLATE_FOLDER)
+        return _shared_registry
@@ -0,0 +1,269 @@
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from config import Config
+from .metrics import counter
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+TRACES_DROPPED = counter('traces_dropped_total', 'Sampled traces dropped because the export queue was full')
+
+# A context variable, so child spans follow asyncio tasks and asyncio.to_thread
+_current = contextvars.ContextVar('current_span', default=None)
+
+class Trace:
+    """Spans recorded for one request"""
+    
+    def __init__(self, trace_id, sampled):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans = []
+        # Wall clock for export, perf_counter for durations
+        self.epoch_ns = time.time_ns()
+        self.origin = time.perf_counter()
+    
+    def unix_nano(self, moment):
+        return self.epoch_ns + int((moment - self.origin) * 1e9)
+
+class Span:
+    __slots__ = ('trace', 'name', 'span_id', 'parent_id', 'start', 'end', 'attributes', 'error')
+    
+    def __init__(self, trace, name, parent_id, attributes):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start = time.perf_counter()
+        self.end = None
+        self.attributes = attributes
+        self.error = None
+        trace.spans.append(self)
+    
+    @property
+    def duration(self):
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+@contextmanager
+def span(name, **attributes):
+    """Child span of the current one; does nothing outside a traced request"""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(parent.trace, name, parent.span_id, attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except Exception as e:
+        child.error = type(e).__name__
+        raise
+    finally:
+        child.end = time.perf_counter()
+        _current.reset(token)
+
+def start_request(method, route, traceparent=None):
+    """Open the root span of a request, or return None when it would be neither exported nor reported"""
+    # Clients could otherwise force every request to be exported, so only a trusted proxy's header is joined
+    match = TRACEPARENT.match(traceparent or '') if Config.TRACE_TRUST_PARENT else None
+    if match:
+        # Join the caller's trace and follow its sampling decision
+        trace_id, parent_id, sampled = match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+    else:
+        trace_id, parent_id, sampled = os.urandom(16).hex(), None, random.random() < Config.TRACE_SAMPLE_RATE
+    sampled = sampled and bool(Config.TRACE_EXPORTER)
+    if not (sampled or Config.SERVER_TIMING):
+        return None
+    
+    root = Span(Trace(trace_id, sampled), f"{method} {route}", parent_id, {'http.method': method, 'http.route': route})
+    _current.set(root)
+    return root
+
+def finish_request(root, status):
+    """Close a root span, queue its trace when sampled and return the Server-Timing value, if enabled"""
+    root.end = time.perf_counter()
+    root.attributes['http.status_code'] = status
+    if status >= 500:
+        root.error = f"HTTP {status}"
+    # WSGI worker threads are reused, so the next request must not inherit this trace
+    _current.set(None)
+    
+    if root.trace.sampled:
+        get_exporter().submit(root.trace)
+    return server_timing(root.trace) if Config.SERVER_TIMING else None
+
+def server_timing(trace):
+    """Total request time, then time per span name in order of first start"""
+    root = trace.spans[0]
+    stages = {}
+    for child in trace.spans[1:]:
+        if child.end is not None:
+            stage = stages.setdefault(child.name, [0.0, 0])
+            stage[0] += child.end - child.start
+            stage[1] += 1
+    
+    entries = [f"total;dur={root.duration * 1000:.1f}"]
+    for name, (seconds, calls) in list(stages.items())[:Config.SERVER_TIMING_MAX_ENTRIES]:
+        entry = f"{name};dur={seconds * 1000:.1f}"
+        # Concurrent calls of one stage are summed, so their total can exceed the request's
+        if calls > 1:
+            entry += f';desc="{calls} calls"'
+        entries.append(entry)
+    return ', '.join(entries)
+
+def _traced(service, name, method):
+    span_name = f"{service}.{name}"
+    
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def traced_async(*args, **kwargs):
+            if _current.get() is None:
+                return await method(*args, **kwargs)
+            with span(span_name) as current:
+                result = await method(*args, **kwargs)
+                if isinstance(result, dict) and result.get('success') is False:
+                    current.error = 'unsuccessful'
+                return result
+        return traced_async
+    
+    @functools.wraps(method)
+    def traced_call(*args, **kwargs):
+        if _current.get() is None:
+            return method(*args, **kwargs)
+        with span(span_name) as current:
+            result = method(*args, **kwargs)
+            if isinstance(result, dict) and result.get('success') is False:
+                current.error = 'unsuccessful'
+            return result
+    return traced_call
+
+def traced(service):
+    """Class decorator opening a span around every public method, named service.method"""
+    def decorate(cls):
+        for name, member in list(vars(cls).items()):
+            if name.startswith('_') or not inspect.isfunction(member) or inspect.isgeneratorfunction(member):
+                continue
+            setattr(cls, name, _traced(service, name, member))
+        return cls
+    return decorate
+
+def trace_record(trace):
+    """One trace as a JSON-lines record"""
+    return {
+        'trace_id': trace.trace_id,
+        'spans': [
+            {
+                'span_id': s.span_id,
+                'parent_id': s.parent_id,
+                'name': s.name,
+                'start_unix_nano': trace.unix_nano(s.start),
+                'duration_ms': round(s.duration * 1000, 3),
+                'attributes': s.attributes,
+                'error': s.error
+            }
+            for s in trace.spans
+        ]
+    }
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+def otlp_payload(traces):
+    """OTLP/HTTP JSON body for a batch of traces"""
+    spans = []
+    for trace in traces:
+        for s in trace.spans:
+            otlp_span = {
+                'traceId': trace.trace_id,
+                'spanId': s.span_id,
+                'name': s.name,
+                # The root span serves the request; the rest are internal
+                'kind': 2 if s is trace.spans[0] else 1,
+                'startTimeUnixNano': str(trace.unix_nano(s.start)),
+                'endTimeUnixNano': str(trace.unix_nano(s.start + s.duration)),
+                'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in s.attributes.items()],
+                'status': {'code': 2, 'message': s.error} if s.error else {'code': 1}
+            }
+            if s.parent_id:
+                otlp_span['parentSpanId'] = s.parent_id
+            spans.append(otlp_span)
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': Config.TRACE_SERVICE_NAME}}]},
+            'scopeSpans': [{'scope': {'name': __name__}, 'spans': spans}]
+        }]
+    }
+
+class TraceExporter:
+    """Background thread writing finished traces to a JSON-lines file or an OTLP/HTTP collector"""
+    
+    def __init__(self, kind, path=None, endpoint=None, max_queue=None, batch_size=64):
+        if kind not in ('jsonl', 'otlp'):
+            raise ValueError(f"Unsupported trace exporter: {kind}")
+        self.kind = kind
+        self.path = path or Config.TRACE_FILE
+        self.endpoint = endpoint or Config.TRACE_OTLP_ENDPOINT
+        self.batch_size = batch_size
+        self._queue = queue.Queue(max_queue or Config.TRACE_EXPORT_QUEUE)
+        self._thread = threading.Thread(target=self._run, name='trace-export', daemon=True)
+        self._thread.start()
+    
+    def submit(self, trace):
+        """Queue a trace without waiting; a full queue drops it"""
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            TRACES_DROPPED.inc()
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._export(batch)
+            except Exception as e:
+                logger.warning("Error exporting %d traces: %s", len(batch), e)
+    
+    def _export(self, traces):
+        if self.kind == 'otlp':
+            import requests
+            response = requests.post(self.endpoint, json=otlp_payload(traces), timeout=Config.HTTP_TIMEOUT)
+            response.raise_for_status()
+            return
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(trace_record(trace), separators=(',', ':')) + '\n' for trace in traces)
+
+_shared_exporter = None
+_shared_lock = threading.Lock()
+
+def get_exporter():
+    """Return the process-wide trace exporter"""
+    global _shared_exporter
+    with _shared_lock:
+        if _shared_exporter is None:
+            _shared_exporter = TraceExporter(Config.TRACE_EXPORTER)
+        return _shared_exporter
@@ -1,16 +1,23 @@
-import google.generativeai as genai
-from config import Config
+from .llm import complete, complete_async
+from .metrics import instrumented
+from .tracing import traced
 import json
 import re
 from datetime import datetime, timedelta
 
+@instrumented('trend_predictor')
+@traced('trend_predictor')
 class TrendPredictor:
-    def __init__(self):
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-    
     def predict_research_trends(self, field, timeframe="2024-2025"):
         """Predict emerging research trends"""
-        prompt = f"""
+        return complete(self._predict_research_trends_prompt(field, timeframe))
+    
+    async def predict_research_trends_async(self, field, timeframe="2024-2025"):
+        """Async variant of predict_research_trends"""
+        return await complete_async(self._predict_research_trends_prompt(field, timeframe))
+    
+    def _predict_research_trends_prompt(self, field, timeframe="2024-2025"):
+        return f"""
         Analyze and predict research trends in {field} for {timeframe}:
         
         1. Emerging Technologies Impact
@@ -23,14 +30,17 @@ class TrendPredictor:
         
         Provide specific, actionable predictions with confidence levels.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
     
     def generate_future_paper_concepts(self, current_topic):
         """Generate next-generation paper concepts"""
-        prompt = f"""
+        return complete(self._generate_future_paper_concepts_prompt(current_topic))
+    
+    async def generate_future_paper_concepts_async(self, current_topic):
+        """Async variant of generate_future_paper_concepts"""
+        return await complete_async(self._generate_future_paper_concepts_prompt(current_topic))
+    
+    def _generate_future_paper_concepts_prompt(self, current_topic):
+        return f"""
         Based on current research in "{current_topic}", generate 5 innovative paper concepts for the next 2-3 years:
         
         For each concept provide:
@@ -42,14 +52,17 @@ class TrendPredictor:
         
         Focus on unexplored intersections and emerging paradigms.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
     
     def analyze_research_evolution(self, topic):
         """Track how research topic has evolved"""
-        prompt = f"""
+        return complete(self._analyze_research_evolution_prompt(topic))
+    
+    async def analyze_research_evolution_async(self, topic):
+        """Async variant of analyze_research_evolution"""
+        return await complete_async(self._analyze_research_evolution_prompt(topic))
+    
+    def _analyze_research_evolution_prompt(self, topic):
+        return f"""
         Trace the evolution of "{topic}" research:
         
         1. Historical milestones (past 10 years)
@@ -62,14 +75,17 @@ class TrendPredictor:
         
         Create a research evolution timeline with key insights.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
     
     def generate_research_fusion_ideas(self, field1, field2):
         """Generate fusion research ideas between two fields"""
-        prompt = f"""
+        return complete(self._generate_research_fusion_ideas_prompt(field1, field2))
+    
+    async def generate_research_fusion_ideas_async(self, field1, field2):
+        """Async variant of generate_research_fusion_ideas"""
+        return await complete_async(self._generate_research_fusion_ideas_prompt(field1, field2))
+    
+    def _generate_research_fusion_ideas_prompt(self, field1, field2):
+        return f"""
         Create innovative research fusion concepts between {field1} and {field2}:
         
         1. Novel intersection points
@@ -82,14 +98,17 @@ class TrendPredictor:
         
         Focus on unexplored combinations with high impact potential.
         """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
     
     def predict_citation_potential(self, paper_abstract):
         """Predict citation potential of research"""
-        prompt = f"""
+        return complete(self._predict_citation_potential_prompt(paper_abstract))
+    
+    async def predict_citation_potential_async(self, paper_abstract):
+        """Async variant of predict_citation_potential"""
+        return await complete_async(self._predict_citation_potential_prompt(paper_abstract))
+    
+    def _predict_citation_potential_prompt(self, paper_abstract):
+        return f"""
         Analyze this abstract and predict citation potential: "{paper_abstract}"
         
         Assess:
@@ -103,8 +122,4 @@ class TrendPredictor:
         8. Longevity prediction
         
         Provide detailed reasoning for each score.
-        """
-        
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
\ No newline at end of file
+        """
\ No newline at end of file
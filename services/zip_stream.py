@@ -0,0 +1,72 @@
+import io
+import zipfile
+
+CHUNK_SIZE = 64 * 1024
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable sink that hands written bytes back in chunks"""
+    
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self._position
+    
+    def drain(self):
+        """Return and forget everything written since the last drain"""
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def iter_chunks(source, chunk_size=CHUNK_SIZE):
+    """Yield bytes chunks from a str, bytes, file path tuple or iterable of chunks"""
+    if callable(source):
+        source = source()
+    
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size].encode('utf-8')
+    elif isinstance(source, (bytes, bytearray)):
+        for start in range(0, len(source), chunk_size):
+            yield bytes(source[start:start + chunk_size])
+    elif isinstance(source, tuple) and source[0] == 'file':
+        with open(source[1], 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                yield chunk
+    else:
+        for chunk in source:
+            yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+def zip_stream(entries):
+    """Stream a ZIP archive built from (name, source) pairs without buffering it"""
+    # Sources are consumed lazily: a callable source only runs once the archive
+    # reaches its entry, so the download starts before expensive entries render
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, source in entries:
+            with archive.open(name, mode='w', force_zip64=True) as member:
+                header = sink.drain()
+                if header:
+                    yield header
+                for chunk in iter_chunks(source):
+                    member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    
+    # Central directory
+    data = sink.drain()
+    if data:
+        yield data
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import pytest
+from app import create_app
+from asgi import RouteDispatcher, create_async_app
+from services.container import DEFAULT_FACTORIES, get_container
+
+ENDPOINTS = [
+    '/api/generate-paper', '/api/search-citations',
+    '/api/innovation/enhanced-paper', '/api/innovation/enhance-from-source', '/api/innovation/research-proposal',
+    '/api/innovation/counterarguments', '/api/innovation/research-gaps',
+    '/api/oracle/divine', '/api/oracle/predict-trends', '/api/oracle/evolution-map',
+    '/api/oracle/ultimate-vision', '/api/oracle/synchronicity'
+]
+
+class StubPaperService:
+    def search_citations(self, query, max_results=5):
+        return [{'query': query, 'max_results': max_results, 'served_by': 'wsgi'}]
+    
+    async def search_citations_async(self, query, max_results=5):
+        return [{'query': query, 'max_results': max_results, 'served_by': 'asgi'}]
+
+@pytest.fixture
+def stub_paper_service():
+    container = get_container()
+    container.register('paper_service', lambda c: StubPaperService())
+    yield
+    container.register('paper_service', DEFAULT_FACTORIES['paper_service'])
+
+async def call(app, method, path, payload=None, headers=()):
+    """One HTTP request through an ASGI app; returns (status, headers, body)"""
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method, 'scheme': 'http',
+        'path': path, 'raw_path': path.encode('ascii'), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'localhost'), (b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode('ascii')), *headers],
+        'client': ('127.0.0.1', 50000), 'server': ('localhost', 80)
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+    
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.Event().wait()
+    
+    async def send(message):
+        sent.append(message)
+    
+    await app(scope, receive, send)
+    start = next(message for message in sent if message['type'] == 'http.response.start')
+    headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in start['headers']}
+    return start['status'], headers, b''.join(message.get('body', b'') for message in sent[1:])
+
+def test_dispatcher_sends_async_routes_to_quart_and_the_rest_to_flask(stub_paper_service):
+    dispatcher = RouteDispatcher(create_async_app(), create_app())
+    
+    async def scenario():
+        citations = await call(dispatcher, 'POST', '/api/search-citations', {'query': 'graphs', 'max_results': 2})
+        templates = await call(dispatcher, 'GET', '/paper/templates')
+        preflight = await call(dispatcher, 'OPTIONS', '/api/search-citations', headers=[
+            (b'origin', b'http://example.com'), (b'access-control-request-method', b'POST')
+        ])
+        return citations, templates, preflight
+    
+    citations, templates, preflight = asyncio.run(scenario())
+    assert citations[0] == 200
+    assert json.loads(citations[2]) == {'citations': [{'query': 'graphs', 'max_results': 2, 'served_by': 'asgi'}]}
+    assert templates[0] == 200 and 'templates' in json.loads(templates[2])
+    # Preflights are answered by Flask-CORS on the WSGI app
+    assert preflight[0] == 200 and 'access-control-allow-methods' in preflight[1]
+
+def test_async_and_sync_routes_give_the_same_answers(stub_paper_service):
+    flask_client = create_app().test_client()
+    async_app = create_async_app()
+    
+    async def post(path, payload):
+        response = await async_app.test_client().post(path, json=payload)
+        return response.status_code, await response.get_json()
+    
+    for path in ENDPOINTS:
+        response = flask_client.post(path, json={})
+        assert asyncio.run(post(path, {})) == (response.status_code, response.get_json()) == (400, response.get_json())
+    
+    payload = {'query': 'graphs', 'max_results': 3}
+    sync_body = flask_client.post('/api/search-citations', json=payload).get_json()
+    _, async_body = asyncio.run(post('/api/search-citations', payload))
+    assert sync_body['citations'][0].pop('served_by') == 'wsgi'
+    assert async_body['citations'][0].pop('served_by') == 'asgi'
+    assert sync_body == async_body
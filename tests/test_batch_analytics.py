@@ -0,0 +1,35 @@
+from services.analytics_service import AnalyticsService
+from services.batch_analytics import BatchAnalyticsService
+from services.parallel_analytics import ParallelAnalytics
+
+DOCUMENTS = [
+    "",
+    "Short note.",
+    "This study demonstrates that federated learning significantly improves privacy. "
+    "However, further research is needed; the results suggest a strong correlation, which remains unclear.\n\n" * 6,
+    "Evidence shows the effect. Data indicates a trend. Furthermore, studies found similar results. "
+    "Moreover, the analysis reveals consistent outcomes; therefore we argue the hypothesis holds.\n\n" * 12,
+    "An extraordinarily comprehensive characterization of interdisciplinary methodological considerations "
+    "necessitates substantially more sophisticated institutional infrastructure",
+]
+
+def per_document(analytics, content):
+    features = analytics.extract_features(content)
+    return {
+        'readability': analytics.analyze_readability(features),
+        'argument_structure': analytics.analyze_argument_structure(features),
+        'quality_score': analytics.generate_quality_score(features),
+        'suggestions': analytics.generate_improvement_suggestions(features)
+    }
+
+def test_serial_batch_scores_match_per_document_analysis():
+    analytics = AnalyticsService(parallel=False)
+    results = BatchAnalyticsService(analytics).score(DOCUMENTS)['results']
+    assert results == [per_document(analytics, content) for content in DOCUMENTS]
+
+def test_parallel_batch_scores_match_per_document_analysis():
+    parallel = ParallelAnalytics(workers=2, shard_size=256, threshold=0)
+    batch = BatchAnalyticsService(AnalyticsService(parallel=parallel)).score(DOCUMENTS)
+    serial = AnalyticsService(parallel=False)
+    assert batch['results'] == [per_document(serial, content) for content in DOCUMENTS]
+    assert sum(batch['grades'].values()) == len(DOCUMENTS)
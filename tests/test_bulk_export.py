@@ -0,0 +1,38 @@
+import io
+import json
+import os
+import signal
+import time
+import zipfile
+from services.bulk_export import BulkExportService
+
+PAPERS = [
+    {'title': f"Paper {index}", 'content': f"# Paper {index}\n\nFederated learning [Smith, 2020].",
+     'citations': [{'title': 'Secure aggregation', 'authors': ['Jane Smith'], 'year': 2020}]}
+    for index in range(3)
+]
+
+def export(service, papers):
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(service.stream(service.resolve_items(papers)))))
+    return archive, json.loads(archive.read('manifest.json'))
+
+def test_export_writes_tex_bib_and_manifest():
+    service = BulkExportService(workers=2)
+    archive, manifest = export(service, PAPERS + [{'title': 'Empty'}])
+    assert (manifest['succeeded'], manifest['failed']) == (3, 1)
+    assert '\\citep{smith2020}' in archive.read('001_Paper_0/001_Paper_0.tex').decode()
+    assert '@article{smith2020,' in archive.read('001_Paper_0/references.bib').decode()
+
+def test_pool_broken_by_a_dead_worker_is_replaced():
+    service = BulkExportService(workers=1)
+    pool = service._pool()
+    pool.submit(os.getpid).result()
+    for process in list(pool._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+    deadline = time.monotonic() + 10
+    while not pool._broken and time.monotonic() < deadline:
+        time.sleep(0.05)
+    
+    _, manifest = export(service, PAPERS)
+    assert manifest['succeeded'] == 3
+    assert service._pool() is not pool
@@ -0,0 +1,58 @@
+import time
+from services.citation_graph import CitationGraph
+
+def papers(count, offset=0):
+    return [{
+        'doi': f"10.1000/p{offset + i}",
+        'title': f"Paper {offset + i}",
+        'year': 2020,
+        'cited_by_count': i,
+        'references': [f"10.1000/p{(offset + i * 7 + j) % 97}" for j in range(5)] + ['10.1000/hub']
+    } for i in range(count)]
+
+def settle(graph):
+    graph.recompute()
+    while graph._journal is not None:
+        time.sleep(0.01)
+
+def test_incremental_scores_match_full_recompute():
+    graph = CitationGraph(push_tolerance=1e-9, recompute_every=10 ** 9)
+    for start in range(0, 60, 6):
+        graph.ingest(papers(6, start))
+    incremental = {doi: graph.authority(doi) for doi in graph._rank}
+    
+    settle(graph)
+    for doi, score in incremental.items():
+        assert abs(score - graph.authority(doi)) < 1e-6
+    assert graph.top(1)[0]['doi'] == '10.1000/hub'
+
+def test_ingest_during_recompute_is_replayed():
+    graph = CitationGraph(push_tolerance=1e-9, recompute_every=10 ** 9)
+    graph.ingest(papers(30))
+    graph.recompute()
+    graph.ingest(papers(30, 30))
+    while graph._journal is not None:
+        time.sleep(0.01)
+    
+    fresh = CitationGraph(push_tolerance=1e-9, recompute_every=10 ** 9)
+    fresh.ingest(papers(30))
+    fresh.ingest(papers(30, 30))
+    settle(fresh)
+    for doi in fresh._rank:
+        assert abs(graph.authority(doi) - fresh.authority(doi)) < 1e-6
+
+def test_graph_reloads_from_sqlite(tmp_path):
+    path = str(tmp_path / 'graph.sqlite3')
+    graph = CitationGraph(path, push_tolerance=1e-9)
+    graph.ingest(papers(20))
+    
+    reloaded = CitationGraph(path, push_tolerance=1e-9)
+    assert reloaded.references == graph.references
+    assert reloaded.metadata == graph.metadata
+    assert abs(reloaded.authority('10.1000/hub') - graph.authority('10.1000/hub')) < 1e-6
+    assert not reloaded.ingest(papers(20))
+
+def test_explicit_zero_settings_are_kept():
+    graph = CitationGraph(push_tolerance=0, recompute_every=0)
+    assert graph.push_tolerance == 0
+    assert graph.recompute_every == 0
@@ -0,0 +1,15 @@
+from services.citation_linker import CitationLinker
+
+PAPERS = [
+    {'authors': ['Jane Smith'], 'year': 2020},
+    {'authors': ['Wei Zhang', 'Ana Lopez'], 'year': 2018}
+]
+
+def test_repeated_citations_reuse_numbers():
+    result = CitationLinker(PAPERS).link("A [Smith, 2020]. B [Zhang et al., 2018; Smith, 2020].")
+    assert result['content'] == "A [1]. B [2, 1]."
+    assert [ref['number'] for ref in result['references']] == [1, 2]
+
+def test_unresolved_bare_year_is_not_rendered_as_a_number():
+    result = CitationLinker(PAPERS).link("See [Smith, 2020; 1999].")
+    assert result['content'] == "See [1; 1999]."
@@ -0,0 +1,92 @@
+import threading
+import pytest
+from services.container import DEFAULT_FACTORIES, ServiceContainer
+
+class Service:
+    def __init__(self, name, dependency=None):
+        self.name = name
+        self.dependency = dependency
+
+def recording_factories(calls):
+    def factory(name, dependency=None):
+        def create(container):
+            calls.append(name)
+            return Service(name, dependency and container.get(dependency))
+        return create
+    return {
+        'store': factory('store'),
+        'analytics': factory('analytics', dependency='store'),
+        'papers': factory('papers', dependency='analytics'),
+    }
+
+def test_services_are_created_on_first_use():
+    calls = []
+    container = ServiceContainer(recording_factories(calls))
+    assert container.created() == []
+    
+    # Creating a handle does not construct anything
+    papers = container.lazy('papers')
+    repr(papers)
+    assert calls == []
+    
+    # The first attribute access builds the service and its dependencies, once
+    assert papers.name == 'papers'
+    assert calls == ['papers', 'analytics', 'store']
+    assert sorted(container.created()) == ['analytics', 'papers', 'store']
+    assert container.papers.dependency is container.analytics
+    assert container.analytics.dependency is container.get('store')
+    assert calls == ['papers', 'analytics', 'store']
+
+def test_lazy_handle_forwards_attribute_writes():
+    container = ServiceContainer(recording_factories([]))
+    handle = container.lazy('store')
+    handle.name = 'renamed'
+    assert container.store.name == 'renamed'
+
+def test_register_replaces_a_created_service():
+    calls = []
+    container = ServiceContainer(recording_factories(calls))
+    handle = container.lazy('store')
+    original = container.store
+    container.register('store', lambda container: Service('stub'))
+    assert container.store is not original
+    assert handle.name == 'stub'
+    
+    # Services created earlier keep the instance they were built with
+    container = ServiceContainer(recording_factories(calls))
+    analytics = container.analytics
+    container.register('store', lambda container: Service('stub'))
+    assert analytics.dependency.name == 'store'
+    assert container.store.name == 'stub'
+
+def test_unknown_service():
+    container = ServiceContainer({})
+    with pytest.raises(AttributeError):
+        container.missing
+    with pytest.raises(KeyError):
+        container.get('missing')
+
+def test_concurrent_first_use_creates_one_instance():
+    calls = []
+    gate = threading.Event()
+    def slow(container):
+        gate.wait()
+        calls.append('slow')
+        return Service('slow')
+    container = ServiceContainer({'slow': slow})
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(container.slow)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    gate.set()
+    for thread in threads:
+        thread.join()
+    assert calls == ['slow']
+    assert all(result is results[0] for result in results)
+
+def test_default_container_is_empty_until_used():
+    container = ServiceContainer()
+    assert container.created() == []
+    assert sorted(container._factories) == sorted(DEFAULT_FACTORIES)
+    container.latex_service
+    assert container.created() == ['latex_service']
@@ -0,0 +1,63 @@
+from services.document_features import DocumentFeatures, FeatureCache
+
+def counting_extractor(calls):
+    def extract(content, digest):
+        calls.append(content)
+        return DocumentFeatures.from_content(content, digest)
+    return extract
+
+def test_cache_stays_within_its_character_bound():
+    cache = FeatureCache(max_chars=100)
+    calls = []
+    extract = counting_extractor(calls)
+    documents = ['%d ' % i + 'x' * 38 for i in range(5)]
+    for content in documents:
+        cache.get(content, extract)
+        assert cache._total <= cache.max_chars
+        assert cache._total == sum(cache._sizes.values())
+    
+    # Only the two most recent documents fit
+    assert len(cache._entries) == 2
+    cache.get(documents[-1], extract)
+    cache.get(documents[0], extract)
+    assert calls == documents + [documents[0]]
+
+def test_hit_refreshes_recency():
+    cache = FeatureCache(max_chars=100)
+    calls = []
+    extract = counting_extractor(calls)
+    first, second, third = ('%d ' % i + 'x' * 38 for i in range(3))
+    cache.get(first, extract)
+    cache.get(second, extract)
+    cache.get(first, extract)
+    cache.get(third, extract)
+    
+    # second was least recently used, so it was evicted instead of first
+    cache.get(first, extract)
+    cache.get(second, extract)
+    assert calls == [first, second, third, second]
+
+def test_oversized_document_is_not_cached():
+    cache = FeatureCache(max_chars=10)
+    calls = []
+    extract = counting_extractor(calls)
+    small = 'tiny'
+    cache.get(small, extract)
+    features = cache.get('far too long for this cache', extract)
+    assert features.word_count == 6
+    
+    # The small entry survives and the large one is extracted again
+    assert cache._total == len(small)
+    cache.get(small, extract)
+    cache.get('far too long for this cache', extract)
+    assert calls == [small, 'far too long for this cache', 'far too long for this cache']
+
+def test_features_match_a_fresh_extraction():
+    cache = FeatureCache()
+    content = 'Short words here. Considerably longer vocabulary appears!\n\nAnother one?'
+    cached = cache.get(content)
+    assert cache.get(content) is cached
+    fresh = DocumentFeatures.from_content(content)
+    assert (cached.word_count, cached.sentence_count, cached.complex_word_count) == \
+        (fresh.word_count, fresh.sentence_count, fresh.complex_word_count)
+    assert cached.digest == fresh.digest
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+from services import citation_service, doi_cache
+from services.citation_service import CitationService
+from services.doi_cache import DOICache
+
+class Fetcher:
+    def __init__(self, known):
+        self.known = known
+        self.batches = []
+    
+    def __call__(self, dois):
+        self.batches.append(list(dois))
+        return {doi: self.known[doi] for doi in dois if doi in self.known}
+
+def test_positive_and_negative_entries_expire_with_their_ttl(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(doi_cache.time, 'time', lambda: clock[0])
+    cache = DOICache(str(tmp_path / 'doi.sqlite3'), positive_ttl=100, negative_ttl=10)
+    fetcher = Fetcher({'10.1000/known': {'title': 'Known'}})
+    
+    assert cache.get_many(['10.1000/known', '10.1000/missing'], fetcher) == {
+        '10.1000/known': {'title': 'Known'}, '10.1000/missing': None
+    }
+    clock[0] += 50
+    cache.get_many(['10.1000/known', '10.1000/missing'], fetcher)
+    assert fetcher.batches == [['10.1000/known', '10.1000/missing'], ['10.1000/missing']]
+    assert cache.stats['negative_hits'] == 0 and cache.stats['hits'] == 1
+    
+    clock[0] += 5
+    assert cache.get('10.1000/missing', fetcher) is None
+    assert cache.stats['negative_hits'] == 1
+    clock[0] += 100
+    reopened = DOICache(str(tmp_path / 'doi.sqlite3'), positive_ttl=100, negative_ttl=10)
+    assert reopened.get('10.1000/known') is None
+    assert reopened.stats['misses'] == 1
+
+def test_negative_entries_persist_and_upstream_errors_are_not_cached(tmp_path):
+    path = str(tmp_path / 'doi.sqlite3')
+    cache = DOICache(path)
+    cache.get('10.1000/missing', Fetcher({}))
+    assert cache.get('not-a-doi') is None
+    
+    def failing(dois):
+        raise OSError("upstream down")
+    
+    assert cache.get('10.1000/flaky', failing) is None
+    fetcher = Fetcher({})
+    reopened = DOICache(path)
+    assert reopened.get_many(['10.1000/missing', '10.1000/flaky'], fetcher) == {
+        '10.1000/missing': None, '10.1000/flaky': None
+    }
+    assert fetcher.batches == [['10.1000/flaky']]
+    assert reopened.stats['negative_hits'] == 1
+
+def test_misses_are_batched_and_normalized(tmp_path):
+    cache = DOICache(str(tmp_path / 'doi.sqlite3'), batch_size=3)
+    fetcher = Fetcher({f"10.1000/p{i}": {'title': str(i)} for i in range(7)})
+    dois = [f"https://doi.org/10.1000/P{i}" for i in range(7)] + ['doi:10.1000/p0']
+    results = cache.get_many(dois, fetcher)
+    assert [len(batch) for batch in fetcher.batches] == [3, 3, 1]
+    assert results['10.1000/p6'] == {'title': '6'}
+    assert cache.stats['upstream_calls'] == 3
+
+def test_dois_with_commas_are_fetched_on_their_own(monkeypatch):
+    calls = []
+    
+    def get(url, params=None):
+        calls.append((url, params))
+        if params is None:
+            message = {'DOI': '10.1000/a,b', 'title': ['Comma']}
+        else:
+            message = {'items': [{'DOI': '10.1000/plain', 'title': ['Plain']}]}
+        return SimpleNamespace(status_code=200, raise_for_status=lambda: None, json=lambda: {'message': message})
+    
+    monkeypatch.setattr(citation_service.requests, 'get', get)
+    service = CitationService.__new__(CitationService)
+    service.crossref_base_url = "https://api.crossref.org/works"
+    papers = service._fetch_by_dois(['10.1000/plain', '10.1000/a,b'])
+    
+    assert set(papers) == {'10.1000/plain', '10.1000/a,b'}
+    assert calls[0][1]['filter'] == 'doi:10.1000/plain'
+    assert calls[1][0] == "https://api.crossref.org/works/10.1000%2Fa%2Cb"
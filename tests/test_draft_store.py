@@ -0,0 +1,26 @@
+from services.draft_store import DraftStore
+
+def test_latest_and_history_replay_deltas_between_snapshots(tmp_path):
+    store = DraftStore(str(tmp_path / 'drafts.sqlite3'), snapshot_interval=4)
+    lines = [f"line {i}\n" for i in range(200)]
+    saved = []
+    for version in range(1, 11):
+        lines[version] = f"edited in version {version}\n"
+        saved.append(''.join(lines))
+        store.save('d', saved[-1])
+    
+    assert store.latest('d')['content'] == saved[-1]
+    assert store.latest('d')['version'] == 10
+    assert [store.version('d', v)['content'] for v in range(1, 11)] == saved
+    assert [v['version'] for v in store.history('d') if v['snapshot']] == [9, 5, 1]
+
+def test_autosave_stores_only_a_delta(tmp_path):
+    store = DraftStore(str(tmp_path / 'drafts.sqlite3'), snapshot_interval=4)
+    content = ''.join(f"line {i}\n" for i in range(200))
+    store.save('d', content)
+    store.save('d', content + "appended\n")
+    first, second = sorted(store.history('d'), key=lambda version: version['version'])
+    assert first['snapshot'] and not second['snapshot']
+    assert second['stored_bytes'] < first['stored_bytes'] / 10
+    assert store.save('d', content + "appended\n")['changed'] is False
+    assert store.latest('d')['content'] == content + "appended\n"
@@ -0,0 +1,54 @@
+from services.analytics_service import AnalyticsService
+from services.incremental_analytics import EditableDocument, StreamingAnalyzer
+
+def test_whitespace_chunks_do_not_grow_the_carry():
+    stream = StreamingAnalyzer(AnalyticsService(parallel=False), max_carry=64)
+    stream.feed("Results suggest a strong effect.")
+    for _ in range(100):
+        stream.feed("    ")
+    assert len(stream._carry) <= 64
+    stream.feed("\n")
+    stream.feed("   \n")
+    assert stream._carry == ''
+    stream.feed("More work is needed.")
+    readability = stream.finish()['readability']
+    assert (readability['word_count'], readability['sentence_count']) == (9, 2)
+
+TEXT = (
+    "This study demonstrates that federated learning significantly improves privacy. "
+    "However, further research is needed; the results suggest a strong correlation, which remains unclear.\n\n"
+    "Evidence shows the effect and data indicates a trend\n\n"
+    "that continues here. Moreover, naïve café studies found similar results!\n\n"
+) * 5
+
+def full_analysis(analytics, content):
+    features = analytics.extract_features(content)
+    return analytics.analyze_totals(
+        features.word_count, features.sentence_count, features.complex_word_count,
+        dict(analytics._indicators(features)['counts']), *analytics._syllables(features)
+    )
+
+def test_streaming_in_any_chunk_size_matches_the_full_analysis():
+    analytics = AnalyticsService(parallel=False)
+    expected = full_analysis(analytics, TEXT)
+    data = TEXT.encode('utf-8')
+    for size in (1, 3, 17, 64, 1000):
+        stream = StreamingAnalyzer(analytics)
+        for start in range(0, len(data), size):
+            stream.feed(data[start:start + size])
+        assert stream.finish() == expected
+        assert stream.chars == len(TEXT)
+
+def test_paragraph_edits_match_analyzing_the_edited_text():
+    analytics = AnalyticsService(parallel=False)
+    document = EditableDocument(analytics, TEXT)
+    document.replace(1, "A replaced paragraph without a stop")
+    document.insert(0, "Opening words, however")
+    document.insert(len(document.paragraphs), "Closing remarks. Therefore we conclude.")
+    document.delete(3)
+    document.replace(2, "Two new paragraphs.\n\nThe second one")
+    
+    expected = full_analysis(analytics, document.content)
+    expected['paragraph_count'] = len(document.paragraphs)
+    assert document.analysis() == expected
+    assert EditableDocument(analytics, document.content).analysis() == expected
@@ -0,0 +1,73 @@
+import io
+import re
+import zipfile
+from services.document_ast import citation_keys, render_document
+from services.latex_service import LatexService
+
+CONTENT = "Earlier work [Smith, 2020a] was extended [Smith, 2020b; Lee, 2019]."
+PAPERS = [
+    {'authors': ['Jane Smith'], 'year': 2020, 'title': 'First'},
+    {'authors': ['Jane Smith'], 'year': 2020, 'title': 'Second'},
+    {'authors': ['Min Lee'], 'year': 2019, 'title': 'Third'}
+]
+
+def test_year_suffix_keeps_same_author_year_works_apart():
+    assert citation_keys(CONTENT) == ['smith2020a', 'smith2020b', 'lee2019']
+    assert '\\citep{smith2020b,lee2019}' in render_document(CONTENT, 'latex')
+
+def test_bibtex_keys_match_lettered_citations():
+    bibtex = LatexService().generate_bibtex(PAPERS, CONTENT)
+    assert re.findall(r'^@(\w+)\{(\w+),', bibtex, re.M) == [
+        ('article', 'smith2020a'), ('article', 'smith2020b'), ('article', 'lee2019')
+    ]
+
+def test_numeric_citations_become_bib_keys_in_the_bundle():
+    from app import create_app
+    content = "Shown before [1] and since [2, 3].\n\nOut of range [9].\n\n## References\n\n[1] Smith, J. (2020). First."
+    response = create_app().test_client().post('/api/download-bundle', json={
+        'paper_content': content, 'title': 'T', 'citations': PAPERS, 'filename': 'paper'
+    })
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as archive:
+        tex = archive.read('paper/paper.tex').decode('utf-8')
+        bib = archive.read('paper/references.bib').decode('utf-8')
+    assert 'before \\citep{smith2020a} and since \\citep{smith2020b,lee2019}.' in tex
+    assert 'Out of range [9].' in tex
+    assert '\n[1] Smith, J. (2020). First.' in tex
+    assert re.findall(r'^@\w+\{(\w+),', bib, re.M) == ['smith2020a', 'smith2020b', 'lee2019']
+
+DRAFT = [
+    "# Introduction\n\nEarlier work [Smith, 2020a] found *clear* effects & costs of 5%.",
+    "## Method\n\n- first step\n- second step with **bold** text",
+    "## Results\n\n1. one\n2. two\n\nA closing paragraph [1].",
+    "# Conclusion\n\nDone."
+]
+
+def test_section_cache_renders_like_a_full_render(monkeypatch):
+    from services import latex_service as module
+    service = LatexService()
+    renders = []
+    render_blocks = module.render_blocks
+    monkeypatch.setattr(module, 'render_blocks',
+                        lambda section, fmt: renders.append(section.strip()) or render_blocks(section, fmt))
+    
+    def check(sections):
+        content = '\n\n'.join(sections)
+        cached = service.generate_latex(content, 'T', document_id='draft', date='today')
+        assert cached == service.generate_latex(content, 'T', date='today')
+    
+    check(DRAFT)
+    assert len(renders) == len(DRAFT)
+    
+    renders.clear()
+    edited = DRAFT[:1] + ["## Method\n\n- first step\n- a changed step"] + DRAFT[2:]
+    check(edited)
+    assert renders == [edited[1]]
+    
+    renders.clear()
+    # A new section and a repeated one; only the new one is rendered
+    check(edited[:2] + ["## Appendix\n\nExtra."] + edited[2:3] + edited[:1] + edited[3:])
+    assert renders == ["## Appendix\n\nExtra."]
+    
+    renders.clear()
+    check(edited[1:])
+    assert renders == []
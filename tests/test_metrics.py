@@ -0,0 +1,76 @@
+import threading
+from services.metrics import CONTENT_TYPE, counter, histogram, render
+
+def test_exposition_format():
+    requests = counter('test_exposition_requests_total', 'Requests seen by the test', ['route'])
+    requests.inc('/a')
+    requests.inc('/a', amount=2)
+    requests.inc('/say "hi"\n')
+    latency = histogram('test_exposition_seconds', 'Latency seen by the test', ['route'], buckets=(0.1, 1.0))
+    latency.observe(0.05, '/a')
+    latency.observe(0.5, '/a')
+    latency.observe(5, '/a')
+    
+    lines = render().splitlines()
+    start = lines.index('# HELP test_exposition_requests_total Requests seen by the test')
+    assert lines[start:start + 4] == [
+        '# HELP test_exposition_requests_total Requests seen by the test',
+        '# TYPE test_exposition_requests_total counter',
+        'test_exposition_requests_total{route="/a"} 3',
+        'test_exposition_requests_total{route="/say \\"hi\\"\\n"} 1'
+    ]
+    start = lines.index('# TYPE test_exposition_seconds histogram')
+    assert lines[start + 1:start + 6] == [
+        'test_exposition_seconds_bucket{route="/a",le="0.1"} 1',
+        'test_exposition_seconds_bucket{route="/a",le="1.0"} 2',
+        'test_exposition_seconds_bucket{route="/a",le="+Inf"} 3',
+        'test_exposition_seconds_sum{route="/a"} 5.55',
+        'test_exposition_seconds_count{route="/a"} 3'
+    ]
+
+def test_shards_of_live_threads_are_merged():
+    hits = counter('test_live_shards_total', 'Increments from live threads', ['kind'])
+    recorded = threading.Barrier(5)
+    release = threading.Event()
+    
+    def work():
+        for _ in range(1000):
+            hits.inc('x')
+        recorded.wait()
+        release.wait()
+    
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    recorded.wait()
+    try:
+        assert hits.samples() == [('test_live_shards_total', ('x',), 4000)]
+        assert len(hits._shards) == 4
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+
+def test_shards_of_finished_threads_are_folded():
+    hits = counter('test_retired_shards_total', 'Increments from finished threads')
+    threads = [threading.Thread(target=lambda: [hits.inc() for _ in range(10)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+        thread.join()
+    
+    assert hits.samples() == [('test_retired_shards_total', (), 80)]
+    assert hits._shards == [] and hits._retired == {(): 80}
+    hits.inc()
+    assert hits.samples() == [('test_retired_shards_total', (), 81)]
+
+def test_metrics_endpoint_is_scraped_through_the_app():
+    from app import create_app
+    client = create_app().test_client()
+    client.get('/paper/templates')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == CONTENT_TYPE
+    body = response.get_data(as_text=True)
+    assert '# TYPE http_requests_total counter' in body
+    assert 'http_requests_total{route="/paper/templates",method="GET",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{route="/paper/templates",method="GET",le="+Inf"}' in body
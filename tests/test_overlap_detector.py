@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+from services.overlap_detector import OverlapIndex, compare
+from services.paper_store import PaperStore
+
+TEXT = "Federated learning lets many clients train one shared model while secure aggregation hides their updates."
+
+def test_shingle_hashes_match_across_processes():
+    script = "from services.overlap_detector import OverlapIndex; print(list(OverlapIndex().fingerprint(%r).shingles))"
+    outputs = {
+        subprocess.run(
+            [sys.executable, '-c', script % TEXT], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(__file__)), env=dict(os.environ, PYTHONHASHSEED=seed)
+        ).stdout
+        for seed in ('1', '2')
+    }
+    assert len(outputs) == 1
+    assert outputs.pop().strip() == str(list(OverlapIndex().fingerprint(TEXT).shingles))
+
+def test_seeding_indexes_stored_papers_behind_newer_ones(tmp_path):
+    store = PaperStore(str(tmp_path / 'papers.sqlite3'))
+    for index in range(3):
+        store.put(f"paper{index}", {'paper': {'title': f"Paper {index}", 'topic': 'privacy', 'content': f"{TEXT} {index}"}})
+    
+    index = OverlapIndex(max_documents=3)
+    index.add('live', "An unrelated paper about graph databases and query planning in distributed systems.")
+    index.seed(store.recent(index.max_documents)).join()
+    assert index.seed(store.recent(index.max_documents)) is None
+    
+    assert list(index._documents) == ['paper1', 'paper2', 'live']
+    matches = {match['doc_id']: match['metadata'] for match in index.query(TEXT)['matches']}
+    assert matches == {'paper1': {'title': 'Paper 1', 'topic': 'privacy'}, 'paper2': {'title': 'Paper 2', 'topic': 'privacy'}}
+
+def test_passages_align_repeated_shingles_with_the_right_occurrence():
+    index = OverlapIndex()
+    source_text = "alpha beta gamma delta epsilon zeta one two alpha beta gamma delta epsilon eta theta"
+    query_text = "alpha beta gamma delta epsilon eta theta"
+    match = compare(index.fingerprint(query_text), index.fingerprint(source_text), query_text)
+    assert len(match['passages']) == 1
+    passage = match['passages'][0]
+    assert source_text[passage['source_start']:passage['source_end']] == query_text
+    assert passage['words'] == 7
+
+def test_loader_backed_index_keeps_no_text_or_fingerprint():
+    texts = {'stored': f"{TEXT} It was stored long before this query arrived."}
+    index = OverlapIndex(loader=texts.get)
+    index.add('stored', texts['stored'], {'title': 'Stored'})
+    signature, sampled, metadata, text = index._documents['stored']
+    assert text is None and len(signature) == index.num_bins and metadata == {'title': 'Stored'}
+    
+    matches = index.query(TEXT)['matches']
+    assert [match['doc_id'] for match in matches] == ['stored']
+    assert matches[0]['containment'] == 1.0
+    del texts['stored']
+    index.remove('stored')
+    assert index.query(TEXT)['matches'] == []
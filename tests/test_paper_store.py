@@ -0,0 +1,83 @@
+import pytest
+import time
+from services.paper_store import PaperStore
+
+def result(index, paper_type='research'):
+    content = (
+        f"# Federated Systems {index}\n\n"
+        "Federated learning lets clients train a shared model; secure aggregation hides their updates.\n"
+    )
+    return {'success': True, 'paper': {
+        'title': f"Federated Systems {index}", 'content': content, 'topic': 'privacy',
+        'type': paper_type, 'citation_style': 'apa'
+    }, 'citations': []}
+
+@pytest.fixture
+def store(tmp_path):
+    store = PaperStore(str(tmp_path / 'papers.sqlite3'))
+    for index in range(12):
+        store.put(f"paper{index}", result(index, 'review' if index % 3 == 0 else 'research'))
+    return store
+
+@pytest.mark.parametrize('query', ['federat*', 'federa*', 'learni*', 'aggregat*', 'feder*', 'learning*'])
+def test_prefixes_longer_than_the_stem_match(store, query):
+    found = store.search(query, limit=100)
+    assert len(found['results']) == 12
+    assert '<mark>' in found['results'][0]['snippet']
+
+def test_words_and_prefixes_combine_with_filters(store):
+    assert len(store.search('learning aggregat*', limit=100)['results']) == 12
+    assert len(store.search('federat*', paper_type='review', limit=100)['results']) == 4
+    assert store.search('aggregat* blockchain')['results'] == []
+
+def test_stemmed_words_still_match(store):
+    assert len(store.search('aggregating', limit=100)['results']) == 12
+
+def test_reput_reindexes_title_and_citations(store):
+    first = result(1)
+    first['citations'] = [{'title': 'Practical Secure Aggregation', 'authors': ['Bonawitz'], 'year': 2017}]
+    store.put('paper1', first)
+    assert [found['paper_id'] for found in store.search('bonaw*')['results']] == ['paper1']
+    
+    updated = result(1)
+    updated['paper']['title'] = 'Byzantine Robustness'
+    updated['citations'] = [{'title': 'Gradient Inversion Attacks', 'authors': ['Geiping'], 'year': 2020}]
+    store.put('paper1', updated)
+    
+    for query in ('byzantine', 'byzant*', 'inversion', 'geip*'):
+        assert [found['paper_id'] for found in store.search(query)['results']] == ['paper1']
+    assert store.search('byzantine')['results'][0]['title'] == 'Byzantine Robustness'
+    assert len(store.search('federat*', limit=100)['results']) == 12
+    assert store.search('bonaw*')['results'] == []
+    assert store.search('bonawitz')['results'] == []
+
+def test_dictionary_training_runs_in_the_background(tmp_path):
+    store = PaperStore(str(tmp_path / 'papers.sqlite3'), retrain_every=3)
+    for index in range(3):
+        store.put(f"paper{index}", result(index))
+    for _ in range(500):
+        if not store._training:
+            break
+        time.sleep(0.01)
+    assert store.stats()['dictionary'] == 1
+    store.put('paper3', result(3))
+    assert store.get('paper3')['paper']['content'] == result(3)['paper']['content']
+
+def test_dictionary_trained_by_another_worker_is_loaded_on_demand(tmp_path):
+    path = str(tmp_path / 'papers.sqlite3')
+    trainer, other = PaperStore(path), PaperStore(path)
+    for index in range(3):
+        trainer.put(f"paper{index}", result(index))
+    assert trainer.train() == 1
+    trainer.put('paper3', result(3))
+    
+    assert other.get('paper3')['paper']['content'] == result(3)['paper']['content']
+    other.put('paper3', result(3))
+    assert other.section('paper3', 0)['heading'] == 'Federated Systems 3'
+
+def test_search_tables_keep_no_copy_of_the_text(store):
+    tables = {name for name, in store._db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert 'paper_search_content' not in tables and 'paper_search_prefix_content' not in tables
+    found = store.search('aggregation', limit=1)['results'][0]
+    assert '<mark>aggregation</mark>' in found['snippet']
+    assert found['citation_style'] == 'apa'
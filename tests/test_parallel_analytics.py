@@ -0,0 +1,55 @@
+import os
+import signal
+import time
+from services.parallel_analytics import ParallelAnalytics, _worker_matcher, merge_summaries, summarize_text
+
+PARAGRAPH = (
+    "This study demonstrates that federated learning significantly improves privacy. "
+    "However, further research is needed; the results suggest a strong correlation, which remains unclear.\n\n"
+)
+
+def serial(text):
+    return summarize_text(text, _worker_matcher(None), positions=True)
+
+def break_pool(analytics):
+    pool = analytics._pool()
+    pool.submit(os.getpid).result()
+    for process in list(pool._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+    deadline = time.monotonic() + 10
+    while not pool._broken and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return pool
+
+def test_broken_pool_is_replaced():
+    analytics = ParallelAnalytics(workers=1, shard_size=256)
+    text = PARAGRAPH * 20
+    pool = break_pool(analytics)
+    assert analytics.summarize_many([text], positions=True)[0] == serial(text)
+    assert analytics._pool() is not pool
+
+def test_pool_that_keeps_breaking_falls_back_to_this_process():
+    analytics = ParallelAnalytics(workers=1, shard_size=256)
+    broken = break_pool(analytics)
+    analytics._pool = lambda: broken
+    analytics._replace_pool = lambda pool: None
+    text = PARAGRAPH * 20
+    assert analytics.summarize_many([text], positions=True)[0] == serial(text)
+
+def test_sharded_summaries_match_serial_wherever_the_shards_fall():
+    # Targets land mid-word and mid-sentence; multi-byte characters put some mid-character too
+    text = (PARAGRAPH * 3 + "Naïve café studies—however—show ünïcödé effects, which persist; "
+            "therefore the evidence suggests a long sentence without a full stop at all\n"
+            "that continues on the next line, and furthermore on the next one\n\n") * 4
+    analytics = ParallelAnalytics(workers=2, threshold=0)
+    for shard_size in (7, 23, 64, 101, 257, 1000):
+        analytics.shard_size = shard_size
+        assert len(analytics._shards(text.encode('utf-8'))) > 1
+        assert analytics.summarize_many([text], positions=True)[0] == serial(text)
+
+def test_merging_at_any_whitespace_inside_a_sentence_is_exact():
+    text = "However, the results suggest a strong correlation between privacy and accuracy. Further research is needed"
+    matcher = _worker_matcher(None)
+    for cut in (i for i, char in enumerate(text) if char.isspace()):
+        parts = [summarize_text(text[:cut], matcher), summarize_text(text[cut:], matcher)]
+        assert merge_summaries(parts) == serial(text)
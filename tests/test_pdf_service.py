@@ -0,0 +1,93 @@
+import os
+import stat
+import sys
+import pytest
+from services.container import DEFAULT_FACTORIES, get_container
+from services.pdf_service import DATE_SLOT, PdfExportService, PdfCompileError
+
+STUB_ENGINE = '''#!{python}
+import resource, sys, time
+with open(sys.argv[1]) as f:
+    tex = f.read()
+with open('calls', 'a') as f:
+    f.write('x')
+if 'SLOW' in tex:
+    time.sleep(30)
+if 'FAIL' in tex:
+    sys.exit(3)
+with open('paper.pdf', 'w') as f:
+    f.write(f"{{tex}} cpu={{resource.getrlimit(resource.RLIMIT_CPU)[0]}}")
+'''
+
+@pytest.fixture
+def engine(tmp_path):
+    path = tmp_path / 'stub-engine'
+    path.write_text(STUB_ENGINE.format(python=sys.executable))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return f"{path} {{tex}}"
+
+def service(engine, tmp_path, **options):
+    options.setdefault('timeout', 5)
+    return PdfExportService(engine_command=engine, passes=1, cache_dir=str(tmp_path / 'cache'), **options)
+
+def test_compiles_under_resource_limits(engine, tmp_path):
+    pdf_path = service(engine, tmp_path, timeout=7).export('hello')
+    with open(pdf_path) as f:
+        assert f.read() == 'hello cpu=8'
+
+def test_cache_hit_skips_the_engine(engine, tmp_path):
+    pdf = service(engine, tmp_path)
+    assert pdf.export('hello') == pdf.export('hello')
+    assert pdf.metrics()['compiled'] == 1
+    assert pdf.metrics()['cache_hits'] == 1
+
+def test_timeout_kills_the_engine(engine, tmp_path):
+    pdf = service(engine, tmp_path, timeout=1)
+    with pytest.raises(PdfCompileError, match='timed out'):
+        pdf.export('SLOW')
+    assert pdf.metrics()['timeouts'] == 1
+
+def test_nonzero_exit_is_a_compile_error(engine, tmp_path):
+    pdf = service(engine, tmp_path)
+    with pytest.raises(PdfCompileError, match='status 3'):
+        pdf.export('FAIL')
+    assert pdf.metrics()['failures'] == 1
+
+def test_cache_evicts_least_recently_used_beyond_budget(engine, tmp_path):
+    pdf = service(engine, tmp_path, cache_max_bytes=30, cache_grace=0)
+    first = pdf.export('first')
+    second = pdf.export('second')
+    pdf.export('first')
+    third = pdf.export('third')
+    assert os.path.exists(first) and os.path.exists(third)
+    assert not os.path.exists(second)
+    assert pdf.metrics()['evicted'] == 1
+
+def test_recently_returned_pdfs_are_not_evicted(engine, tmp_path):
+    pdf = service(engine, tmp_path, cache_max_bytes=30, cache_grace=60)
+    paths = [pdf.export(text) for text in ('first', 'second', 'third')]
+    assert all(os.path.exists(path) for path in paths)
+    assert pdf.metrics()['evicted'] == 0
+
+def test_date_is_filled_in_but_left_out_of_the_cache_key(engine, tmp_path):
+    pdf = service(engine, tmp_path)
+    first = pdf.export(f"dated {DATE_SLOT}", date='May 01, 2026')
+    assert pdf.export(f"dated {DATE_SLOT}", date='May 02, 2026') == first
+    with open(first) as f:
+        assert f.read().startswith('dated May 01, 2026 ')
+    assert pdf.metrics()['compiled'] == 1
+
+def test_full_queue_returns_503(engine, tmp_path):
+    from app import create_app
+    pdf = service(engine, tmp_path, workers=1, max_queue=0)
+    container = get_container()
+    container.register('pdf_service', lambda c: pdf)
+    pdf._slots.acquire()
+    try:
+        response = create_app().test_client().post('/api/export-pdf', json={'content': '# Title\n\nBody'})
+    finally:
+        pdf._slots.release()
+        container.register('pdf_service', DEFAULT_FACTORIES['pdf_service'])
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
+    assert pdf.metrics()['rejected'] == 1
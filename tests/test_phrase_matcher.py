@@ -0,0 +1,87 @@
+import json
+import random
+from services.phrase_matcher import TOKEN, PhraseMatcher, build_matcher
+
+LEXICONS = {
+    'hedge': ['may', 'it is possible that', 'possible'],
+    'claim': ['we show', 'we show that', 'clearly'],
+    'overlap': ['show that it', 'that it is'],
+}
+WORDS = ['we', 'show', 'that', 'it', 'is', 'possible', 'may', 'clearly', 'results', 'Show', "it's"]
+SEPARATORS = [' ', ' ', ' ', ', ', '. ', '\n\n', ' \n \n']
+
+def naive_matches(lexicons, text):
+    """Every phrase occurrence found by comparing word windows directly"""
+    tokens = [(match.group(1).lower() if match.group(1) else None, match.start(), match.end())
+              for match in TOKEN.finditer(text)]
+    found = []
+    for category, phrases in lexicons.items():
+        for phrase in phrases:
+            words = phrase.lower().split()
+            for i in range(len(tokens) - len(words) + 1):
+                window = tokens[i:i + len(words)]
+                if [word for word, _, _ in window] == words:
+                    found.append((category, window[0][1], window[-1][2], phrase))
+    return sorted(found)
+
+def random_text(rng, words=60):
+    parts = []
+    for _ in range(words):
+        parts.append(rng.choice(WORDS))
+        parts.append(rng.choice(SEPARATORS))
+    return ''.join(parts)
+
+def test_scan_matches_naive_search():
+    matcher = PhraseMatcher(LEXICONS)
+    rng = random.Random(7)
+    for _ in range(200):
+        text = random_text(rng)
+        result = matcher.scan(text)
+        found = sorted((category, start, end, phrase)
+                       for category, positions in result['positions'].items()
+                       for start, end, phrase in positions)
+        assert found == naive_matches(LEXICONS, text)
+        assert result['counts'] == {category: sum(1 for match in found if match[0] == category)
+                                    for category in LEXICONS}
+
+def test_barriers_stop_matches():
+    matcher = PhraseMatcher(LEXICONS)
+    assert matcher.counts('We show that it is possible.')['overlap'] == 2
+    for barrier in (', ', '. ', '; ', '\n\n', '\n  \n'):
+        assert matcher.counts('we show' + barrier + 'that it')['overlap'] == 0
+    # A single line break and an unknown word differ: only the latter is a barrier
+    assert matcher.counts('we\nshow')['claim'] == 1
+    assert matcher.counts('we really show')['claim'] == 0
+
+def test_cursor_resumes_across_chunks():
+    matcher = PhraseMatcher(LEXICONS)
+    rng = random.Random(11)
+    for _ in range(100):
+        text = random_text(rng)
+        # Cut only at a single space between two words
+        cuts = sorted(rng.sample([i for i in range(1, len(text) - 1)
+                                  if text[i] == ' ' and text[i - 1].isalpha() and text[i + 1].isalpha()], 3))
+        cursor = matcher.cursor()
+        totals = {category: 0 for category in LEXICONS}
+        for start, end in zip([0] + cuts, cuts + [len(text)]):
+            for category, count in matcher.counts(text[start:end], cursor=cursor).items():
+                totals[category] += count
+        assert totals == matcher.counts(text)
+
+def test_copied_cursor_is_independent():
+    matcher = PhraseMatcher(LEXICONS)
+    cursor = matcher.cursor()
+    matcher.counts('we', cursor=cursor)
+    branch = cursor.copy()
+    assert matcher.counts(' show', cursor=branch)['claim'] == 1
+    assert matcher.counts('. show', cursor=cursor)['claim'] == 0
+
+def test_custom_lexicon_file_extends_base(tmp_path):
+    path = tmp_path / 'lexicon.json'
+    path.write_text(json.dumps({'hedge': ['arguably'], 'novelty': ['for the first time']}), encoding='utf-8')
+    matcher = build_matcher(LEXICONS, str(path))
+    counts = matcher.counts('Arguably, we show this for the first time; it may hold.')
+    assert counts['hedge'] == 2
+    assert counts['claim'] == 1
+    assert counts['novelty'] == 1
+    assert build_matcher(LEXICONS).categories == list(LEXICONS)
@@ -0,0 +1,65 @@
+from services.doi_cache import DOICache
+from services.reference_verifier import ReferenceVerifier
+
+RECORDS = {
+    '10.1000/graph': {'title': 'Sparse Graph Neural Networks', 'year': 2021, 'doi': '10.1000/graph'},
+    '10.1000/other': {'title': 'Protein Folding at Scale', 'year': 2019, 'doi': '10.1000/other'}
+}
+
+class StubCitations:
+    """Citation service whose DOI lookups go through a DOI cache backed by fixed records"""
+    
+    def __init__(self):
+        self.doi_cache = DOICache()
+        self.batches = []
+    
+    def fetch(self, dois):
+        self.batches.append(list(dois))
+        return {doi: RECORDS[doi] for doi in dois if doi in RECORDS}
+    
+    def get_papers_by_doi(self, dois):
+        return self.doi_cache.get_many(dois, self.fetch)
+
+CONTENT = """# Results
+
+Body text.
+
+## References
+
+[1] Lee, M. (2021). Sparse graph neural networks. *Machine Learning*. https://doi.org/10.1000/graph
+[2] Park, J. (2020). "Quantum error correction in practice." *Physics Letters*. doi:10.1000/missing
+[3] Kim, S. (2018). Attention mechanisms for vision. *Vision Journal*. 10.1000/other
+"""
+
+def verify(papers=()):
+    citations = StubCitations()
+    report = ReferenceVerifier(citations).verify(CONTENT, list(papers))
+    return {entry['number']: entry for entry in report['entries']}, report['summary'], citations
+
+def test_doi_records_verify_entries_in_one_batched_lookup():
+    entries, summary, citations = verify()
+    assert entries[1]['status'] == 'verified'
+    assert entries[1]['matched'] == {'title': 'Sparse Graph Neural Networks', 'doi': '10.1000/graph'}
+    assert citations.batches == [['10.1000/graph', '10.1000/missing', '10.1000/other']]
+    assert summary == {'verified': 1, 'fuzzy': 0, 'unverified': 2}
+
+def test_unknown_doi_without_a_candidate_is_unverified():
+    entries, _, citations = verify()
+    assert entries[2]['status'] == 'unverified' and entries[2]['matched'] is None
+    # The miss is cached negatively, so a second check does not go upstream again
+    citations.get_papers_by_doi(['10.1000/missing'])
+    assert len(citations.batches) == 1
+
+def test_doi_whose_record_has_other_metadata_falls_back_to_candidates():
+    entries, _, _ = verify()
+    # 10.1000/other resolves, but to a different title, so the DOI alone does not verify the entry
+    assert entries[3]['status'] == 'unverified'
+    
+    candidates = [{'title': 'Attention Mechanisms for Vision', 'year': 2017, 'doi': '10.1000/vision'}]
+    entries, _, _ = verify(candidates)
+    assert entries[3]['status'] == 'fuzzy'
+    assert entries[3]['matched']['doi'] == '10.1000/vision'
+    
+    candidates[0]['year'] = 2018
+    entries, _, _ = verify(candidates)
+    assert entries[3]['status'] == 'verified'
@@ -0,0 +1,29 @@
+import gzip
+from types import SimpleNamespace
+from app import create_app
+from services.response_encoding import json_response
+
+PAYLOAD = {'papers': [{'title': f"Paper {index}", 'abstract': 'federated learning ' * 20} for index in range(20)]}
+
+def request(method, **headers):
+    return SimpleNamespace(method=method, headers=headers)
+
+def test_get_is_compressed_and_revalidated():
+    body, status, headers = json_response(PAYLOAD, request('GET', **{'Accept-Encoding': 'gzip'}))
+    assert status == 200 and headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(body).startswith(b'{"papers"')
+    
+    body, status, _ = json_response(PAYLOAD, request('GET', **{'If-None-Match': headers['ETag']}))
+    assert (body, status) == (b'', 304)
+
+def test_post_never_answers_not_modified():
+    etag = json_response(PAYLOAD, request('GET'))[2]['ETag']
+    body, status, headers = json_response(PAYLOAD, request('POST', **{'If-None-Match': etag}))
+    assert status == 200 and body
+    assert 'ETag' not in headers
+
+def test_listing_revalidates_through_the_app():
+    client = create_app().test_client()
+    first = client.get('/paper/templates')
+    assert first.headers['Cache-Control'].startswith('public')
+    assert client.get('/paper/templates', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
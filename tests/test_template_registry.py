@@ -0,0 +1,47 @@
+import os
+import pytest
+from services.template_registry import CompiledTemplate, TemplateRegistry
+
+def write(path, text, mtime_ns):
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def test_slots_are_filled_in_one_pass():
+    template = CompiledTemplate('t', "\\title{{{TITLE}}} {{BODY}}{{MISSING}}!")
+    assert template.slots == ['TITLE', 'BODY', 'MISSING']
+    assert template.render({'TITLE': 'A {{BODY}}', 'BODY': 'b'}) == "\\title{A {{BODY}}} b!"
+
+def test_lookup_reloads_changed_and_drops_deleted_templates(tmp_path):
+    write(tmp_path / 'plain.tex', "v1 {{CONTENT}}", 10 ** 18)
+    write(tmp_path / 'notes.txt', "not a template", 10 ** 18)
+    registry = TemplateRegistry(str(tmp_path), check_interval=0)
+    assert registry.names() == ['plain']
+    first = registry.get('plain')
+    assert registry.get('plain') is first
+    assert registry.render('plain', {'CONTENT': 'x'}) == "v1 x"
+    
+    write(tmp_path / 'plain.tex', "v2 {{CONTENT}}", 10 ** 18 + 1)
+    write(tmp_path / 'extra.tex', "{{CONTENT}}", 10 ** 18)
+    assert registry.render('plain', {'CONTENT': 'x'}) == "v2 x"
+    assert registry.names() == ['extra', 'plain']
+    
+    os.remove(tmp_path / 'plain.tex')
+    with pytest.raises(ValueError, match='Unknown LaTeX template: plain'):
+        registry.get('plain')
+
+def test_changes_are_picked_up_only_after_the_check_interval(tmp_path):
+    write(tmp_path / 'plain.tex', "v1", 10 ** 18)
+    registry = TemplateRegistry(str(tmp_path), check_interval=3600)
+    write(tmp_path / 'plain.tex', "v2", 10 ** 18 + 1)
+    assert registry.render('plain', {}) == "v1"
+    registry._last_scan -= 3600
+    assert registry.render('plain', {}) == "v2"
+
+def test_assets_come_from_the_folder_named_after_the_template(tmp_path):
+    write(tmp_path / 'acm.tex', "{{CONTENT}}", 10 ** 18)
+    (tmp_path / 'acm' / 'figures').mkdir(parents=True)
+    (tmp_path / 'acm' / 'acmart.cls').write_text("cls")
+    (tmp_path / 'acm' / 'figures' / 'logo.pdf').write_text("pdf")
+    registry = TemplateRegistry(str(tmp_path))
+    assert sorted(relative for relative, _ in registry.assets('acm')) == ['acmart.cls', os.path.join('figures', 'logo.pdf')]
+    assert registry.assets('plain') == []
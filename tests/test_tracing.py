@@ -0,0 +1,100 @@
+import json
+import pytest
+from config import Config
+from services import tracing
+from services.tracing import TraceExporter, finish_request, otlp_payload, server_timing, span, start_request
+
+TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+PARENT_ID = '00f067aa0ba902b7'
+
+@pytest.fixture
+def tracing_config(monkeypatch):
+    monkeypatch.setattr(Config, 'TRACE_EXPORTER', 'jsonl')
+    monkeypatch.setattr(Config, 'SERVER_TIMING', False)
+    monkeypatch.setattr(Config, 'TRACE_TRUST_PARENT', True)
+    yield monkeypatch
+    tracing._current.set(None)
+
+def test_trusted_traceparent_is_joined_with_its_sampling_decision(tracing_config):
+    tracing_config.setattr(Config, 'TRACE_SAMPLE_RATE', 0.0)
+    root = start_request('GET', '/x', f"00-{TRACE_ID}-{PARENT_ID}-01")
+    assert (root.trace.trace_id, root.parent_id, root.trace.sampled) == (TRACE_ID, PARENT_ID, True)
+    
+    tracing_config.setattr(Config, 'TRACE_SAMPLE_RATE', 1.0)
+    tracing_config.setattr(Config, 'SERVER_TIMING', True)
+    root = start_request('GET', '/x', f"00-{TRACE_ID}-{PARENT_ID}-00")
+    assert root.trace.trace_id == TRACE_ID and not root.trace.sampled
+
+def test_untrusted_or_malformed_traceparent_is_ignored(tracing_config):
+    tracing_config.setattr(Config, 'TRACE_SAMPLE_RATE', 0.0)
+    assert start_request('GET', '/x', f"00-{TRACE_ID.upper()}-{PARENT_ID}-01") is None
+    
+    tracing_config.setattr(Config, 'TRACE_TRUST_PARENT', False)
+    assert start_request('GET', '/x', f"00-{TRACE_ID}-{PARENT_ID}-01") is None
+    tracing_config.setattr(Config, 'TRACE_SAMPLE_RATE', 1.0)
+    root = start_request('GET', '/x', f"00-{TRACE_ID}-{PARENT_ID}-00")
+    assert root.trace.trace_id != TRACE_ID and root.parent_id is None and root.trace.sampled
+
+def test_server_timing_sums_repeated_stages(tracing_config):
+    tracing_config.setattr(Config, 'SERVER_TIMING', True)
+    tracing_config.setattr(Config, 'TRACE_EXPORTER', '')
+    root = start_request('POST', '/api/x')
+    for _ in range(2):
+        with span('crossref.search'):
+            pass
+    with span('render'):
+        pass
+    entries = finish_request(root, 200).split(', ')
+    assert entries[0].startswith('total;dur=')
+    assert entries[1].startswith('crossref.search;dur=') and entries[1].endswith(';desc="2 calls"')
+    assert entries[2].startswith('render;dur=') and 'desc' not in entries[2]
+    assert tracing._current.get() is None
+
+def test_server_timing_header_on_responses(tracing_config):
+    from app import create_app
+    client = create_app().test_client()
+    assert 'Server-Timing' not in client.get('/paper/templates').headers
+    tracing_config.setattr(Config, 'SERVER_TIMING', True)
+    assert client.get('/paper/templates').headers['Server-Timing'].startswith('total;dur=')
+
+def finished_trace(tracing_config):
+    tracing_config.setattr(Config, 'TRACE_SAMPLE_RATE', 1.0)
+    root = start_request('GET', '/x', f"00-{TRACE_ID}-{PARENT_ID}-01")
+    try:
+        with span('lookup', dois=3, cached=True, ratio=0.5):
+            raise KeyError('missing')
+    except KeyError:
+        pass
+    root.end = root.start + 0.25
+    root.attributes['http.status_code'] = 200
+    tracing._current.set(None)
+    return root.trace
+
+def test_jsonl_export_writes_one_record_per_trace(tracing_config, tmp_path):
+    trace = finished_trace(tracing_config)
+    path = tmp_path / 'traces.jsonl'
+    TraceExporter('jsonl', path=str(path))._export([trace, trace])
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 2
+    root, child = records[0]['spans']
+    assert records[0]['trace_id'] == TRACE_ID
+    assert (root['parent_id'], root['name'], root['duration_ms']) == (PARENT_ID, 'GET /x', 250.0)
+    assert (child['parent_id'], child['error'], child['attributes']) == (
+        root['span_id'], 'KeyError', {'dois': 3, 'cached': True, 'ratio': 0.5}
+    )
+
+def test_otlp_payload(tracing_config):
+    trace = finished_trace(tracing_config)
+    resource_spans = otlp_payload([trace])['resourceSpans'][0]
+    assert resource_spans['resource']['attributes'][0] == {
+        'key': 'service.name', 'value': {'stringValue': Config.TRACE_SERVICE_NAME}
+    }
+    root, child = resource_spans['scopeSpans'][0]['spans']
+    assert (root['traceId'], root['kind'], root['parentSpanId'], root['status']) == (TRACE_ID, 2, PARENT_ID, {'code': 1})
+    assert abs(int(root['endTimeUnixNano']) - int(root['startTimeUnixNano']) - 250000000) <= 1
+    assert (child['kind'], child['parentSpanId'], child['status']) == (1, root['spanId'], {'code': 2, 'message': 'KeyError'})
+    assert child['attributes'] == [
+        {'key': 'dois', 'value': {'intValue': '3'}},
+        {'key': 'cached', 'value': {'boolValue': True}},
+        {'key': 'ratio', 'value': {'doubleValue': 0.5}}
+    ]